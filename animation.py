@@ -0,0 +1,120 @@
+
+'''
+This module contains the frame scheduler of Othello game. The game draws
+with the turtle animation turned off (tracer(0)); changes to draw are
+queued as tasks and drawn by frames run from the Tk event loop with
+turtle.ontimer, so a click handler returns right away however many tiles
+its move flips.
+
+A task is an iterator (e.g. a generator) doing one step of drawing every
+time it is advanced. Every frame advances each queued task by one step,
+as long as the frame stays within its time budget, then shows the result
+with a single turtle.update().
+'''
+
+import time, turtle
+from collections import deque
+
+# Defines the delay between two frames (in ms) and the time budget of the
+# drawing of a frame (in seconds) as constants
+FRAME_MS = 16
+FRAME_BUDGET = 0.008
+
+class FrameScheduler:
+    ''' FrameScheduler class.
+        Attributes: frame_ms, an integer for the delay between frames in ms
+                    budget, a float for the drawing time of a frame in
+                    seconds
+                    tasks, a deque of the iterators still to advance
+                    pending, a boolean, True if a frame is scheduled
+                    frames, an integer for the number of frames drawn
+        frame_ms (integer) and budget (float) are optional in the __init__
+        function; tasks, pending and frames are not taken in the __init__
+
+        Methods: add, request_frame, run_frame, flush, clear and is_idle
+    '''
+
+    def __init__(self, frame_ms = FRAME_MS, budget = FRAME_BUDGET):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        self.frame_ms = frame_ms
+        self.budget = budget
+        self.tasks = deque()
+        self.pending = False
+        self.frames = 0
+
+    def add(self, task):
+        ''' Method: add
+            Parameters: self, task (iterator)
+            Returns: nothing
+            Does: Queues the task; it is advanced from the next frame on.
+        '''
+        self.tasks.append(task)
+        self.request_frame()
+
+    def request_frame(self):
+        ''' Method: request_frame
+            Parameters: self
+            Returns: nothing
+            Does: Schedules a frame on the event loop, unless one already
+                  is (e.g. to show drawings made outside of a task).
+        '''
+        if not self.pending:
+            self.pending = True
+            turtle.ontimer(self.run_frame, self.frame_ms)
+
+    def run_frame(self):
+        ''' Method: run_frame
+            Parameters: self
+            Returns: nothing
+            Does: Advances every task by one step, in the order they were
+                  queued, until the time budget of the frame runs out (the
+                  tasks not reached go first in the next frame). Finished
+                  tasks are dropped. Then updates the screen once and
+                  schedules the next frame if tasks are left.
+        '''
+        self.pending = False
+        start = time.perf_counter()
+        for i in range(len(self.tasks)):
+            if time.perf_counter() - start >= self.budget:
+                break
+            task = self.tasks.popleft()
+            try:
+                next(task)
+            except StopIteration:
+                continue
+            self.tasks.append(task)
+        turtle.update()
+        self.frames += 1
+        if self.tasks:
+            self.request_frame()
+
+    def flush(self):
+        ''' Method: flush
+            Parameters: self
+            Returns: nothing
+            Does: Runs every task to its end and updates the screen, e.g.
+                  before blocking the event loop with a dialog.
+        '''
+        while self.tasks:
+            for step in self.tasks.popleft():
+                pass
+        turtle.update()
+
+    def clear(self):
+        ''' Method: clear
+            Parameters: self
+            Returns: nothing
+            Does: Drops every task without drawing it (e.g. before the
+                  screen is cleared).
+        '''
+        self.tasks.clear()
+
+    def is_idle(self):
+        ''' Method: is_idle
+            Parameters: self
+            Returns: a boolean, True if no task is left
+        '''
+        return not self.tasks
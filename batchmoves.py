@@ -0,0 +1,188 @@
+
+'''
+This module contains the batch rules of Othello game: the same move
+generation and flipping as bitboard, but on NumPy arrays of thousands of
+8x8 positions at once. A batch of positions is two uint64 arrays of the
+same length, the tiles of the player to move and of their adversary.
+
+This module needs NumPy. Run it to check it against the scalar rules and
+report how many boards it processes per second, e.g.
+    python batchmoves.py --boards 100000
+'''
+
+import argparse, random, time, bitboard
+import numpy as np
+
+# Defines every direction of bitboard.SHIFTS as NumPy values, so that the
+# arrays are never converted to Python integers
+SHIFTS = [(np.uint64(abs(amount)), amount > 0, np.uint64(mask))
+          for amount, mask in bitboard.SHIFTS]
+ZERO = np.uint64(0)
+ONE = np.uint64(1)
+FULL = np.uint64(bitboard.FULL)
+
+def shift(bb, amount, left, mask):
+    ''' Function shift
+        Parameters: bb (uint64 array), amount (uint64), left (boolean),
+                    mask (uint64)
+        Returns: a uint64 array, every board of bb shifted one square in
+                 the direction of (amount, left) (see bitboard.shift)
+    '''
+    if left:
+        return (bb << amount) & mask
+    return (bb >> amount) & mask
+
+def count(bb):
+    ''' Function count
+        Parameters: bb (uint64 array)
+        Returns: an integer array, the number of tiles of every board
+    '''
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bb)
+    return np.unpackbits(bb.view(np.uint8).reshape(-1, 8),
+                         axis=1).sum(axis=1)
+
+def legal_moves(own, opp):
+    ''' Function legal_moves
+        Parameters: own (uint64 array), opp (uint64 array)
+        Returns: a uint64 array, the legal moves of every board (see
+                 bitboard.legal_moves)
+    '''
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for amount, left, mask in SHIFTS:
+        x = shift(own, amount, left, mask) & opp
+        for i in range(5):
+            x |= shift(x, amount, left, mask) & opp
+        moves |= shift(x, amount, left, mask) & empty
+    return moves
+
+def flips(own, opp, squares):
+    ''' Function flips
+        Parameters: own (uint64 array), opp (uint64 array),
+                    squares (integer array)
+        Returns: a uint64 array, the tiles flipped on every board by a move
+                 on the square of the same index (0 if the move is not
+                 legal; see bitboard.flips)
+    '''
+    move = ONE << squares.astype(np.uint64)
+    flipped = np.zeros_like(own)
+    for amount, left, mask in SHIFTS:
+        line = shift(move, amount, left, mask) & opp
+        for i in range(5):
+            line |= shift(line, amount, left, mask) & opp
+        bounded = (shift(line, amount, left, mask) & own) != ZERO
+        flipped |= np.where(bounded, line, ZERO)
+    return flipped
+
+def play(own, opp, squares):
+    ''' Function play
+        Parameters: own (uint64 array), opp (uint64 array),
+                    squares (integer array)
+        Returns: a tuple (flipped, next_own, next_opp) of uint64 arrays:
+                 the flipped tiles and the successor positions, seen from
+                 the adversary who moves next
+    '''
+    flipped = flips(own, opp, squares)
+    move = ONE << squares.astype(np.uint64)
+    return flipped, opp & ~flipped, own | flipped | move
+
+def expand(own, opp):
+    ''' Function expand
+        Parameters: own (uint64 array), opp (uint64 array)
+        Returns: a tuple (moves, parents, squares, flipped, next_own,
+                 next_opp): the legal moves of every board, then one entry
+                 per legal move of every board (the index of its board,
+                 its square, the flipped tiles and the successor position)
+
+        Does: Generates every successor of every board at once. Boards
+              with no legal move have no successor (the caller decides
+              whether they pass).
+    '''
+    moves = legal_moves(own, opp)
+    # Little-endian bytes, unpacked least significant bit first, give
+    # one column per square in bit order
+    bits = np.unpackbits(moves.astype('<u8').view(np.uint8).reshape(-1, 8),
+                         axis=1, bitorder='little')
+    parents, squares = np.nonzero(bits)
+    flipped, next_own, next_opp = play(own[parents], opp[parents], squares)
+    return moves, parents, squares, flipped, next_own, next_opp
+
+def random_positions(count, seed = 0):
+    ''' Function random_positions
+        Parameters: count (integer), seed (integer, optional)
+        Returns: a tuple (own, opp) of uint64 arrays, count positions
+                 reached by random moves from the start of the game
+
+        Does: Plays random games with the scalar rules and keeps one
+              position after a random number of moves from each.
+    '''
+    rng = random.Random(seed)
+    own_list, opp_list = [], []
+    start_black = 1 << 28 | 1 << 35
+    start_white = 1 << 27 | 1 << 36
+    while len(own_list) < count:
+        own, opp = start_black, start_white
+        for ply in range(rng.randint(0, 59)):
+            moves = bitboard.legal_moves(own, opp)
+            if not moves:
+                own, opp = opp, own
+                moves = bitboard.legal_moves(own, opp)
+                if not moves:
+                    break
+            square = rng.choice(bitboard.squares(moves))
+            flipped = bitboard.flips(own, opp, square)
+            own, opp = opp & ~flipped, own | flipped | 1 << square
+        own_list.append(own)
+        opp_list.append(opp)
+    return (np.array(own_list, dtype=np.uint64),
+            np.array(opp_list, dtype=np.uint64))
+
+def check_against_scalar(own, opp):
+    ''' Function check_against_scalar
+        Parameters: own (uint64 array), opp (uint64 array)
+        Returns: an integer, the number of boards whose batch results
+                 differ from the scalar rules of bitboard (0 if correct)
+    '''
+    moves, parents, squares, flipped, next_own, next_opp = expand(own, opp)
+    wrong = set()
+    for i in range(len(own)):
+        if int(moves[i]) != bitboard.legal_moves(int(own[i]), int(opp[i])):
+            wrong.add(i)
+    for j in range(len(parents)):
+        i = int(parents[j])
+        if int(flipped[j]) != bitboard.flips(int(own[i]), int(opp[i]),
+                                             int(squares[j])):
+            wrong.add(i)
+    return len(wrong)
+
+def main():
+    # Reads the options of the benchmark from the command line
+    parser = argparse.ArgumentParser(
+        description='Check and time the batch move generation.')
+    parser.add_argument('--boards', type=int, default=100000,
+                        help='number of positions in the batch')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the random positions')
+    args = parser.parse_args()
+
+    own, opp = random_positions(args.boards, args.seed)
+    wrong = check_against_scalar(own[:2000], opp[:2000])
+    print('Checked %d boards against the scalar rules: %d wrong'
+          % (min(args.boards, 2000), wrong))
+
+    start = time.perf_counter()
+    legal_moves(own, opp)
+    elapsed = time.perf_counter() - start
+    print('legal_moves: %d boards in %.3fs (%.0f boards/s)'
+          % (args.boards, elapsed, args.boards / elapsed))
+
+    start = time.perf_counter()
+    moves, parents = expand(own, opp)[:2]
+    elapsed = time.perf_counter() - start
+    print('expand: %d boards, %d successors in %.3fs (%.0f boards/s)'
+          % (args.boards, len(parents), elapsed, args.boards / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+
+'''
+This module contains the benchmarks of Othello game: legal move generation,
+random games, search, rendering and saving scores. Every benchmark works
+on positions and data made from a fixed seed, so two runs on the same
+machine measure the same work, and the results are written as JSON so
+that runs can be compared.
+
+Run it from the command line, e.g.
+    python bench.py --output before.json
+    python bench.py --output after.json --compare before.json
+    python bench.py --only movegen search --quick
+The rendering benchmark needs a screen (e.g. a virtual one with xvfb-run);
+without one it is reported as skipped.
+'''
+
+import argparse, json, os, platform, random, sys, tempfile, time
+import bitboard, parallel, score, search, selfplay
+from gamestate import GameState
+
+# Defines the default seed, the number of positions of the position sets,
+# the board sizes of the large boards benchmark, the depth and the time
+# budget (in seconds) of the search benchmark, the most workers of the
+# parallel search benchmark and the sizes of the scores database as
+# constants
+SEED = 0
+POSITIONS = 500
+LARGE_SIZES = [8, 12, 16, 24, 32, 48, 64]
+SEARCH_DEPTH = 4
+SEARCH_POSITIONS = 10
+SEARCH_TIME = 0.1
+PARALLEL_WORKERS = 4
+SCORE_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+def make_positions(count, seed = SEED, n = 8, wide_bitboards = True):
+    ''' Function make_positions
+        Parameters: count (integer), seed (integer, optional), n (integer,
+                    optional), wide_bitboards (boolean, optional)
+        Returns: a list of GameStates, the positions met in random games
+                 played from seed, with a legal move for the current player
+
+        Does: Takes every position of the games until count are found.
+    '''
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = GameState(n, wide_bitboards)
+        state.initialize_board()
+        while not state.is_game_over() and len(positions) < count:
+            if not state.has_legal_move():
+                state.switch_player()
+                continue
+            positions.append(state.copy())
+            state.play_move(rng.choice(state.get_legal_moves()))
+    return positions
+
+def sample_game(count, seed = SEED, n = 8):
+    ''' Function sample_game
+        Parameters: count (integer), seed (integer, optional), n (integer,
+                    optional)
+        Returns: a list of about count GameStates, spread evenly over a
+                 random game played from seed, with a legal move for the
+                 current player
+    '''
+    rng = random.Random(seed)
+    positions = []
+    state = GameState(n)
+    state.initialize_board()
+    while not state.is_game_over():
+        if not state.has_legal_move():
+            state.switch_player()
+            continue
+        positions.append(state.copy())
+        state.play_move(rng.choice(state.get_legal_moves()))
+    return positions[::max(1, len(positions) // count)]
+
+def summarize(samples):
+    ''' Function summarize
+        Parameters: samples (list of floats), times in seconds
+        Returns: a dictionary of the mean, median, 99th percentile and
+                 maximum of the samples in milliseconds
+    '''
+    samples = sorted(samples)
+    return {'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': samples[len(samples) // 2] * 1000,
+            'p99_ms': samples[min(len(samples) - 1,
+                                  len(samples) * 99 // 100)] * 1000,
+            'max_ms': samples[-1] * 1000}
+
+def bench_movegen(seed, quick):
+    ''' Function bench_movegen
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary of the positions whose legal moves are found
+                 per second: with bitboards, through GameState on an 8x8
+                 board (bitboards) and on a 10x10 board (wide bitboards and
+                 ray tables)
+    '''
+    rounds = 2 if quick else 20
+    results = {}
+    positions = make_positions(POSITIONS, seed)
+    boards = [(state.bitboards[state.current_player],
+               state.bitboards[1 - state.current_player])
+              for state in positions]
+    start = time.perf_counter()
+    for i in range(rounds):
+        for own, opp in boards:
+            bitboard.legal_moves(own, opp)
+    results['bitboard_per_s'] = rounds * len(boards) / \
+                                (time.perf_counter() - start)
+
+    for name, n, wide, n_rounds in (('gamestate', 8, True, rounds),
+                                    ('wide', 10, True, rounds),
+                                    ('list', 10, False, max(1, rounds // 10))):
+        positions = make_positions(POSITIONS, seed, n, wide)
+        start = time.perf_counter()
+        for i in range(n_rounds):
+            for state in positions:
+                # Drops the cached moves so that they are found again
+                state.legal_cache = None
+                state.get_legal_moves()
+        results[name + '_per_s'] = n_rounds * len(positions) / \
+                                   (time.perf_counter() - start)
+    return results
+
+def bench_large(seed, quick):
+    ''' Function bench_large
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary, by board size, of the time to find the legal
+                 moves of a position with wide bitboards (the bitboard
+                 module on an 8x8 board), also per square (which stays
+                 about flat if the cost grows linearly with the
+                 number of squares) and with the ray tables (from 9x9 to
+                 16x16)
+    '''
+    sizes = LARGE_SIZES[:5] if quick else LARGE_SIZES
+    results = {}
+    for n in sizes:
+        positions = sample_game(20 if quick else 100, seed, n)
+        rules = positions[0].rules
+        boards = [(state.bitboards[state.current_player],
+                   state.bitboards[1 - state.current_player])
+                  for state in positions]
+        start = time.perf_counter()
+        for own, opp in boards:
+            rules.legal_moves(own, opp)
+        elapsed = (time.perf_counter() - start) / len(boards)
+        results[str(n)] = {'wide_us': elapsed * 1000000,
+                           'wide_ns_per_square': elapsed * 1e9 / (n * n)}
+        if not positions[0].use_bitboards and n <= 16:
+            lists = []
+            for state in positions:
+                other = GameState(n, False)
+                other.board = [row[:] for row in state.board]
+                other.cells = [tile for row in state.board for tile in row]
+                lists.append(other)
+            start = time.perf_counter()
+            for state in lists:
+                state.legal_cache = None
+                state.get_legal_cache(0)
+            elapsed = (time.perf_counter() - start) / len(lists)
+            results[str(n)]['lists_us'] = elapsed * 1000000
+    return results
+
+def bench_games(seed, quick):
+    ''' Function bench_games
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary of the random games played per second on
+                 8x8 and 10x10 boards
+    '''
+    games = 20 if quick else 200
+    results = {}
+    for n in (8, 10):
+        start = time.perf_counter()
+        for game in range(games):
+            selfplay.play_game((game, seed + game, 'random', 'random', n))
+        results['games_%d_per_s' % n] = games / (time.perf_counter() - start)
+    return results
+
+def bench_search(seed, quick):
+    ''' Function bench_search
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary of the nodes searched per second to a fixed
+                 depth from midgame positions, the total nodes (which
+                 only change when the search itself changes), and the
+                 deepest iteration completed within SEARCH_TIME on the same
+                 positions (mean and smallest)
+    '''
+    depth = SEARCH_DEPTH - 1 if quick else SEARCH_DEPTH
+    positions = [state for state in make_positions(POSITIONS, seed)
+                 if 20 <= sum(state.num_tiles) <= 40][:SEARCH_POSITIONS]
+    searcher = search.Searcher(None, None, depth, endgame_empties=0)
+    nodes = 0
+    elapsed = 0.0
+    for state in positions:
+        searcher.table.clear()
+        result = searcher.search(state)
+        nodes += result.nodes
+        elapsed += result.elapsed
+
+    timed = search.Searcher(SEARCH_TIME, None, search.MAX_DEPTH,
+                            endgame_empties=0)
+    depths = []
+    for state in positions:
+        timed.table.clear()
+        depths.append(timed.search(state).depth)
+    return {'depth': depth, 'nodes': nodes,
+            'nodes_per_s': nodes / elapsed if elapsed > 0 else 0.0,
+            'timed_ms': SEARCH_TIME * 1000,
+            'timed_depth_mean': sum(depths) / len(depths),
+            'timed_depth_min': min(depths)}
+
+def bench_parallel(seed, quick):
+    ''' Function bench_parallel
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary of the wall-clock time to search midgame
+                 positions to a fixed depth with one Searcher and with a
+                 ParallelSearcher, the speedup, and the nodes searched by
+                 each (with the number of workers and of cores, as there
+                 is no speedup to expect from a single core)
+    '''
+    depth = SEARCH_DEPTH if quick else SEARCH_DEPTH + 2
+    positions = [state for state in make_positions(POSITIONS, seed)
+                 if 20 <= sum(state.num_tiles) <= 40][:SEARCH_POSITIONS]
+    cores = os.cpu_count() or 1
+    workers = max(2, min(PARALLEL_WORKERS, cores))
+
+    searcher = search.Searcher(None, None, depth, endgame_empties=0)
+    nodes = 0
+    start = time.perf_counter()
+    for state in positions:
+        nodes += searcher.search(state).nodes
+    serial = time.perf_counter() - start
+
+    searcher = parallel.ParallelSearcher(workers, None, None, depth)
+    try:
+        # Waits for the workers to start before timing them
+        searcher.pool.map(abs, range(workers))
+        parallel_nodes = 0
+        start = time.perf_counter()
+        for state in positions:
+            parallel_nodes += searcher.search(state).nodes
+        elapsed = time.perf_counter() - start
+    finally:
+        searcher.close()
+    return {'depth': depth, 'workers': workers, 'cores': cores,
+            'serial_s': serial, 'parallel_s': elapsed,
+            'speedup': serial / elapsed if elapsed > 0 else 0.0,
+            'serial_nodes': nodes, 'parallel_nodes': parallel_nodes}
+
+def bench_render(seed, quick):
+    ''' Function bench_render
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary of the time to draw a move (the new tile and
+                 the animations of the flipped ones) and to show it, or of
+                 the reason the benchmark was skipped
+    '''
+    try:
+        import turtle
+        from board import Board
+        turtle.tracer(0)
+    except Exception as error:
+        return {'skipped': str(error).splitlines()[0]}
+    games = 1 if quick else 5
+    rng = random.Random(seed)
+    board = Board(8)
+    board.setup_screen()
+    samples = []
+    for game in range(games):
+        board.clear_tiles()
+        state = GameState(8)
+        for square in state.initialize_board():
+            board.draw_tile(square, state.board[square[0]][square[1]] - 1)
+        turtle.update()
+        while not state.is_game_over():
+            if not state.has_legal_move():
+                state.switch_player()
+                continue
+            player = state.current_player
+            move = rng.choice(state.get_legal_moves())
+            start = time.perf_counter()
+            flipped = state.play_move(move)
+            board.draw_tile(move, player)
+            for square in flipped:
+                for step in board.animate_flip(square, player):
+                    pass
+            turtle.update()
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def bench_scores(seed, quick):
+    ''' Function bench_scores
+        Parameters: seed (integer), quick (boolean)
+        Returns: a dictionary with, for every size of the scores database,
+                 the latency of inserting one score with ScoreStore.add and
+                 with score.update_scores (which locks and spools)
+    '''
+    rng = random.Random(seed)
+    sizes = SCORE_SIZES[:2] if quick else SCORE_SIZES
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, 'scores.db')
+        store = score.ScoreStore(filename)
+        for size in sizes:
+            missing = size - len(store)
+            store.add_many([('player%d' % rng.randrange(1000),
+                             rng.randrange(65)) for i in range(missing)])
+            samples = []
+            for i in range(100):
+                start = time.perf_counter()
+                store.add('bench', rng.randrange(65))
+                samples.append(time.perf_counter() - start)
+            results['add_%d' % size] = summarize(samples)
+            samples = []
+            for i in range(20):
+                start = time.perf_counter()
+                score.update_scores('bench', rng.randrange(65), filename,
+                                    os.path.join(folder, 'scores.txt'))
+                samples.append(time.perf_counter() - start)
+            results['update_scores_%d' % size] = summarize(samples)
+        store.close()
+    return results
+
+# Defines the benchmarks by name, in the order they run, as constant
+BENCHMARKS = {'movegen': bench_movegen, 'large': bench_large,
+              'games': bench_games,
+              'search': bench_search, 'parallel': bench_parallel,
+              'render': bench_render,
+              'scores': bench_scores}
+
+def run(names, seed = SEED, quick = False):
+    ''' Function run
+        Parameters: names (list of strings), seed (integer, optional),
+                    quick (boolean, optional)
+        Returns: a dictionary, the results of the benchmarks by name and
+                 the description of the run under 'meta'
+    '''
+    report = {'meta': {'seed': seed, 'quick': quick,
+                       'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'time': time.strftime('%Y-%m-%dT%H:%M:%S')}}
+    for name in names:
+        print('running %s...' % name, file=sys.stderr)
+        report[name] = BENCHMARKS[name](seed, quick)
+    return report
+
+def compare(old, new):
+    ''' Function compare
+        Parameters: old (dictionary), new (dictionary), two reports
+        Returns: a list of strings, one line per number found in both
+                 reports, with the ratio new / old
+    '''
+    lines = []
+    for name, results in new.items():
+        if name == 'meta' or name not in old:
+            continue
+        for key, value in flatten(results).items():
+            before = flatten(old[name]).get(key)
+            if isinstance(before, (int, float)) and before:
+                lines.append('%s.%s: %.4g -> %.4g (x%.2f)'
+                             % (name, key, before, value, value / before))
+    return lines
+
+def flatten(results, prefix = ''):
+    ''' Function flatten
+        Parameters: results (dictionary), prefix (string, optional)
+        Returns: a dictionary of the numbers of results, nested keys
+                 joined with dots
+    '''
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + '.'))
+        elif isinstance(value, (int, float)):
+            flat[prefix + key] = value
+    return flat
+
+def main():
+    # Reads the benchmarks to run from the command line
+    parser = argparse.ArgumentParser(description='Run the benchmarks.')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS),
+                        default=list(BENCHMARKS),
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--seed', type=int, default=SEED,
+                        help='seed of the positions and data')
+    parser.add_argument('--quick', action='store_true',
+                        help='smaller runs, for a quick check')
+    parser.add_argument('--output',
+                        help='JSON file to write the results to '
+                             '(default: standard output)')
+    parser.add_argument('--compare',
+                        help='JSON file of an earlier run to compare with')
+    args = parser.parse_args()
+
+    report = run(args.only, args.seed, args.quick)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            outfile.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as infile:
+            old = json.load(infile)
+        for line in compare(old, report):
+            print(line, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+
+'''
+This module contains the bitboard rules core used by Othello game.
+
+A position on the 8x8 board is stored as two 64-bit integers, one for
+each player. Bit (row * 8 + col) of a player's integer is set if that
+player has a tile on square (row, col).
+'''
+
+# Defines the size of the board the bitboards describe and the mask of
+# all 64 squares as constants
+SIZE = 8
+FULL = (1 << 64) - 1
+
+# Define all the possible directions in which a player's move can flip
+# their adversary's tiles as constant (0 – the current row/column,
+# +1 – the next row/column, -1 – the previous row/column)
+MOVE_DIRS = [(-1, -1), (-1, 0), (-1, +1),
+             (0, -1),           (0, +1),
+             (+1, -1), (+1, 0), (+1, +1)]
+
+# Masks that clear the column a tile wraps into after a horizontal shift
+NOT_FIRST_COL = FULL & ~0x0101010101010101
+NOT_LAST_COL = FULL & ~0x8080808080808080
+
+# Defines every direction in MOVE_DIRS as the number of bits to shift
+# (positive towards higher squares) and the mask applied after shifting
+SHIFTS = [(-9, NOT_LAST_COL), (-8, FULL), (-7, NOT_FIRST_COL),
+          (-1, NOT_LAST_COL),             (+1, NOT_FIRST_COL),
+          (+7, NOT_LAST_COL), (+8, FULL), (+9, NOT_FIRST_COL)]
+
+def shift(bb, amount, mask):
+    ''' Function shift
+        Parameters: bb (integer), amount (integer), mask (integer)
+        Returns: an integer, the shifted bitboard
+
+        Does: Moves every tile of bb one square in the direction given by
+              amount, dropping tiles that fall off the board.
+    '''
+    if amount > 0:
+        return (bb << amount) & mask
+    return (bb >> -amount) & mask
+
+def legal_moves(own, opp):
+    ''' Function legal_moves
+        Parameters: own (integer), opp (integer)
+        Returns: an integer with one bit set for every legal move
+
+        Does: Finds all the squares where the player owning the tiles in
+              own can move, using a shift-and-mask flood fill along every
+              direction through the adversary's tiles in opp.
+    '''
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for amount, mask in SHIFTS:
+        if amount > 0:
+            x = (own << amount) & mask & opp
+            x |= (x << amount) & mask & opp
+            x |= (x << amount) & mask & opp
+            x |= (x << amount) & mask & opp
+            x |= (x << amount) & mask & opp
+            x |= (x << amount) & mask & opp
+            moves |= (x << amount) & mask & empty
+        else:
+            amount = -amount
+            x = (own >> amount) & mask & opp
+            x |= (x >> amount) & mask & opp
+            x |= (x >> amount) & mask & opp
+            x |= (x >> amount) & mask & opp
+            x |= (x >> amount) & mask & opp
+            x |= (x >> amount) & mask & opp
+            moves |= (x >> amount) & mask & empty
+    return moves
+
+def flips_in_direction(own, opp, square, amount, mask):
+    ''' Function flips_in_direction
+        Parameters: own (integer), opp (integer), square (integer),
+                    amount (integer), mask (integer)
+        Returns: an integer with one bit set for every tile to flip
+
+        Does: Finds the adversary's tiles flipped along one direction
+              (one (amount, mask) pair of SHIFTS) by a move on square.
+    '''
+    line = 0
+    x = shift(1 << square, amount, mask)
+    while x & opp:
+        line |= x
+        x = shift(x, amount, mask)
+    if x & own:
+        return line
+    return 0
+
+def flips(own, opp, square):
+    ''' Function flips
+        Parameters: own (integer), opp (integer), square (integer)
+        Returns: an integer with one bit set for every tile to flip
+
+        Does: Finds all the adversary's tiles flipped by a move on square.
+              Returns 0 if the move flips nothing (i.e, it is not legal).
+    '''
+    flipped = 0
+    for amount, mask in SHIFTS:
+        flipped |= flips_in_direction(own, opp, square, amount, mask)
+    return flipped
+
+def count(bb):
+    ''' Function count
+        Parameters: bb (integer)
+        Returns: an integer, the number of tiles in bb
+    '''
+    return bb.bit_count()
+
+def squares(bb):
+    ''' Function squares
+        Parameters: bb (integer)
+        Returns: a list of integers, the set squares of bb in ascending order
+    '''
+    result = []
+    while bb:
+        low = bb & -bb
+        result.append(low.bit_length() - 1)
+        bb ^= low
+    return result
+
+def to_square(row, col):
+    ''' Function to_square
+        Parameters: row (integer), col (integer)
+        Returns: an integer, the bit index of square (row, col)
+    '''
+    return row * SIZE + col
+
+def to_coord(square):
+    ''' Function to_coord
+        Parameters: square (integer)
+        Returns: a tuple of integers (row, col) for the bit index square
+    '''
+    return divmod(square, SIZE)
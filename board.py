@@ -1,10 +1,17 @@
 
 import turtle
 
-# Defines sizes of the square and tile, colors of the board, line, 
-# and tile as constants
+# Defines sizes of the square and tile, the largest size of the board on 
+# the screen, colors of the board, line, and tile, the radius of the 
+# turtle's 'circle' shape, the size of the dots highlighting moves, and the 
+# widths of a flipping tile in the frames of its animation (the color 
+# changes at the thinnest) as constants
 SQUARE = 50
 TILE = 20
+BOARD_PIXELS = 600
+HIGHLIGHT_DOT = 10
+SHAPE_RADIUS = 10
+FLIP_WIDTHS = [0.7, 0.4, 0.1, 0.4, 0.7, 1.0]
 BOARD_COLOR = 'forest green'
 LINE_COLOR = 'black'
 TILE_COLORS = ['black', 'white']
@@ -14,20 +21,27 @@ class Board:
         Attributes: n, an integer for number of squares for a row/column
                     board, a nested list which stores the state of the board
                     (0 for no tile, 1 for black tiles and 2 for white tiles)
-                    square_size, an integer for size of the squares
+                    square_size, an integer for size of the squares (smaller 
+                    than SQUARE on boards too large for BOARD_PIXELS)
                     board_color, a string for color of the board
                     line_color, a string for color of the lines of the board
                     tile_size, an integer for size of the radius of the tile
                     tile_colors, a list of strings for colors of the tile
                     move, a tuple for coordinates of the player's next move
+                    tile_turtles, a nested list of the turtles showing the 
+                    tile of every square (None until a tile is drawn there)
+                    board_turtle, the turtle which drew the board (None 
+                    until it is drawn)
         n (integer) is required in the __init__ function
         board (list), square_size (integer), board_color (string), 
         line_color (string), tile_size (integer), tile_colors (list), 
-        move (tuple) are not taken in the __init__
+        move (tuple), tile_turtles (list), board_turtle are not taken in 
+        the __init__
 
-        Methods: draw_board, draw_lines, is_on_board, is_on_line, 
-                 convert_coord, get_coord, get_tile_start_pos, draw_tile, 
-                 __str__ and __eq__
+        Methods: draw_board, setup_screen, draw_lines, is_on_board, is_on_line, 
+                 convert_coord, get_coord, get_tile_start_pos, 
+                 get_square_center, get_tile_turtle, draw_tile, 
+                 clear_tiles, animate_flip, __str__ and __eq__
     '''
 
     def __init__(self, n):
@@ -37,12 +51,14 @@ class Board:
         '''
         self.n = n
         self.board = [[0] * n for i in range(n)]
-        self.square_size = SQUARE
+        self.square_size = max(2, min(SQUARE, BOARD_PIXELS // max(n, 1)))
         self.board_color = BOARD_COLOR
         self.line_color = LINE_COLOR
-        self.tile_size = TILE
+        self.tile_size = max(1, TILE * self.square_size // SQUARE)
         self.tile_colors = TILE_COLORS
         self.move = ()
+        self.tile_turtles = [[None] * n for i in range(n)]
+        self.board_turtle = None
         self.info_turtle = None
         self.highlight_turtle = None
 
@@ -54,14 +70,13 @@ class Board:
             Does: Draws an nxn board. Color of the board and lines are set 
                   to self.board_color and self.line_color respectively.
         '''
-        # Increase height for UI area
-        turtle.setup(self.n * self.square_size + self.square_size + 100, 
-                    self.n * self.square_size + self.square_size + 100)
-        turtle.screensize(self.n * self.square_size, self.n * self.square_size + 100)
+        self.setup_screen()
         turtle.bgcolor('white')
 
-        # Create the turtle to draw the board
+        # Create the turtle to draw the board, kept so that its drawings 
+        # can be hidden and shown again
         othello = turtle.Turtle(visible = False)
+        self.board_turtle = othello
         othello.penup()
         othello.speed(0)
         othello.hideturtle()
@@ -104,6 +119,17 @@ class Board:
         self.highlight_turtle.speed(0)
         self.highlight_turtle.color('blue') # Highlight color
 
+    def setup_screen(self):
+        ''' Method: setup_screen
+            Parameters: self
+            Returns: nothing
+            Does: Sizes the window to fit the board and the UI area.
+        '''
+        # Increase height for UI area
+        turtle.setup(self.n * self.square_size + self.square_size + 100, 
+                    self.n * self.square_size + self.square_size + 100)
+        turtle.screensize(self.n * self.square_size, self.n * self.square_size + 100)
+
     def draw_lines(self, turt):
         ''' Method: draw_lines
             Parameters: self, turt (turtle object)
@@ -143,7 +169,9 @@ class Board:
                   on the screen.
         '''
         if self.is_on_board(x, y):   
-            if x % self.square_size == 0 or y % self.square_size == 0:
+            bound = self.n / 2 * self.square_size
+            if (x + bound) % self.square_size == 0 or \
+               (y + bound) % self.square_size == 0:
                 return True
         return False
 
@@ -158,8 +186,9 @@ class Board:
                   on one of the squares of the board.
         '''
         if self.is_on_board(x, y):
-            row = int(self.n / 2 - 1 - y // self.square_size)
-            col = int(self.n / 2 + x // self.square_size)
+            bound = self.n / 2 * self.square_size
+            row = int((bound - y) // self.square_size)
+            col = int((x + bound) // self.square_size)
             return (row, col)
         return ()
 
@@ -209,45 +238,87 @@ class Board:
         
         return ((x, y), r)
 
+    def get_square_center(self, square):
+        ''' Method: get_square_center
+            Parameters: self, square (tuple of integers)
+            Returns: a tuple containing the (x, y) coordinates of the 
+                     center of the square
+        '''
+        row, col = square
+        x = (col - (self.n - 1) / 2) * self.square_size
+        y = ((self.n - 1) / 2 - row) * self.square_size
+        return (x, y)
+
+    def get_tile_turtle(self, square):
+        ''' Method: get_tile_turtle
+            Parameters: self, square (tuple of integers)
+            Returns: the turtle showing the tile of the square
+            Does: Creates the turtle the first time a tile is drawn on the 
+                  square: a hidden 'circle' shaped turtle, stretched to the 
+                  size of a tile and standing on the center of the square. 
+                  It is then reused for every tile drawn there.
+        '''
+        row, col = square
+        tile = self.tile_turtles[row][col]
+        if tile is None:
+            tile = turtle.Turtle(shape = 'circle', visible = False)
+            tile.penup()
+            tile.speed(0)
+            tile.shapesize(self.tile_size / SHAPE_RADIUS)
+            tile.setposition(self.get_square_center(square))
+            self.tile_turtles[row][col] = tile
+        return tile
+
     def draw_tile(self, square, color):
         ''' Method: draw_tile
             Parameters: self, square (tuple of integers), color (integer)
             Returns: nothing
             Does: Draws a tile of a specific color on the board 
-                  using turtle graphics.
+                  using turtle graphics. Every square has one tile turtle, 
+                  so drawing over a tile (e.g. flipping it) only changes 
+                  the color of the turtle.
                 
                   About the input: square is the (row, col) of the square in 
                   which the tile is drawn; color is an integer 0 or 1 to 
                   represent the 1st or 2nd color in the list of colors 
                   (self.colors) to use.
         '''
-        # Get starting position and radius of the tile
-        pos = self.get_tile_start_pos(square)
-        if pos:
-            coord = pos[0]
-            r = pos[1]
-        else:
+        if not self.get_tile_start_pos(square):
             print('Error drawing the tile...')
             return
-        
-        # Create the turtle to draw the tile
-        tile = turtle.Turtle(visible = False)
-        tile.penup()
-        tile.speed(0)
-        tile.hideturtle()
 
-        # Set color of the tile
+        tile = self.get_tile_turtle(square)
         tile.color(self.tile_colors[color])
+        tile.showturtle()
 
-        # Move the turtle to the starting postion for drawing
-        tile.setposition(coord)
-        tile.setheading(90)
-        
-        # Draw the tile
-        tile.begin_fill()
-        tile.pendown()
-        tile.circle(r)
-        tile.end_fill()
+    def clear_tiles(self):
+        ''' Method: clear_tiles
+            Parameters: self
+            Returns: nothing
+            Does: Hides the tile of every square, keeping the turtles to 
+                  draw the tiles of the next game.
+        '''
+        for row in self.tile_turtles:
+            for tile in row:
+                if tile is not None:
+                    tile.hideturtle()
+
+    def animate_flip(self, square, color):
+        ''' Method: animate_flip
+            Parameters: self, square (tuple of integers), color (integer)
+            Returns: an iterator doing one frame of the animation every 
+                     time it is advanced (see animation.FrameScheduler)
+            Does: Flips the tile of the square to the color: squeezes the 
+                  tile turtle, changes its color and widens it again.
+        '''
+        tile = self.get_tile_turtle(square)
+        stretch = self.tile_size / SHAPE_RADIUS
+        thinnest = FLIP_WIDTHS.index(min(FLIP_WIDTHS))
+        for i in range(len(FLIP_WIDTHS)):
+            if i == thinnest:
+                tile.color(self.tile_colors[color])
+            tile.shapesize(stretch, stretch * FLIP_WIDTHS[i])
+            yield
 
     def draw_info(self, current_player, num_tiles):
         ''' Method: draw_info
@@ -302,8 +373,9 @@ class Board:
                 # Center y
                 center_y = (self.n / 2 - row - 0.5) * self.square_size
                 
-                self.highlight_turtle.setposition(center_x, center_y - 5) # Adjust for dot size
-                self.highlight_turtle.dot(10, "blue")
+                dot = max(3, HIGHLIGHT_DOT * self.square_size // SQUARE)
+                self.highlight_turtle.setposition(center_x, center_y - dot / 2) # Adjust for dot size
+                self.highlight_turtle.dot(dot, "blue")
 
     def clear_highlights(self):
         if self.highlight_turtle:
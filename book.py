@@ -0,0 +1,212 @@
+
+'''
+This module contains the opening book of Othello game: a builder that
+searches every position of the first plies of the game and writes the
+scores of their moves to a binary file, and a reader that looks positions
+up in that file.
+
+The file is a header followed by fixed-size records (position hash, score,
+move) sorted by hash, so the reader can memory-map it and find a position
+by binary search without loading it. Several processes reading the same
+book share one copy of it in the page cache.
+
+Run this module to build a book, e.g. python book.py --plies 6 --depth 4
+'''
+
+import argparse, mmap, struct, time, bitboard, position, search
+from gamestate import GameState
+
+# Defines the default file name of the book, the header and record
+# formats, and the default plies and search depth of the builder as
+# constants
+BOOK_FILE = 'book.bin'
+MAGIC = b'OTHBOOK2'
+HEADER = struct.Struct('<8sII')  # magic, record size, number of records
+RECORD = struct.Struct('<QiBxxx')  # hash, score, square, padding
+PLIES = 6
+DEPTH = 4
+
+def build_book(filename = BOOK_FILE, plies = PLIES, depth = DEPTH):
+    ''' Function build_book
+        Parameters: filename (string, optional), plies (integer, optional),
+                    depth (integer, optional)
+        Returns: an integer, the number of positions written
+
+        Does: Visits every position reachable from the start of the game
+              in fewer than plies moves, searches every legal move of each
+              one to the given depth, and writes one record per move to
+              the book file, sorted by position hash.
+    '''
+    searcher = search.Searcher(None, None, depth, search.TT_SIZE_MB, 0)
+    records = []
+    seen = set()
+    start = GameState()
+    start.initialize_board()
+    frontier = [start]
+    for ply in range(plies):
+        next_frontier = []
+        for state in frontier:
+            key = position.from_state(state)
+            if key in seen:
+                continue
+            seen.add(key)
+            if not state.has_legal_move():
+                state.switch_player()
+                if not state.has_legal_move():
+                    continue
+            records += score_moves(searcher, state, depth)
+            for move in state.get_legal_moves():
+                child = state.copy()
+                child.play_move(move)
+                next_frontier.append(child)
+        frontier = next_frontier
+
+    records.sort()
+    write_book(filename, records)
+    return len(seen)
+
+def score_moves(searcher, state, depth):
+    ''' Function score_moves
+        Parameters: searcher (Searcher), state (GameState), depth (integer)
+        Returns: a list of tuples (hash, score, square), one for every
+                 legal move of the current player of state
+
+        Does: Searches every legal move to the given depth. Scores are for
+              the player making the move.
+    '''
+    color = state.current_player
+    own = state.bitboards[color]
+    opp = state.bitboards[1 - color]
+    searcher.nodes = 0
+    searcher.deadline = None
+    records = []
+    for square in bitboard.squares(bitboard.legal_moves(own, opp)):
+        flipped = bitboard.flips(own, opp, square)
+        score = -searcher.negamax(opp & ~flipped,
+                                  own | flipped | 1 << square,
+                                  depth - 1, -search.INFINITY,
+                                  search.INFINITY,
+                                  search.child_key(state.hash_key, color,
+                                                   square, flipped),
+                                  1 - color)
+        records.append((state.hash_key, score, square))
+    return records
+
+def write_book(filename, records):
+    ''' Function write_book
+        Parameters: filename (string), records (list of tuples)
+        Returns: nothing
+
+        Does: Writes the header and the (hash, score, square) records, in
+              the given order, to the book file.
+    '''
+    with open(filename, 'wb') as outfile:
+        outfile.write(HEADER.pack(MAGIC, RECORD.size, len(records)))
+        for key, score, square in records:
+            outfile.write(RECORD.pack(key, score, square))
+
+class OpeningBook:
+    ''' OpeningBook class.
+        Attributes: filename, a string for the name of the book file
+                    data, the memory map of the file
+                    count, an integer for the number of records
+        filename (string) is optional in the __init__ function
+        data and count are not taken in the __init__
+
+        Methods: lookup, best_move, close and __len__
+    '''
+
+    def __init__(self, filename = BOOK_FILE):
+        '''
+            Initilizes the attributes and maps the file into memory.
+            Raises ValueError if the file is not a book.
+        '''
+        self.filename = filename
+        with open(filename, 'rb') as infile:
+            self.data = mmap.mmap(infile.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        magic, record_size, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or record_size != RECORD.size or \
+           len(self.data) != HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError('%s is not an opening book' % filename)
+
+    def lookup(self, key):
+        ''' Method: lookup
+            Parameters: self, key (integer)
+            Returns: a list of tuples (square, score) for the moves stored
+                     for the position with the hash key (empty if none)
+            Does: Finds the first record of the position by binary search,
+                  then reads the following records with the same hash.
+        '''
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = RECORD.unpack_from(
+                self.data, HEADER.size + middle * RECORD.size)[0]
+            if middle_key < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        while low < self.count:
+            record_key, score, square = RECORD.unpack_from(
+                self.data, HEADER.size + low * RECORD.size)
+            if record_key != key:
+                break
+            moves.append((square, score))
+            low += 1
+        return moves
+
+    def best_move(self, state):
+        ''' Method: best_move
+            Parameters: self, state (GameState)
+            Returns: a tuple (move, score), the best book move (row, col)
+                     of the current player of state and its score, or None
+                     if the position is not in the book
+        '''
+        if not state.use_bitboards:
+            return None
+        legal = state.legal_move_mask()
+        best = None
+        for square, score in self.lookup(state.hash_key):
+            # Ignore moves that are not legal here in case of a hash
+            # collision
+            if legal >> square & 1 and (best is None or score > best[1]):
+                best = (bitboard.to_coord(square), score)
+        return best
+
+    def close(self):
+        ''' Method: close
+            Parameters: self
+            Returns: nothing
+            Does: Unmaps the file.
+        '''
+        self.data.close()
+
+    def __len__(self):
+        '''
+            Returns the number of records in the book.
+        '''
+        return self.count
+
+def main():
+    # Reads the options of the builder from the command line
+    parser = argparse.ArgumentParser(description='Build an opening book.')
+    parser.add_argument('--output', default=BOOK_FILE,
+                        help='file to write the book to')
+    parser.add_argument('--plies', type=int, default=PLIES,
+                        help='number of opening moves to cover')
+    parser.add_argument('--depth', type=int, default=DEPTH,
+                        help='search depth of every book move')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    positions = build_book(args.output, args.plies, args.depth)
+    print('Wrote %d positions to %s in %.1fs'
+          % (positions, args.output, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+
+'''
+This module contains the endgame solver of Othello game. When only a few
+squares are left empty, it searches every line to the end of the game and
+returns the exact final tile difference and the best move.
+
+The solver is specialised for speed: with many empties, moves that leave
+the adversary the fewest replies are tried first (fastest-first); with few
+empties, moves in regions of the board with an odd number of empties are
+tried first (parity); the last 3, 2 and 1 empties are solved by looking at
+the empty squares directly instead of generating moves.
+
+A solve cannot be bounded by time, but it can be stopped: every few
+thousand nodes the solver asks its should_stop function, and gives up
+with SolveStopped if it returns True (e.g. when the game stops pondering).
+'''
+
+import time, bitboard
+
+# Defines the default number of empties below which the game is solved,
+# the number of empties from which fastest-first ordering is used
+# instead of parity ordering, and the number of nodes between two checks
+# of should_stop as constants
+ENDGAME_EMPTIES = 10
+FASTEST_FIRST_EMPTIES = 7
+STOP_CHECK_NODES = 4096
+
+# Defines the four 4x4 quadrants of the board used for parity ordering
+QUADRANTS = [0x0F0F0F0F, 0xF0F0F0F0,
+             0x0F0F0F0F00000000, 0xF0F0F0F000000000]
+CORNERS = 0x8100000000000081
+
+def final_score(own, opp):
+    ''' Function final_score
+        Parameters: own (integer), opp (integer)
+        Returns: an integer, the final tile difference for the owner of
+                 the tiles in own, with the empty squares given to the
+                 winner
+    '''
+    diff = own.bit_count() - opp.bit_count()
+    empties = bitboard.SIZE * bitboard.SIZE - own.bit_count() - \
+              opp.bit_count()
+    if diff > 0:
+        return diff + empties
+    elif diff < 0:
+        return diff - empties
+    return 0
+
+def parity_order(moves, empty):
+    ''' Function parity_order
+        Parameters: moves (integer), empty (integer)
+        Returns: a list of integers, the squares of moves to try in order
+
+        Does: Orders the moves in quadrants with an odd number of empties
+              before the others, corners first within each group.
+    '''
+    odd = 0
+    for quadrant in QUADRANTS:
+        if (empty & quadrant).bit_count() & 1:
+            odd |= quadrant
+    return bitboard.squares(moves & odd & CORNERS) + \
+           bitboard.squares(moves & odd & ~CORNERS) + \
+           bitboard.squares(moves & ~odd & CORNERS) + \
+           bitboard.squares(moves & ~odd & ~CORNERS)
+
+class SolveStopped(Exception):
+    ''' Raised inside the solver when should_stop asks it to stop. '''
+
+class EndgameSolver:
+    ''' EndgameSolver class.
+        Attributes: max_empties, an integer for the largest number of
+                    empties the solver is used for
+                    nodes, an integer for the nodes searched so far
+                    solved, an integer for the positions solved so far
+                    solve_time, a float for the time spent solving them
+                    in seconds
+                    should_stop, a function called without parameters
+                    every STOP_CHECK_NODES nodes, returning True to stop
+                    the solve (None to never stop)
+                    next_check, an integer for the node count of the next
+                    call of should_stop
+        max_empties (integer) and should_stop (function) are optional in
+        the __init__ function; nodes, solved, solve_time and next_check
+        are not taken in the __init__
+
+        Methods: can_solve, solve, solve_root, order_moves, solve_node,
+                 solve_last3, solve_last2, solve_last1 and
+                 positions_per_second
+    '''
+
+    def __init__(self, max_empties = ENDGAME_EMPTIES, should_stop = None):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        self.max_empties = max_empties
+        self.nodes = 0
+        self.solved = 0
+        self.solve_time = 0.0
+        self.should_stop = should_stop
+        self.next_check = 0
+
+    def can_solve(self, own, opp):
+        ''' Method: can_solve
+            Parameters: self, own (integer), opp (integer)
+            Returns: boolean (True if the position has few enough empties
+                     to be solved, False otherwise)
+        '''
+        return bitboard.SIZE * bitboard.SIZE - (own | opp).bit_count() \
+               <= self.max_empties
+
+    def solve(self, state):
+        ''' Method: solve
+            Parameters: self, state (GameState)
+            Returns: a tuple (move, score), the best move (row, col) of
+                     the current player, or () if they have to pass, and
+                     the exact final tile difference for them
+            Does: Raises SolveStopped if should_stop stops the solve.
+        '''
+        own = state.bitboards[state.current_player]
+        opp = state.bitboards[1 - state.current_player]
+        score, square = self.solve_root(own, opp)
+        if square < 0:
+            return (), score
+        return bitboard.to_coord(square), score
+
+    def solve_root(self, own, opp):
+        ''' Method: solve_root
+            Parameters: self, own (integer), opp (integer)
+            Returns: a tuple (score, square), the exact final tile
+                     difference and the best square (-1 if the player
+                     has to pass)
+            Does: Solves the position and updates the statistics. Raises
+                  SolveStopped if should_stop stops the solve.
+        '''
+        start = time.perf_counter()
+        self.next_check = self.nodes + STOP_CHECK_NODES
+        moves = bitboard.legal_moves(own, opp)
+        best_square = -1
+        if not moves:
+            score = self.solve_node(own, opp, -64, 64, False)
+        else:
+            score = -65
+            for square in self.order_moves(own, opp, moves):
+                flipped = bitboard.flips(own, opp, square)
+                value = -self.solve_node(opp & ~flipped,
+                                         own | flipped | 1 << square,
+                                         -64, -score, False)
+                if value > score:
+                    score = value
+                    best_square = square
+        self.solved += 1
+        self.solve_time += time.perf_counter() - start
+        return score, best_square
+
+    def order_moves(self, own, opp, moves):
+        ''' Method: order_moves
+            Parameters: self, own (integer), opp (integer), moves (integer)
+            Returns: a list of integers, the squares of moves to try in order
+            Does: Uses fastest-first ordering (fewest replies for the
+                  adversary first) when there are many empties, and parity
+                  ordering otherwise.
+        '''
+        empty = ~(own | opp) & bitboard.FULL
+        if empty.bit_count() < FASTEST_FIRST_EMPTIES:
+            return parity_order(moves, empty)
+        scored = []
+        for square in bitboard.squares(moves):
+            flipped = bitboard.flips(own, opp, square)
+            replies = bitboard.legal_moves(opp & ~flipped,
+                                           own | flipped | 1 << square)
+            # Corners are worth about two replies less
+            scored.append((replies.bit_count() * 2 -
+                           (CORNERS >> square & 1) * 4, square))
+        scored.sort()
+        return [square for weight, square in scored]
+
+    def solve_node(self, own, opp, alpha, beta, passed):
+        ''' Method: solve_node
+            Parameters: self, own (integer), opp (integer), alpha (integer),
+                        beta (integer), passed (boolean)
+            Returns: an integer, the exact final tile difference for the
+                     player to move if it is between alpha and beta, or a
+                     bound otherwise
+            Does: Searches the position to the end of the game with
+                  alpha-beta pruning. passed is True if the adversary has
+                  just passed.
+        '''
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.next_check = self.nodes + STOP_CHECK_NODES
+            if self.should_stop is not None and self.should_stop():
+                raise SolveStopped()
+        empty = ~(own | opp) & bitboard.FULL
+        num_empties = empty.bit_count()
+        if num_empties == 3:
+            return self.solve_last3(own, opp, alpha, beta, empty)
+        elif num_empties == 2:
+            return self.solve_last2(own, opp, alpha, beta, empty)
+        elif num_empties == 1:
+            return self.solve_last1(own, opp, empty.bit_length() - 1)
+        elif num_empties == 0:
+            return own.bit_count() - opp.bit_count()
+
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            if passed:
+                return final_score(own, opp)
+            return -self.solve_node(opp, own, -beta, -alpha, True)
+
+        best = -65
+        for square in self.order_moves(own, opp, moves):
+            flipped = bitboard.flips(own, opp, square)
+            score = -self.solve_node(opp & ~flipped,
+                                     own | flipped | 1 << square,
+                                     -beta, -alpha, False)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def solve_last3(self, own, opp, alpha, beta, empty, passed = False):
+        ''' Method: solve_last3
+            Parameters: self, own (integer), opp (integer), alpha (integer),
+                        beta (integer), empty (integer), passed (boolean,
+                        optional)
+            Returns: an integer, the exact final tile difference for the
+                     player to move (or a bound, as in solve_node)
+            Does: Solves a position with 3 empties by trying the empty
+                  squares directly, the one alone in its quadrant first.
+        '''
+        self.nodes += 1
+        squares = parity_order(empty, empty)
+        best = -65
+        for square in squares:
+            flipped = bitboard.flips(own, opp, square)
+            if flipped:
+                score = -self.solve_last2(opp & ~flipped,
+                                          own | flipped | 1 << square,
+                                          -beta, -alpha,
+                                          empty & ~(1 << square))
+                if score > best:
+                    best = score
+                    if score > alpha:
+                        alpha = score
+                        if alpha >= beta:
+                            return best
+        if best == -65:
+            if passed:
+                return final_score(own, opp)
+            return -self.solve_last3(opp, own, -beta, -alpha, empty, True)
+        return best
+
+    def solve_last2(self, own, opp, alpha, beta, empty, passed = False):
+        ''' Method: solve_last2
+            Parameters: self, own (integer), opp (integer), alpha (integer),
+                        beta (integer), empty (integer), passed (boolean,
+                        optional)
+            Returns: an integer, the exact final tile difference for the
+                     player to move (or a bound, as in solve_node)
+            Does: Solves a position with 2 empties by trying both empty
+                  squares directly.
+        '''
+        self.nodes += 1
+        first = empty & -empty
+        squares = (first.bit_length() - 1, (empty ^ first).bit_length() - 1)
+        best = -65
+        for i in range(2):
+            flipped = bitboard.flips(own, opp, squares[i])
+            if flipped:
+                score = -self.solve_last1(opp & ~flipped,
+                                          own | flipped | 1 << squares[i],
+                                          squares[1 - i])
+                if score > best:
+                    best = score
+                    if score >= beta:
+                        return best
+        if best == -65:
+            if passed:
+                return final_score(own, opp)
+            return -self.solve_last2(opp, own, -beta, -alpha, empty, True)
+        return best
+
+    def solve_last1(self, own, opp, square):
+        ''' Method: solve_last1
+            Parameters: self, own (integer), opp (integer), square (integer)
+            Returns: an integer, the exact final tile difference for the
+                     player to move
+            Does: Solves a position with 1 empty by counting the tiles
+                  flipped by either player on the last square.
+        '''
+        self.nodes += 1
+        diff = own.bit_count() - opp.bit_count()
+        flipped = bitboard.flips(own, opp, square).bit_count()
+        if flipped:
+            return diff + 2 * flipped + 1
+        flipped = bitboard.flips(opp, own, square).bit_count()
+        if flipped:
+            return diff - 2 * flipped - 1
+        if diff > 0:
+            return diff + 1
+        elif diff < 0:
+            return diff - 1
+        return 0
+
+    def positions_per_second(self):
+        ''' Method: positions_per_second
+            Parameters: self
+            Returns: a float, the number of positions solved per second
+        '''
+        if self.solve_time <= 0:
+            return 0.0
+        return self.solved / self.solve_time
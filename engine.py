@@ -0,0 +1,166 @@
+
+'''
+This module contains the background engine of Othello game. The computer
+player thinks in a worker thread, so the turtle event loop keeps drawing
+and handling clicks; the game polls the engine with turtle.ontimer until
+the move is ready.
+
+While the human player thinks, the engine ponders: it guesses their reply
+(the best move stored in the transposition table, or the best-looking
+square) and searches the position after it. If the guess is right, that
+search simply goes on with its normal time budget; otherwise it is
+stopped and a new search starts, with the table already filled.
+'''
+
+import threading, bitboard, search
+
+class BackgroundEngine:
+    ''' BackgroundEngine class.
+        Attributes: choose, the function choosing the computer's move,
+                    called with a GameState (in the worker thread)
+                    searcher, the search.Searcher called by choose, used
+                    to ponder (None to never ponder)
+                    thread, the worker thread (None when idle)
+                    result, the move found by the last finished thread
+                    pondered, the GameState being pondered (None if the
+                    thread is not pondering)
+        choose (function) is required in the __init__ function; searcher
+        is optional; thread, result and pondered are not taken in the
+        __init__
+
+        Methods: start, ponder, poll, is_thinking, stop, run_thread, think
+                 and predict_reply
+    '''
+
+    def __init__(self, choose, searcher = None):
+        '''
+            Initilizes the attributes.
+        '''
+        self.choose = choose
+        self.searcher = searcher
+        self.thread = None
+        self.result = None
+        self.pondered = None
+
+    def start(self, state):
+        ''' Method: start
+            Parameters: self, state (GameState)
+            Returns: nothing
+            Does: Starts choosing the move of the current player of state
+                  in the worker thread. If the engine was pondering this
+                  very position, the pondering search becomes the search
+                  of the move; otherwise pondering is stopped first.
+        '''
+        pondered = self.pondered
+        self.pondered = None
+        if pondered is not None and \
+           pondered.current_player == state.current_player and \
+           pondered.bitboards == state.bitboards:
+            self.searcher.ponder_hit()
+            return
+        self.stop()
+        self.run_thread(state.copy())
+
+    def ponder(self, state):
+        ''' Method: ponder
+            Parameters: self, state (GameState)
+            Returns: nothing
+            Does: Guesses the reply of the current player of state (the
+                  human) and starts searching the position after it in the
+                  worker thread, with no time limit. Does nothing if the
+                  engine has no searcher or the computer would not move
+                  right after the guessed reply.
+        '''
+        if self.searcher is None or not state.use_bitboards:
+            return
+        self.stop()
+        move = self.predict_reply(state)
+        if move is None:
+            return
+        pondered = state.copy()
+        pondered.play_move(move)
+        if not pondered.has_legal_move():
+            return
+        self.searcher.pondering = True
+        self.pondered = pondered
+        self.run_thread(pondered.copy())
+
+    def poll(self):
+        ''' Method: poll
+            Parameters: self
+            Returns: the move chosen by the worker thread, or None if it
+                     is still thinking (or pondering) or its move was
+                     already returned
+            Does: Drops the move once it is returned, so that it is only
+                  played once.
+        '''
+        if self.pondered is not None or self.is_thinking():
+            return None
+        self.thread = None
+        result = self.result
+        self.result = None
+        return result
+
+    def is_thinking(self):
+        ''' Method: is_thinking
+            Parameters: self
+            Returns: a boolean, True if the worker thread is running
+        '''
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self):
+        ''' Method: stop
+            Parameters: self
+            Returns: nothing
+            Does: Stops the worker thread, if any, and waits for it. Its
+                  result is dropped.
+        '''
+        if self.thread is not None:
+            if self.searcher is not None:
+                self.searcher.stop()
+            self.thread.join()
+        if self.searcher is not None:
+            self.searcher.pondering = False
+            self.searcher.stopped = False
+        self.thread = None
+        self.result = None
+        self.pondered = None
+
+    def run_thread(self, state):
+        ''' Method: run_thread
+            Parameters: self, state (GameState)
+            Returns: nothing
+            Does: Starts the worker thread choosing the move of state.
+        '''
+        self.result = None
+        self.thread = threading.Thread(target = self.think, args = (state,),
+                                       daemon = True)
+        self.thread.start()
+
+    def think(self, state):
+        ''' Method: think
+            Parameters: self, state (GameState)
+            Returns: nothing
+            Does: Runs in the worker thread: chooses the move and stores it
+                  in self.result.
+        '''
+        self.result = self.choose(state)
+
+    def predict_reply(self, state):
+        ''' Method: predict_reply
+            Parameters: self, state (GameState)
+            Returns: a tuple (row, col), the expected move of the current
+                     player of state, or None if they have no legal move
+            Does: Takes the best move stored for the position in the
+                  transposition table of the searcher (usually there after
+                  the computer's own search), or else the best-looking
+                  legal square.
+        '''
+        moves = state.legal_move_mask()
+        if not moves:
+            return None
+        if self.searcher.table is not None:
+            entry = self.searcher.table.probe(state.hash_key)
+            if entry is not None and entry[3] >= 0 and moves >> entry[3] & 1:
+                return bitboard.to_coord(entry[3])
+        return bitboard.to_coord(search.ordered_moves(moves)[0])
@@ -1,17 +1,57 @@
 
-import othello
+import argparse, os, book, instrument, mcts, othello, patterns, search
 
 def main():
+    # Reads the options of the game from the command line
+    parser = argparse.ArgumentParser(description='Play Othello.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of processes the computer searches with')
+    parser.add_argument('--book', default=book.BOOK_FILE,
+                        help='opening book file of the computer, if it exists')
+    parser.add_argument('--weights', default=patterns.WEIGHTS_FILE,
+                        help='pattern weights file the computer evaluates '
+                             'positions with, if it exists')
+    parser.add_argument('--mcts', action='store_true',
+                        help='make the computer a Monte Carlo tree search '
+                             'player instead of an alpha-beta searcher')
+    parser.add_argument('--size', type=int, default=8,
+                        help='size n of the nxn board (the computer only '
+                             'searches on 8x8 and plays randomly otherwise)')
+    parser.add_argument('--stats', nargs='?', const='-', metavar='FILE',
+                        help='time the hot methods and print the statistics '
+                             'at game over, or save them to FILE as JSON')
+    parser.add_argument('--profile', metavar='METHOD',
+                        help="profile whole games ('game') or the first call "
+                             "of a timed method, e.g. 'Othello.play' (a turn "
+                             "of the human)")
+    args = parser.parse_args()
+    methods = ['Othello.' + name for name in instrument.GAME_METHODS] + \
+              ['GameState.' + name for name in instrument.STATE_METHODS]
+    if args.profile not in [None, 'game'] + methods:
+        parser.error('--profile takes game or one of ' + ', '.join(methods))
+
     # Initializes the game
-    game = othello.Othello()
-    game.draw_board()
-    game.initialize_board()
+    evaluator = search.evaluate
+    if os.path.exists(args.weights):
+        evaluator = patterns.PatternEvaluator(args.weights).evaluate
+    game = othello.Othello(args.size)
+    game.set_search_workers(args.workers, evaluator)
+    if os.path.exists(args.book):
+        game.searcher.book = book.OpeningBook(args.book)
+    if args.mcts:
+        game.mcts = mcts.MCTSPlayer()
+    if args.stats or args.profile:
+        game.set_instruments(instrument.Instruments(args.stats, args.profile))
+    game.setup_screen()
 
     # Starts playing the game
     # The user makes a move by clicking one of the squares on the board
-    # The computer makes a random legal move every time
+    # The computer searches for its best legal move every time
     # Game is over when there are no more lagal moves or the board is full
     game.run()
 
 
-main()
+# Only start the game when run as a script, not when a worker process
+# of the parallel search imports this module
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+
+'''
+This module contains the GameState class, the rules and state of an
+Othello game without any drawing. It does not import turtle, so it can be
+used by worker processes and scripts that never open a window.
+'''
+
+import bitboard, raytable, widebitboard, zobrist
+from bitboard import MOVE_DIRS
+
+class GameState:
+    ''' GameState class.
+        Attributes: n, an integer for nxn board
+                    board, a nested list which stores the state of the board
+                    (0 for no tile, 1 for black tiles and 2 for white tiles)
+                    current_player, an integer 0 or 1 to represent two
+                    different players (0 for black, 1 for white)
+                    num_tiles, a list of integers for number of tiles each
+                    player has
+                    bitboards, a list of two integers holding the black and
+                    white tiles as bitboards (not used without rules)
+                    use_bitboards, a boolean, True on an 8x8 board
+                    rules, the bitboard rules of the board: the bitboard
+                    module on an 8x8 board, a widebitboard.WideBoard on
+                    other sizes, or None to only use the ray tables
+                    ray_table, the raytable.RayTable of the board size
+                    without rules (None with rules)
+                    cells, a flat list of the n * n tiles of the board (as
+                    in board, square (row, col) at index row * n + col),
+                    kept along with board without rules (None with rules)
+                    legal_cache, a list holding the legal moves of each
+                    player for the current position (a bitboard with
+                    rules, a set of (row, col) otherwise), or None when
+                    they have not been computed yet
+                    hash_key, an integer for the Zobrist hash of the
+                    position, updated with every move (see zobrist)
+        n (integer) and wide_bitboards (a boolean, False to give a board
+        of another size than 8x8 no rules) are optional in the __init__
+        function; board, current_player, num_tiles, bitboards,
+        use_bitboards, rules, ray_table, cells, legal_cache and hash_key
+        are not taken in the __init__
+
+        Methods: initialize_board, make_move, play_move, switch_player,
+                 flip_tiles, has_tile_to_flip, has_legal_move,
+                 get_legal_moves, legal_move_mask, is_legal_move,
+                 get_legal_cache, update_legal_cache, compute_legal_move,
+                 is_valid_coord, is_game_over, get_winner, copy,
+                 __str__ and __eq__
+    '''
+
+    def __init__(self, n = 8, wide_bitboards = True):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        self.n = n
+        self.board = [[0] * n for i in range(n)]
+        self.current_player = 0
+        self.num_tiles = [2, 2]
+        self.bitboards = [0, 0]
+        self.use_bitboards = n == bitboard.SIZE
+        self.rules = None
+        if self.use_bitboards:
+            self.rules = bitboard
+        elif wide_bitboards:
+            self.rules = widebitboard.get_wide_board(n)
+        self.ray_table = None
+        self.cells = None
+        if self.rules is None:
+            self.ray_table = raytable.get_ray_table(n)
+            self.cells = [0] * (n * n)
+        self.legal_cache = None
+        self.hash_key = zobrist.hash_board(self.board, self.current_player)
+
+    def initialize_board(self):
+        ''' Method: initialize_board
+            Parameters: self
+            Returns: a list of tuples, the (row, col) of the first 4 tiles
+                     (black ones at even indexes, white ones at odd indexes)
+            Does: Starts a new game: empties the board, gives the turn to
+                  black and places the first 4 tiles in the middle of the
+                  board (the size of the board must be at least 2x2). The
+                  rows of the board are emptied in place, as the game
+                  shares them.
+        '''
+        for row in self.board:
+            row[:] = [0] * self.n
+        self.current_player = 0
+        self.num_tiles = [2, 2]
+        self.bitboards = [0, 0]
+        if self.cells is not None:
+            self.cells = [0] * (self.n * self.n)
+        if self.n < 2:
+            return []
+
+        coord1 = int(self.n / 2 - 1)
+        coord2 = int(self.n / 2)
+        initial_squares = [(coord1, coord2), (coord1, coord1),
+                           (coord2, coord1), (coord2, coord2)]
+
+        for i in range(len(initial_squares)):
+            color = i % 2
+            row = initial_squares[i][0]
+            col = initial_squares[i][1]
+            self.board[row][col] = color + 1
+            if self.rules is not None:
+                self.bitboards[color] |= 1 << self.rules.to_square(row, col)
+            else:
+                self.cells[row * self.n + col] = color + 1
+        self.legal_cache = None
+        self.hash_key = zobrist.hash_board(self.board, self.current_player)
+        return initial_squares
+
+    def make_move(self, move):
+        ''' Method: make_move
+            Parameters: self, move (tuple)
+            Returns: a list of tuples, the (row, col) of the flipped tiles
+                     (empty if the move is not legal)
+            Does: Places a tile for the current player's legal move and
+                  flips the adversary's tiles. Also, updates the state of
+                  the board (1 for black tiles and 2 for white tiles), and
+                  increases the number of tiles of the current player by 1.
+                  Does not switch the current player.
+        '''
+        if not self.is_legal_move(move):
+            return []
+        self.board[move[0]][move[1]] = self.current_player + 1
+        self.num_tiles[self.current_player] += 1
+        self.hash_key ^= zobrist.get_keys(self.n)[self.current_player][
+            move[0] * self.n + move[1]]
+        if self.rules is not None:
+            square = self.rules.to_square(move[0], move[1])
+            self.bitboards[self.current_player] |= 1 << square
+        else:
+            self.cells[move[0] * self.n + move[1]] = self.current_player + 1
+        flipped = self.flip_tiles(move)
+        self.update_legal_cache([move] + flipped)
+        return flipped
+
+    def play_move(self, move):
+        ''' Method: play_move
+            Parameters: self, move (tuple)
+            Returns: a list of tuples, the (row, col) of the flipped tiles
+            Does: Makes the move and passes the turn to the other player
+                  if the move is legal.
+        '''
+        if not self.is_legal_move(move):
+            return []
+        flipped = self.make_move(move)
+        self.switch_player()
+        return flipped
+
+    def switch_player(self):
+        ''' Method: switch_player
+            Parameters: self
+            Returns: nothing
+            Does: Passes the turn to the other player. This is also how a
+                  player with no legal move passes.
+        '''
+        self.current_player = 1 - self.current_player
+        self.hash_key ^= zobrist.SIDE_KEY
+
+    def flip_tiles(self, move):
+        ''' Method: flip_tiles
+            Parameters: self, move (tuple)
+            Returns: a list of tuples, the (row, col) of the flipped tiles
+            Does: Flips the adversary's tiles for the move. Also, updates
+                  the state of the board (1 for black tiles and 2 for
+                  white tiles), increases the number of tiles of the
+                  current player by 1, and decreases the number of tiles
+                  of the adversary by 1 for every flipped tile.
+                  With rules, all flipped tiles are found with a single
+                  bitboard operation and the number of tiles is recounted
+                  from the bitboards; otherwise, they are found along the
+                  rays of the ray table.
+        '''
+        player = self.current_player
+        flipped = []
+        flip_keys = zobrist.get_flip_keys(self.n)
+        if self.rules is not None:
+            own = self.bitboards[player]
+            opp = self.bitboards[1 - player]
+            square = self.rules.to_square(move[0], move[1])
+            flip_mask = self.rules.flips(own, opp, square)
+            self.bitboards[player] = own | flip_mask
+            self.bitboards[1 - player] = opp & ~flip_mask
+            self.num_tiles = [bitboard.count(self.bitboards[0]),
+                              bitboard.count(self.bitboards[1])]
+            for flip in bitboard.squares(flip_mask):
+                row, col = self.rules.to_coord(flip)
+                self.board[row][col] = player + 1
+                self.hash_key ^= flip_keys[flip]
+                flipped.append((row, col))
+            return flipped
+
+        curr_tile = player + 1
+        table = self.ray_table
+        for flip in table.flips(self.cells, move[0] * self.n + move[1],
+                                curr_tile, 2 - player):
+            row, col = table.coords[flip]
+            self.cells[flip] = curr_tile
+            self.board[row][col] = curr_tile
+            self.hash_key ^= flip_keys[flip]
+            flipped.append((row, col))
+        self.num_tiles[player] += len(flipped)
+        self.num_tiles[1 - player] -= len(flipped)
+        return flipped
+
+    def has_tile_to_flip(self, move, direction, player = None):
+        ''' Method: has_tile_to_flip
+            Parameters: self, move (tuple), direction (tuple),
+                        player (integer, optional)
+            Returns: boolean
+                     (True if there is any tile to flip, False otherwise)
+            Does: Checks whether the player has any adversary's tile to flip
+                  with the move they make.
+
+                  About input: move is the (row, col) coordinate of where the
+                  player makes a move; direction is the direction in which the
+                  adversary's tile is to be flipped (direction is any tuple
+                  defined in MOVE_DIRS); player defaults to the current
+                  player.
+        '''
+        if player is None:
+            player = self.current_player
+        if self.rules is not None:
+            if player not in (0, 1) or \
+               not self.is_valid_coord(move[0], move[1]):
+                return False
+            dir_index = MOVE_DIRS.index(direction)
+            own = self.bitboards[player]
+            opp = self.bitboards[1 - player]
+            square = self.rules.to_square(move[0], move[1])
+            if self.use_bitboards:
+                amount, mask = bitboard.SHIFTS[dir_index]
+                return bitboard.flips_in_direction(own, opp, square,
+                                                   amount, mask) != 0
+            return self.rules.flips_in_direction(own, opp, square,
+                                                 dir_index) != 0
+
+        if player not in (0, 1) or not self.is_valid_coord(move[0], move[1]):
+            return False
+        ray = self.ray_table.rays[move[0] * self.n + move[1]][
+            MOVE_DIRS.index(direction)]
+        return self.ray_table.run(self.cells, ray, player + 1,
+                                  2 - player) > 0
+
+    def has_legal_move(self):
+        ''' Method: has_legal_move
+            Parameters: self
+            Returns: boolean
+                     (True if the player has legal move, False otherwise)
+            Does: Checks whether the current player has any legal move
+                  to make. Reads the legal move cache.
+        '''
+        return bool(self.get_legal_cache(self.current_player))
+
+    def get_legal_moves(self):
+        ''' Method: get_legal_moves
+            Parameters: self
+            Returns: a list of legal moves that can be made
+            Does: Finds all the legal moves the current player can make.
+                  Every move is a tuple of coordinates (row, col), and
+                  the moves are sorted by row, then by column. Reads the
+                  legal move cache.
+        '''
+        legal = self.get_legal_cache(self.current_player)
+        if self.rules is not None:
+            return [self.rules.to_coord(square) for square in
+                    bitboard.squares(legal)]
+        return sorted(legal)
+
+    def legal_move_mask(self):
+        ''' Method: legal_move_mask
+            Parameters: self
+            Returns: an integer with one bit set for every legal move
+            Does: Reads the legal moves of the current player from the
+                  legal move cache (only used with rules).
+        '''
+        return self.get_legal_cache(self.current_player)
+
+    def is_legal_move(self, move):
+        ''' Method: is_legal_move
+            Parameters: self, move (tuple)
+            Returns: boolean (True if move is legal, False otherwise)
+            Does: Checks whether the player's move is legal.
+
+                  About input: move is a tuple of coordinates (row, col).
+        '''
+        if move == () or not self.is_valid_coord(move[0], move[1]) or \
+           self.current_player not in (0, 1):
+            return False
+        legal = self.get_legal_cache(self.current_player)
+        if self.rules is not None:
+            return bool(legal >> self.rules.to_square(move[0], move[1]) & 1)
+        return (move[0], move[1]) in legal
+
+    def get_legal_cache(self, player):
+        ''' Method: get_legal_cache
+            Parameters: self, player (integer)
+            Returns: the cached legal moves of the player (a bitboard with
+                     rules, a set of (row, col) otherwise)
+            Does: Computes the legal moves of both players once per
+                  position if they are not cached yet. With rules, this is
+                  one bitboard operation per player; otherwise, every
+                  empty square is checked once for both players along the
+                  rays of the ray table.
+        '''
+        if self.legal_cache is None:
+            if self.rules is not None:
+                black, white = self.bitboards
+                self.legal_cache = [self.rules.legal_moves(black, white),
+                                    self.rules.legal_moves(white, black)]
+            else:
+                self.legal_cache = self.ray_table.legal_moves(self.cells)
+        return self.legal_cache[player]
+
+    def update_legal_cache(self, changed):
+        ''' Method: update_legal_cache
+            Parameters: self, changed (list of tuples)
+            Returns: nothing
+            Does: Updates the legal move cache after the tiles on the
+                  changed squares were placed or flipped. With rules, both
+                  bitboards of legal moves are regenerated. Otherwise,
+                  only the empty squares that can see a changed square
+                  (the first empty square along each direction from it)
+                  are checked again, since the legality of any other
+                  square cannot have changed.
+        '''
+        if self.legal_cache is None:
+            return
+        if self.rules is not None:
+            self.legal_cache = None
+            return
+
+        table = self.ray_table
+        affected = set()
+        for row, col in changed:
+            affected.update(table.affected(self.cells, row * self.n + col))
+        for p in (0, 1):
+            legal = self.legal_cache[p]
+            legal.difference_update(changed)
+            for square in affected:
+                if table.is_legal(self.cells, square, p + 1, 2 - p):
+                    legal.add(table.coords[square])
+                else:
+                    legal.discard(table.coords[square])
+
+    def compute_legal_move(self, move, player):
+        ''' Method: compute_legal_move
+            Parameters: self, move (tuple), player (integer)
+            Returns: boolean (True if move is legal for the player, False
+                     otherwise)
+            Does: Checks whether the move is legal by looking at the
+                  board, without using the legal move cache.
+        '''
+        if self.rules is not None:
+            own = self.bitboards[player]
+            opp = self.bitboards[1 - player]
+            square = self.rules.to_square(move[0], move[1])
+            return not ((own | opp) >> square & 1) and \
+                   self.rules.flips(own, opp, square) != 0
+
+        square = move[0] * self.n + move[1]
+        return self.ray_table.is_legal(self.cells, square, player + 1,
+                                       2 - player)
+
+    def is_valid_coord(self, row, col):
+        ''' Method: is_valid_coord
+            Parameters: self, row (integer), col (integer)
+            Returns: boolean (True if row and col is valid, False otherwise)
+            Does: Checks whether the given coordinate (row, col) is valid.
+                  A valid coordinate must be in the range of the board.
+        '''
+        if 0 <= row < self.n and 0 <= col < self.n:
+            return True
+        return False
+
+    def is_game_over(self):
+        ''' Method: is_game_over
+            Parameters: self
+            Returns: boolean (True if neither player can move, False
+                     otherwise)
+        '''
+        return not self.get_legal_cache(0) and not self.get_legal_cache(1)
+
+    def get_winner(self):
+        ''' Method: get_winner
+            Parameters: self
+            Returns: an integer, 0 if black has more tiles, 1 if white has
+                     more tiles and -1 for a tie
+        '''
+        if self.num_tiles[0] > self.num_tiles[1]:
+            return 0
+        elif self.num_tiles[0] < self.num_tiles[1]:
+            return 1
+        return -1
+
+    def copy(self):
+        ''' Method: copy
+            Parameters: self
+            Returns: a new GameState with the same position
+        '''
+        other = GameState.__new__(GameState)
+        other.n = self.n
+        other.board = [row[:] for row in self.board]
+        other.current_player = self.current_player
+        other.num_tiles = self.num_tiles[:]
+        other.bitboards = self.bitboards[:]
+        other.use_bitboards = self.use_bitboards
+        other.rules = self.rules
+        other.ray_table = self.ray_table
+        other.cells = None if self.cells is None else self.cells[:]
+        other.hash_key = self.hash_key
+        if self.legal_cache is None:
+            other.legal_cache = None
+        elif self.rules is not None:
+            other.legal_cache = self.legal_cache[:]
+        else:
+            other.legal_cache = [self.legal_cache[0].copy(),
+                                 self.legal_cache[1].copy()]
+        return other
+
+    def __str__(self):
+        '''
+            Returns a printable version of the current status of the
+            game to print.
+        '''
+        player_str = 'Current player: ' + str(self.current_player + 1) + '\n'
+        num_tiles_str = '# of black tiles -- 1: ' + str(self.num_tiles[0]) + \
+                        '\n' + '# of white tiles -- 2: ' + \
+                        str(self.num_tiles[1]) + '\n'
+        board_str = 'State of the board:\n'
+        for row in self.board:
+            board_str += str(row) + '\n'
+
+        return player_str + num_tiles_str + board_str
+
+    def __eq__(self, other):
+        '''
+            Compares two instances.
+            Returns True if they have both the same board and current
+            player, False otherwise.
+        '''
+        return self.board == other.board and \
+               self.current_player == other.current_player
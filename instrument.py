@@ -0,0 +1,267 @@
+
+'''
+This module contains the instrumentation of Othello game: how many times
+the hot methods of a game run, how long they take (as a histogram of
+powers of two microseconds), counters of events, and optional cProfile
+captures of a whole game or of one call (e.g. one turn).
+
+Instruments are attached to objects, not to classes: the methods of the
+game and of its GameState are replaced by timed versions on those
+instances only, so nothing is timed when they are not attached (and the
+copies of the state searched by the computer are never timed).
+
+Run the game with --stats (and --profile) to use them, e.g.
+    python game.py --stats stats.json --profile game
+'''
+
+import cProfile, functools, io, json, pstats, threading, time
+
+# Defines the methods timed on a game and on its state, the number of
+# buckets of the histograms, the file the profiles are saved to and the
+# number of lines of a profile printed as constants
+GAME_METHODS = ['play', 'play_pve', 'play_pvp', 'has_legal_move',
+                'get_legal_moves', 'make_move', 'flip_tiles', 'draw_tile',
+                'computer_turn_logic', 'poll_computer_move',
+                'choose_computer_move']
+STATE_METHODS = ['has_legal_move', 'get_legal_moves', 'make_move',
+                 'flip_tiles', 'has_tile_to_flip']
+BUCKETS = 32
+PROFILE_FILE = 'othello.prof'
+PROFILE_LINES = 20
+
+class Instruments:
+    ''' Instruments class.
+        Attributes: output, a string for the JSON file the statistics are
+                    written to ('-' or None to print them)
+                    profile, a string: 'game' to profile whole games, the
+                    name of a timed method (e.g. 'Othello.play') to
+                    profile its first call of every game, or None
+                    timings, a dictionary of lists [calls, total seconds,
+                    max seconds, histogram] by method name; bucket i of a
+                    histogram counts the calls of less than 2 ** i us
+                    counters, a dictionary of integers by event name
+                    profiles, a list of the cProfile.Profiles of the game
+                    profiled, a set of the names of the methods whose
+                    first call of the game was profiled
+                    game_profile, the cProfile.Profile of the main thread
+                    during a profiled game (None otherwise)
+                    attached, a list of tuples (object, method name) of the
+                    methods replaced by timed versions
+                    lock, a threading.Lock, as the computer's move is
+                    chosen in a worker thread
+        output and profile (strings) are optional in the __init__
+        function; all other attributes are not taken in the __init__
+
+        Methods: attach, detach, wrap, record, count, start_game, end_game,
+                 report, dump and print_profile
+    '''
+
+    def __init__(self, output = None, profile = None):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        self.output = output
+        self.profile = profile
+        self.timings = {}
+        self.counters = {}
+        self.profiles = []
+        self.profiled = set()
+        self.game_profile = None
+        self.attached = []
+        self.lock = threading.Lock()
+
+    def attach(self, obj, names, prefix = None):
+        ''' Method: attach
+            Parameters: self, obj (object), names (list of strings),
+                        prefix (string, optional)
+            Returns: nothing
+            Does: Replaces the methods of obj with the given names by timed
+                  versions, recorded as prefix.name (prefix is the class
+                  name of obj by default). Only obj is changed.
+        '''
+        if prefix is None:
+            prefix = type(obj).__name__
+        for name in names:
+            method = getattr(obj, name)
+            setattr(obj, name, self.wrap(prefix + '.' + name, method))
+            self.attached.append((obj, name))
+
+    def detach(self):
+        ''' Method: detach
+            Parameters: self
+            Returns: nothing
+            Does: Puts back the methods replaced by attach.
+        '''
+        for obj, name in self.attached:
+            delattr(obj, name)
+        self.attached = []
+
+    def wrap(self, name, method):
+        ''' Method: wrap
+            Parameters: self, name (string), method (function)
+            Returns: a function calling method and recording its time
+                     under name (or profiling it, see profile)
+        '''
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            profiler = None
+            if self.profile == name and name not in self.profiled:
+                # Profiles the first call of the game only
+                self.profiled.add(name)
+                profiler = cProfile.Profile()
+            elif self.game_profile is not None and \
+                 threading.current_thread() is not threading.main_thread():
+                # The game profile only sees the main thread
+                profiler = cProfile.Profile()
+            start = time.perf_counter()
+            if profiler is not None:
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # Newer Pythons run one profiler at a time
+                    profiler = None
+            try:
+                return method(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    with self.lock:
+                        self.profiles.append(profiler)
+                self.record(name, time.perf_counter() - start)
+        return timed
+
+    def record(self, name, seconds):
+        ''' Method: record
+            Parameters: self, name (string), seconds (float)
+            Returns: nothing
+            Does: Adds one call of the given time to the timing of name.
+        '''
+        bucket = min(int(seconds * 1000000).bit_length(), BUCKETS - 1)
+        with self.lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = [0, 0.0, 0.0, [0] * BUCKETS]
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+            timing[3][bucket] += 1
+
+    def count(self, name, amount = 1):
+        ''' Method: count
+            Parameters: self, name (string), amount (integer, optional)
+            Returns: nothing
+            Does: Adds amount to the counter of name.
+        '''
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start_game(self):
+        ''' Method: start_game
+            Parameters: self
+            Returns: nothing
+            Does: Clears the statistics of the last game and starts the
+                  game profile if whole games are profiled.
+        '''
+        with self.lock:
+            self.timings = {}
+            self.counters = {}
+            self.profiles = []
+            self.profiled = set()
+        if self.profile == 'game':
+            self.game_profile = cProfile.Profile()
+            self.game_profile.enable()
+
+    def end_game(self):
+        ''' Method: end_game
+            Parameters: self
+            Returns: nothing
+            Does: Stops the game profile, if any, and dumps the statistics
+                  of the game.
+        '''
+        if self.game_profile is not None:
+            self.game_profile.disable()
+            self.profiles.append(self.game_profile)
+            self.game_profile = None
+        self.dump()
+
+    def report(self):
+        ''' Method: report
+            Parameters: self
+            Returns: a dictionary of the timings of every method (calls,
+                     total and mean time, maximum, percentiles read from
+                     the histogram and the histogram itself) and of the
+                     counters
+        '''
+        timings = {}
+        with self.lock:
+            for name, (calls, total, longest, histogram) in \
+                sorted(self.timings.items()):
+                entry = {'calls': calls, 'total_ms': total * 1000,
+                         'mean_us': total / calls * 1000000,
+                         'max_us': longest * 1000000}
+                for percent in (50, 90, 99):
+                    # The upper bound of the bucket holding the percentile
+                    seen = 0
+                    for i in range(BUCKETS):
+                        seen += histogram[i]
+                        if seen * 100 >= calls * percent:
+                            break
+                    entry['p%d_us' % percent] = 2 ** i
+                entry['histogram_us'] = {'<%d' % 2 ** i: histogram[i]
+                                         for i in range(BUCKETS)
+                                         if histogram[i]}
+                timings[name] = entry
+            counters = dict(self.counters)
+        return {'timings': timings, 'counters': counters}
+
+    def dump(self):
+        ''' Method: dump
+            Parameters: self
+            Returns: nothing
+            Does: Writes the report to the output file as JSON, or prints
+                  it as a table if there is no output file. Then prints and
+                  saves the profiles, if any.
+        '''
+        report = self.report()
+        if self.output and self.output != '-':
+            try:
+                with open(self.output, 'w') as outfile:
+                    json.dump(report, outfile, indent=2)
+                print('Statistics saved to', self.output)
+            except OSError:
+                print('Error saving the statistics.')
+        elif report['timings'] or report['counters']:
+            print('%-32s %8s %10s %9s %9s %9s'
+                  % ('method', 'calls', 'total ms', 'mean us', 'p99 us',
+                     'max us'))
+            for name, entry in report['timings'].items():
+                print('%-32s %8d %10.1f %9.1f %9d %9.0f'
+                      % (name, entry['calls'], entry['total_ms'],
+                         entry['mean_us'], entry['p99_us'],
+                         entry['max_us']))
+            for name, value in sorted(report['counters'].items()):
+                print('%-32s %8d' % (name, value))
+        if self.profiles:
+            self.print_profile()
+
+    def print_profile(self, filename = PROFILE_FILE):
+        ''' Method: print_profile
+            Parameters: self, filename (string, optional)
+            Returns: nothing
+            Does: Merges the profiles of the game, prints their most
+                  expensive functions and saves them to filename (for
+                  pstats or another viewer).
+        '''
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiles[0], stream=stream)
+        for profiler in self.profiles[1:]:
+            stats.add(profiler)
+        stats.sort_stats('cumulative').print_stats(PROFILE_LINES)
+        print(stream.getvalue())
+        try:
+            stats.dump_stats(filename)
+            print('Profile saved to', filename)
+        except OSError:
+            print('Error saving the profile.')
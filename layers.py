@@ -0,0 +1,108 @@
+
+'''
+This module contains the static layers of Othello game. A layer is one
+screen of drawings that do not change (a menu with its title and buttons,
+or the board with its grid): it is drawn once by its turtles, then shown
+or hidden by switching the state of their canvas items, which is much
+faster than clearing the screen and drawing it again. A layer also keeps
+the click areas of its buttons.
+'''
+
+import turtle
+
+class Layer:
+    ''' Layer class.
+        Attributes: name, a string for the name of the layer
+                    turtles, a list of the turtles drawing the layer
+                    buttons, a list of tuples (x_min, x_max, y_min, y_max,
+                    action), the click areas of the buttons of the layer
+                    visible, a boolean, True if the layer is shown
+        name (string) is taken in the __init__ function
+        turtles, buttons and visible are not taken in the __init__
+
+        Methods: new_turtle, add_turtle, add_button, hit_test, items,
+                 show and hide
+    '''
+
+    def __init__(self, name):
+        '''
+            Initilizes the attributes.
+        '''
+        self.name = name
+        self.turtles = []
+        self.buttons = []
+        self.visible = True
+
+    def new_turtle(self):
+        ''' Method: new_turtle
+            Parameters: self
+            Returns: a new hidden turtle, with its pen up and no
+                     animation, whose drawings belong to the layer
+        '''
+        turt = turtle.Turtle(visible = False)
+        turt.penup()
+        turt.speed(0)
+        self.turtles.append(turt)
+        return turt
+
+    def add_turtle(self, turt):
+        ''' Method: add_turtle
+            Parameters: self, turt (turtle object)
+            Returns: nothing
+            Does: Makes the drawings of an existing turtle belong to the
+                  layer.
+        '''
+        self.turtles.append(turt)
+
+    def add_button(self, x_min, x_max, y_min, y_max, action):
+        ''' Method: add_button
+            Parameters: self, x_min, x_max, y_min, y_max (floats),
+                        action (string)
+            Returns: nothing
+            Does: Registers the click area of a button of the layer.
+        '''
+        self.buttons.append((x_min, x_max, y_min, y_max, action))
+
+    def hit_test(self, x, y):
+        ''' Method: hit_test
+            Parameters: self, x (float), y (float)
+            Returns: a string, the action of the button clicked at (x, y),
+                     or None if no button is there
+        '''
+        for x_min, x_max, y_min, y_max, action in self.buttons:
+            if x_min <= x <= x_max and y_min <= y <= y_max:
+                return action
+        return None
+
+    def items(self):
+        ''' Method: items
+            Parameters: self
+            Returns: a list of the canvas items drawn by the turtles of the
+                     layer (lines, fills and texts)
+        '''
+        items = []
+        for turt in self.turtles:
+            items += turt.items
+        return items
+
+    def show(self):
+        ''' Method: show
+            Parameters: self
+            Returns: nothing
+            Does: Shows every drawing of the layer.
+        '''
+        canvas = turtle.getcanvas()
+        for item in self.items():
+            canvas.itemconfigure(item, state='normal')
+        self.visible = True
+
+    def hide(self):
+        ''' Method: hide
+            Parameters: self
+            Returns: nothing
+            Does: Hides every drawing of the layer without deleting it.
+        '''
+        canvas = turtle.getcanvas()
+        for item in self.items():
+            canvas.itemconfigure(item, state='hidden')
+        self.visible = False
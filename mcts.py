@@ -0,0 +1,391 @@
+
+'''
+This module contains the Monte Carlo Tree Search (UCT) computer player of
+Othello game. The player grows a tree of positions from the current one:
+it walks down the tree by the UCT formula, adds one new position, plays a
+random game to the end from it and counts the result in every position
+on the way back up. The move played most often from the root is chosen.
+
+The random games (playouts) never touch the GameState or the screen: they
+run on two bitboards, with moves picked by clearing bits rather than by
+building lists. When NumPy is installed, playouts are run in batches with
+the batch rules of batchmoves, many leaves at once; otherwise they are
+played one at a time with the scalar rules of bitboard.
+
+The tree is kept between moves: when the player is asked for a move again,
+it looks for the new position among the positions it already searched
+and goes on from there.
+'''
+
+import math, random, time, bitboard
+try:
+    import numpy as np
+    import batchmoves
+except ImportError:
+    np = None
+
+# Defines the time budget of a move (in seconds), the exploration constant
+# of UCT, the number of leaves played out at once (when NumPy is
+# installed) and the square standing for a pass as constants
+TIME_LIMIT = 1.0
+EXPLORATION = 1.4
+BATCH = 256 if np is not None else 1
+PASS = 64
+
+class Node:
+    ''' Node class.
+        Attributes: own, an integer for the tiles of the player to move
+                    opp, an integer for the tiles of their adversary
+                    color, an integer for the player to move
+                    square, an integer for the move leading here (PASS for
+                    a pass, -1 for the root)
+                    parent, the Node this position was reached from
+                    children, a list of the Nodes already added
+                    untried, an integer with one bit set for every move
+                    not added yet (bit PASS if the player must pass)
+                    visits, an integer for the playouts through this node
+                    wins, a float for the playouts won by the player who
+                    made the move leading here (a tie counts as half)
+        own, opp, color, square and parent are taken in the __init__
+        function; the other attributes are not
+    '''
+
+    __slots__ = ('own', 'opp', 'color', 'square', 'parent', 'children',
+                 'untried', 'visits', 'wins')
+
+    def __init__(self, own, opp, color, square, parent):
+        '''
+            Initilizes the attributes.
+        '''
+        self.own = own
+        self.opp = opp
+        self.color = color
+        self.square = square
+        self.parent = parent
+        self.children = []
+        self.untried = bitboard.legal_moves(own, opp)
+        if not self.untried and bitboard.legal_moves(opp, own):
+            self.untried = 1 << PASS
+        self.visits = 0
+        self.wins = 0.0
+
+def playout(own, opp, rand):
+    ''' Function playout
+        Parameters: own (integer), opp (integer), rand (function returning
+                    a float in [0, 1))
+        Returns: an integer, the final tile difference for the player
+                 owning the tiles in own, who moves first
+
+        Does: Plays random moves for both players until neither can move.
+              The k-th legal move is picked by clearing the k lowest bits
+              of the move mask, so no list is built.
+    '''
+    sign = 1
+    passed = False
+    while True:
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            if passed:
+                break
+            passed = True
+            own, opp = opp, own
+            sign = -sign
+            continue
+        passed = False
+        for i in range(int(rand() * moves.bit_count())):
+            moves &= moves - 1
+        move = moves & -moves
+        flipped = bitboard.flips(own, opp, move.bit_length() - 1)
+        own, opp = opp & ~flipped, own | flipped | move
+        sign = -sign
+    return sign * (own.bit_count() - opp.bit_count())
+
+def batch_playouts(own, opp, rng):
+    ''' Function batch_playouts
+        Parameters: own (uint64 array), opp (uint64 array),
+                    rng (numpy.random.Generator)
+        Returns: an integer array, the final tile difference of every
+                 playout for the player to move in its start position
+
+        Does: Plays one random game from every position at once with the
+              batch rules, until no board has a legal move for either
+              player. Finished boards are left as they are.
+    '''
+    count = len(own)
+    swapped = np.zeros(count, dtype=bool)
+    finished = np.zeros(count, dtype=bool)
+    passed = np.zeros(count, dtype=bool)
+    while True:
+        moves = batchmoves.legal_moves(own, opp)
+        has_move = moves != batchmoves.ZERO
+        finished |= ~has_move & passed
+        if finished.all():
+            break
+        # Pick the r-th legal move of every board, the first square whose
+        # running count of legal moves goes over r
+        bits = np.unpackbits(moves.astype('<u8').view(np.uint8)
+                             .reshape(-1, 8), axis=1, bitorder='little')
+        running = bits.cumsum(axis=1, dtype=np.int8)
+        r = (rng.random(count) * running[:, 63]).astype(np.int8)
+        squares = (running > r[:, None]).argmax(axis=1)
+        flipped = np.where(has_move, batchmoves.flips(own, opp, squares),
+                           batchmoves.ZERO)
+        move = np.where(has_move,
+                        batchmoves.ONE << squares.astype(np.uint64),
+                        batchmoves.ZERO)
+        # A board without a move passes: the sides are swapped as usual
+        playing = ~finished
+        own, opp = (np.where(playing, opp & ~flipped, own),
+                    np.where(playing, own | flipped | move, opp))
+        swapped ^= playing
+        passed = ~has_move
+    diff = batchmoves.count(own).astype(np.int64) - \
+           batchmoves.count(opp).astype(np.int64)
+    return np.where(swapped, -diff, diff)
+
+class MCTSResult:
+    ''' MCTSResult class.
+        Attributes: move, a tuple (row, col) for the chosen move
+                    win_rate, a float for the share of playouts won
+                    through the move
+                    playouts, an integer for the playouts run this move
+                    reused, an integer for the playouts kept from the
+                    previous moves in the tree
+                    elapsed, a float for the thinking time in seconds
+        All attributes are taken in the __init__ function
+
+        Methods: playouts_per_second and __str__
+    '''
+
+    def __init__(self, move, win_rate, playouts, reused, elapsed):
+        '''
+            Initilizes the attributes.
+        '''
+        self.move = move
+        self.win_rate = win_rate
+        self.playouts = playouts
+        self.reused = reused
+        self.elapsed = elapsed
+
+    def playouts_per_second(self):
+        ''' Method: playouts_per_second
+            Parameters: self
+            Returns: a float, the speed of this move's playouts
+        '''
+        if self.elapsed <= 0:
+            return 0.0
+        return self.playouts / self.elapsed
+
+    def __str__(self):
+        '''
+            Returns a string representation of the result.
+        '''
+        return ('move %s, win rate %.2f, %d playouts (+%d reused) in %.3fs '
+                '(%.0f playouts/s)' % (self.move, self.win_rate,
+                                       self.playouts, self.reused,
+                                       self.elapsed,
+                                       self.playouts_per_second()))
+
+class MCTSPlayer:
+    ''' MCTSPlayer class.
+        Attributes: playouts, an integer for the playout budget of a move
+                    (None for no limit)
+                    time_limit, a float for the time budget of a move in
+                    seconds (None for no limit)
+                    exploration, a float for the exploration constant
+                    batch, an integer for the number of leaves played out
+                    at once (1 for scalar playouts)
+                    rng, a random.Random used by the tree and the scalar
+                    playouts
+                    np_rng, a numpy.random.Generator used by the batch
+                    playouts (None without NumPy)
+                    root, the Node of the last searched position
+                    last_result, the MCTSResult of the last move
+        playouts, time_limit, exploration and batch are optional in the
+        __init__ function; with playouts and no time limit, the player is
+        deterministic for a given seed
+
+        Methods: new_game, choose_move, find_root, select, expand,
+                 backpropagate and run_batch
+    '''
+
+    def __init__(self, playouts = None, time_limit = TIME_LIMIT,
+                 exploration = EXPLORATION, batch = BATCH):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        if playouts is None and time_limit is None:
+            raise ValueError('MCTSPlayer needs a playout or a time budget')
+        if batch > 1 and np is None:
+            batch = 1
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.batch = batch
+        self.rng = random.Random()
+        self.np_rng = np.random.default_rng() if np is not None else None
+        self.root = None
+        self.last_result = None
+
+    def new_game(self, seed):
+        ''' Method: new_game
+            Parameters: self, seed (integer)
+            Returns: nothing
+            Does: Reseeds the player and drops the tree of the last game.
+        '''
+        self.rng.seed(seed)
+        if np is not None:
+            self.np_rng = np.random.default_rng(seed)
+        self.root = None
+
+    def choose_move(self, state):
+        ''' Method: choose_move
+            Parameters: self, state (GameState)
+            Returns: a tuple (row, col), the move of the current player
+                     played most often from the root
+            Does: Grows the tree within the playout and time budgets,
+                  then keeps the subtree of the chosen move for the next
+                  call. The state must have a legal move. Raises
+                  ValueError if the state does not use bitboards.
+        '''
+        if not state.use_bitboards:
+            raise ValueError('mcts needs an 8x8 board')
+        start = time.perf_counter()
+        root = self.find_root(state)
+        reused = root.visits
+        done = 0
+        while self.playouts is None or done < self.playouts:
+            if self.time_limit is not None and \
+               time.perf_counter() - start >= self.time_limit:
+                break
+            size = self.batch
+            if self.playouts is not None:
+                size = min(size, self.playouts - done)
+            self.run_batch(root, size)
+            done += size
+            # Stop early when the root has only one move
+            if root.untried == 0 and len(root.children) == 1:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        self.root = best
+        best.parent = None
+        self.last_result = MCTSResult(bitboard.to_coord(best.square),
+                                      best.wins / max(best.visits, 1),
+                                      done, reused,
+                                      time.perf_counter() - start)
+        return self.last_result.move
+
+    def find_root(self, state):
+        ''' Method: find_root
+            Parameters: self, state (GameState)
+            Returns: the Node of the position of state
+            Does: Looks for the position in the kept tree (the node of the
+                  last chosen move or one of its children, i.e. after any
+                  reply of the adversary) and detaches it; creates a new
+                  tree if it is not there. Raises ValueError if the state
+                  does not use bitboards.
+        '''
+        if not state.use_bitboards:
+            raise ValueError('mcts needs an 8x8 board')
+        color = state.current_player
+        own = state.bitboards[color]
+        opp = state.bitboards[1 - color]
+        if self.root is not None:
+            for node in [self.root] + self.root.children:
+                if node.color == color and node.own == own and \
+                   node.opp == opp:
+                    node.parent = None
+                    return node
+        return Node(own, opp, color, -1, None)
+
+    def select(self, root):
+        ''' Method: select
+            Parameters: self, root (Node)
+            Returns: the Node to play out from
+            Does: Walks down from the root, always to the child with the
+                  best UCT score, until a node with untried moves or a
+                  terminal node, and expands it. Every node on the way is
+                  counted as visited right away, so that the other leaves
+                  of the same batch spread over the tree (virtual loss).
+        '''
+        node = root
+        node.visits += 1
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            exploration = self.exploration
+            best_score = -1.0
+            for child in node.children:
+                if child.visits == 0:
+                    best = child
+                    break
+                score = child.wins / child.visits + exploration * \
+                        math.sqrt(log_visits / child.visits)
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            node.visits += 1
+        if node.untried:
+            node = self.expand(node)
+            node.visits += 1
+        return node
+
+    def expand(self, node):
+        ''' Method: expand
+            Parameters: self, node (Node)
+            Returns: the new child Node
+            Does: Adds the position after a random untried move of node.
+        '''
+        untried = node.untried
+        for i in range(int(self.rng.random() * untried.bit_count())):
+            untried &= untried - 1
+        move = untried & -untried
+        node.untried ^= move
+        square = move.bit_length() - 1
+        if square == PASS:
+            child = Node(node.opp, node.own, 1 - node.color, PASS, node)
+        else:
+            flipped = bitboard.flips(node.own, node.opp, square)
+            child = Node(node.opp & ~flipped, node.own | flipped | move,
+                         1 - node.color, square, node)
+        node.children.append(child)
+        return child
+
+    def backpropagate(self, node, diff):
+        ''' Method: backpropagate
+            Parameters: self, node (Node), diff (integer)
+            Returns: nothing
+            Does: Counts the result of a playout from node (the final tile
+                  difference for its player to move) in node and all its
+                  ancestors. The visits were already counted by select.
+        '''
+        reward = 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+        color = node.color
+        while node is not None:
+            # wins are counted for the player who moved into the node
+            if node.color == color:
+                node.wins += 1.0 - reward
+            else:
+                node.wins += reward
+            node = node.parent
+
+    def run_batch(self, root, size):
+        ''' Method: run_batch
+            Parameters: self, root (Node), size (integer)
+            Returns: nothing
+            Does: Selects size leaves, plays one random game from each
+                  (all at once with NumPy if size is more than 1) and
+                  backpropagates the results.
+        '''
+        leaves = [self.select(root) for i in range(size)]
+        if size > 1:
+            diffs = batch_playouts(
+                np.array([leaf.own for leaf in leaves], dtype=np.uint64),
+                np.array([leaf.opp for leaf in leaves], dtype=np.uint64),
+                self.np_rng).tolist()
+        else:
+            diffs = [playout(leaf.own, leaf.opp, self.rng.random)
+                     for leaf in leaves]
+        for leaf, diff in zip(leaves, diffs):
+            self.backpropagate(leaf, diff)
@@ -1,13 +1,8 @@
 
-import score, turtle, random
+import score, search, parallel, animation, layers, record, engine, turtle, random
+import instrument, position
 from board import Board
-
-# Define all the possible directions in which a player's move can flip 
-# their adversary's tiles as constant (0 – the current row/column, 
-# +1 – the next row/column, -1 – the previous row/column)
-MOVE_DIRS = [(-1, -1), (-1, 0), (-1, +1),
-             (0, -1),           (0, +1),
-             (+1, -1), (+1, 0), (+1, +1)]
+from gamestate import GameState, MOVE_DIRS
 
 # UI Constants
 BUTTON_WIDTH = 200
@@ -15,23 +10,48 @@ BUTTON_HEIGHT = 50
 BUTTON_COLOR = 'black' # Othello tile color
 BUTTON_TEXT_COLOR = 'white'
 BG_COLOR = 'forest green' # Board color
+POLL_MS = 20 # Delay between two checks for the computer's move
 
 class Othello(Board):
     ''' Othello class.
-        Attributes: current_player, an integer 0 or 1 to represent two 
-                    different players (the user and the computer)
+        Attributes: state, a GameState holding the rules and the position 
+                    of the game; this class only draws it and handles input
+                    current_player, an integer 0 or 1 to represent two 
+                    different players (the user and the computer), 
+                    read from and written to state
                     num_tiles, a list of integers for number of tiles each 
-                    player has
+                    player has, read from and written to state
+                    searcher, a search.Searcher (or parallel.ParallelSearcher) 
+                    used by the computer player (None to make random moves)
+                    mcts, an mcts.MCTSPlayer used by the computer player 
+                    instead of searcher (None to use searcher)
+                    scheduler, an animation.FrameScheduler drawing the 
+                    flips of the game
+                    moves, a list of tuples for the moves of the game
+                    start_position, the position.Position the game was 
+                    set to by set_position (None for a game played from 
+                    the start); such a game is not saved to the records
+                    engine, an engine.BackgroundEngine choosing the 
+                    computer's moves in a worker thread
+                    computer_turn, an integer increased by set_position 
+                    and start_game, so that the polling of a computer's 
+                    turn started before stops
+                    instruments, an instrument.Instruments timing the hot 
+                    methods of the game (None to time nothing)
                     n, an integer for nxn board
                     all other attributes inherited from class Board
         n (integer) is optional in the __init__ function
-        current_player, num_tiles and all other inherited attributes 
-        are not taken in the __init__
+        state, current_player, num_tiles, searcher, mcts, scheduler, 
+        moves, start_position, engine, computer_turn, instruments and all 
+        other inherited attributes are not taken in the __init__
 
         Methods: initialize_board, make_move, flip_tiles, has_tile_to_flip, 
                  has_legal_move, get_legal_moves, is_legal_move, 
-                 is_valid_coord, run, play, make_random_move, 
-                 report_result, __str__ , __eq__ and all other methods 
+                 is_valid_coord, get_position, set_position, 
+                 set_search_workers, set_instruments, 
+                 run, play, 
+                 computer_turn_logic, poll_computer_move, start_human_turn, 
+                 choose_computer_move, save_record, report_result, __str__ , __eq__ and all other methods 
                  inherited from class Board
     '''
 
@@ -41,12 +61,40 @@ class Othello(Board):
             Only takes one optional parameter; others have default values.
         '''
         Board.__init__(self, n)
-        self.current_player = 0
-        self.num_tiles = [2, 2]
+        self.state = GameState(n)
+        self.board = self.state.board
+        self.searcher = search.Searcher()
+        self.mcts = None
+        self.scheduler = animation.FrameScheduler()
+        self.moves = [] # Moves of the game, saved to a record at the end
+        self.start_position = None
+        self.engine = engine.BackgroundEngine(self.choose_computer_move)
+        self.computer_turn = 0
+        self.instruments = None
         self.game_mode = '1' # '1' for PvE, '2' for PvP
         self.human_color = 0 # 0 for Black, 1 for White (only used in PvE)
         self.menu_state = 'MAIN' # MAIN, MODE, COLOR, SETTINGS
         self.buttons = [] # Store button coordinates for click detection
+        self.layers = {} # Layers drawn so far, by name
+        self.current_layer = None # Layer shown on the screen
+
+    @property
+    def current_player(self):
+        return self.state.current_player
+
+    @current_player.setter
+    def current_player(self, player):
+        # Switch through the state so that its hash stays up to date
+        if player != self.state.current_player:
+            self.state.switch_player()
+
+    @property
+    def num_tiles(self):
+        return self.state.num_tiles
+
+    @num_tiles.setter
+    def num_tiles(self, num_tiles):
+        self.state.num_tiles = num_tiles
 
     def initialize_board(self):
         ''' Method: initialize_board
@@ -55,62 +103,38 @@ class Othello(Board):
             Does: Draws the first 4 tiles in the middle of the board
                   (the size of the board must be at least 2x2).
         '''
-        if self.n < 2:
-            return
-
-        coord1 = int(self.n / 2 - 1)
-        coord2 = int(self.n / 2)
-        initial_squares = [(coord1, coord2), (coord1, coord1),
-                           (coord2, coord1), (coord2, coord2)]
-        
+        initial_squares = self.state.initialize_board()
+        self.moves = []
+        self.start_position = None
         for i in range(len(initial_squares)):
-            color = i % 2
-            row = initial_squares[i][0]
-            col = initial_squares[i][1]
-            self.board[row][col] = color + 1
-            self.draw_tile(initial_squares[i], color)
+            self.draw_tile(initial_squares[i], i % 2)
     
     def make_move(self):
         ''' Method: make_move
             Parameters: self
             Returns: nothing
             Does: Draws a tile for the player's next legal move on the 
-                  board and flips the adversary's tiles. Also, updates the 
-                  state of the board (1 for black tiles and 2 for white 
-                  tiles), and increases the number of tiles of the current 
-                  player by 1.
+                  board and flips the adversary's tiles. The state of the 
+                  board and the number of tiles are updated by self.state.
         '''
         if self.is_legal_move(self.move):
-            self.board[self.move[0]][self.move[1]] = self.current_player + 1
-            self.num_tiles[self.current_player] += 1
+            flipped = self.state.make_move(self.move)
+            self.moves.append(self.move)
             self.draw_tile(self.move, self.current_player)
-            self.flip_tiles()
+            self.flip_tiles(flipped)
     
-    def flip_tiles(self):
+    def flip_tiles(self, flipped):
         ''' Method: flip_tiles
-            Parameters: self
+            Parameters: self, flipped (list of tuples)
             Returns: nothing
-            Does: Flips the adversary's tiles for current move. Also, 
-                  updates the state of the board (1 for black tiles and 
-                  2 for white tiles), increases the number of tiles of 
-                  the current player by 1, and decreases the number of 
-                  tiles of the adversary by 1.
+            Does: Queues the animations flipping the adversary's tiles of 
+                  the current move to the current player's color; they are 
+                  drawn by self.scheduler from the event loop.
         '''
-        curr_tile = self.current_player + 1 
-        for direction in MOVE_DIRS:
-            if self.has_tile_to_flip(self.move, direction):
-                i = 1
-                while True:
-                    row = self.move[0] + direction[0] * i
-                    col = self.move[1] + direction[1] * i
-                    if self.board[row][col] == curr_tile:
-                        break
-                    else:
-                        self.board[row][col] = curr_tile
-                        self.num_tiles[self.current_player] += 1
-                        self.num_tiles[(self.current_player + 1) % 2] -= 1
-                        self.draw_tile((row, col), self.current_player)
-                        i += 1
+        for square in flipped:
+            self.scheduler.add(self.animate_flip(square, self.current_player))
+        if self.instruments is not None:
+            self.instruments.count('tiles_flipped', len(flipped))
 
     def has_tile_to_flip(self, move, direction):
         ''' Method: has_tile_to_flip
@@ -118,28 +142,9 @@ class Othello(Board):
             Returns: boolean 
                      (True if there is any tile to flip, False otherwise)
             Does: Checks whether the player has any adversary's tile to flip
-                  with the move they make.
-
-                  About input: move is the (row, col) coordinate of where the 
-                  player makes a move; direction is the direction in which the 
-                  adversary's tile is to be flipped (direction is any tuple 
-                  defined in MOVE_DIRS).
+                  with the move they make (see GameState.has_tile_to_flip).
         '''
-        i = 1
-        if self.current_player in (0, 1) and \
-           self.is_valid_coord(move[0], move[1]):
-            curr_tile = self.current_player + 1
-            while True:
-                row = move[0] + direction[0] * i
-                col = move[1] + direction[1] * i
-                if not self.is_valid_coord(row, col) or \
-                    self.board[row][col] == 0:
-                    return False
-                elif self.board[row][col] == curr_tile:
-                    break
-                else:
-                    i += 1
-        return i > 1
+        return self.state.has_tile_to_flip(move, direction)
 
     def has_legal_move(self):
         ''' Method: has_legal_move
@@ -149,12 +154,7 @@ class Othello(Board):
             Does: Checks whether the current player has any legal move 
                   to make.
         '''
-        for row in range(self.n):
-            for col in range(self.n):
-                move = (row, col)
-                if self.is_legal_move(move):
-                    return True
-        return False
+        return self.state.has_legal_move()
     
     def get_legal_moves(self):
         ''' Method: get_legal_moves
@@ -163,13 +163,7 @@ class Othello(Board):
             Does: Finds all the legal moves the current player can make.
                   Every move is a tuple of coordinates (row, col).
         '''
-        moves = []
-        for row in range(self.n):
-            for col in range(self.n):
-                move = (row, col)
-                if self.is_legal_move(move):
-                    moves.append(move)
-        return moves
+        return self.state.get_legal_moves()
 
     def is_legal_move(self, move):
         ''' Method: is_legal_move
@@ -179,12 +173,7 @@ class Othello(Board):
 
                   About input: move is a tuple of coordinates (row, col).
         '''
-        if move != () and self.is_valid_coord(move[0], move[1]) \
-           and self.board[move[0]][move[1]] == 0:
-            for direction in MOVE_DIRS:
-                if self.has_tile_to_flip(move, direction):
-                    return True
-        return False
+        return self.state.is_legal_move(move)
 
     def is_valid_coord(self, row, col):
         ''' Method: is_valid_coord
@@ -193,21 +182,88 @@ class Othello(Board):
             Does: Checks whether the given coordinate (row, col) is valid.
                   A valid coordinate must be in the range of the board.
         '''
-        if 0 <= row < self.n and 0 <= col < self.n:
-            return True
-        return False
+        return self.state.is_valid_coord(row, col)
 
-    def draw_button(self, x, y, width, height, text, action):
+    def get_position(self):
+        ''' Method: get_position
+            Parameters: self
+            Returns: a position.Position, an immutable snapshot of the 
+                     position of the game
+        '''
+        return position.from_state(self.state)
+
+    def set_position(self, snapshot):
+        ''' Method: set_position
+            Parameters: self, snapshot (position.Position)
+            Returns: nothing
+            Does: Stops the computer's search (and the polling for its 
+                  move) and the flip animations, puts 
+                  the position of snapshot on the board and redraws its 
+                  tiles and the score; the legal moves are no longer 
+                  highlighted. The moves of the game are cleared, as they 
+                  no longer lead to the position, and the game will not be 
+                  saved to the records. Raises ValueError if the board 
+                  sizes differ.
+        '''
+        if snapshot.n != self.n:
+            raise ValueError('cannot set a %dx%d position on a %dx%d board' 
+                             % (snapshot.n, snapshot.n, self.n, self.n))
+        self.engine.stop()
+        self.computer_turn += 1
+        self.scheduler.clear()
+        snapshot.load(self.state)
+        self.moves = []
+        self.start_position = snapshot
+        self.clear_highlights()
+        self.clear_tiles()
+        for row in range(self.n):
+            for col in range(self.n):
+                if self.board[row][col]:
+                    self.draw_tile((row, col), self.board[row][col] - 1)
+        self.draw_info(self.current_player, self.num_tiles)
+
+    def set_search_workers(self, workers, evaluator = search.evaluate):
+        ''' Method: set_search_workers
+            Parameters: self, workers (integer), evaluator (function,
+                        optional)
+            Returns: nothing
+            Does: Makes the computer player search with a pool of worker 
+                  processes if workers is more than 1, or in this process 
+                  otherwise, scoring positions with evaluator. The time 
+                  budget of the searcher is kept.
+        '''
+        time_limit = search.TIME_LIMIT
+        if self.searcher is not None:
+            time_limit = self.searcher.time_limit
+            if isinstance(self.searcher, parallel.ParallelSearcher):
+                self.searcher.close()
+        if workers > 1:
+            self.searcher = parallel.ParallelSearcher(
+                workers, time_limit, evaluator=evaluator)
+        else:
+            self.searcher = search.Searcher(time_limit, evaluator=evaluator)
+
+    def set_instruments(self, instruments):
+        ''' Method: set_instruments
+            Parameters: self, instruments (instrument.Instruments)
+            Returns: nothing
+            Does: Times the hot methods of the game and of its state with 
+                  instruments from now on; the statistics of every game 
+                  are dumped when it is over.
+        '''
+        self.instruments = instruments
+        instruments.attach(self, instrument.GAME_METHODS)
+        instruments.attach(self.state, instrument.STATE_METHODS)
+
+    def draw_button(self, layer, x, y, width, height, text, action):
         ''' Method: draw_button
-            Parameters: self, x, y, width, height, text, action
+            Parameters: self, layer, x, y, width, height, text, action
             Returns: nothing
-            Does: Draws a button and registers its clickable area.
+            Does: Draws a button on the layer and registers its clickable 
+                  area with the layer.
         '''
         # Draw button background
-        btn = turtle.Turtle()
-        btn.hideturtle()
-        btn.speed(0)
-        btn.penup()
+        btn = layer.new_turtle()
         btn.goto(x - width/2, y + height/2)
         btn.color('black', BUTTON_COLOR)
         btn.begin_fill()
@@ -224,124 +280,150 @@ class Othello(Board):
         btn.write(text, align="center", font=("Arial", 16, "bold"))
         
         # Store button area for click detection: (x_min, x_max, y_min, y_max, action)
-        self.buttons.append((x - width/2, x + width/2, y - height/2, y + height/2, action))
+        layer.add_button(x - width/2, x + width/2, y - height/2, y + height/2, action)
 
-    def clear_screen(self):
-        turtle.clearscreen()
-        turtle.bgcolor(BG_COLOR)
-        self.buttons = []
+    def draw_title(self, layer, text, size):
+        ''' Method: draw_title
+            Parameters: self, layer, text (string), size (integer)
+            Returns: nothing
+            Does: Writes the title of a menu on the layer.
+        '''
+        title = layer.new_turtle()
+        title.goto(0, 150)
+        title.color('white')
+        title.write(text, align="center", font=("Arial", size, "bold"))
+
+    def show_layer(self, name, draw, bgcolor = BG_COLOR):
+        ''' Method: show_layer
+            Parameters: self, name (string), draw (function), 
+                        bgcolor (string, optional)
+            Returns: nothing
+            Does: Hides the current layer and shows the layer called name 
+                  on a background of color bgcolor, drawing it with 
+                  draw(layer) the first time only. The buttons of the 
+                  layer become the clickable buttons. Turns the animation 
+                  off; the screen is updated once everything is drawn.
+        '''
+        turtle.tracer(0, 0)
+        turtle.bgcolor(bgcolor)
+        if self.current_layer is not None:
+            self.current_layer.hide()
+        layer = self.layers.get(name)
+        if layer is None:
+            layer = layers.Layer(name)
+            self.layers[name] = layer
+            draw(layer)
+        else:
+            layer.show()
+        self.current_layer = layer
+        self.buttons = layer.buttons
+        turtle.update()
 
     def show_main_menu(self):
-        self.clear_screen()
         turtle.title("Othello - Main Menu")
-        
-        # Title
-        title = turtle.Turtle()
-        title.hideturtle()
-        title.speed(0)
-        title.penup()
-        title.goto(0, 150)
-        title.color('white')
-        title.write("OTHELLO", align="center", font=("Arial", 40, "bold"))
-        
-        self.draw_button(0, 50, BUTTON_WIDTH, BUTTON_HEIGHT, "Play", "PLAY_MENU")
-        self.draw_button(0, -50, BUTTON_WIDTH, BUTTON_HEIGHT, "Settings", "SETTINGS")
-        self.draw_button(0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Quit", "QUIT")
-        
+        self.show_layer('MAIN', self.draw_main_menu)
         turtle.onscreenclick(self.handle_menu_click)
 
+    def draw_main_menu(self, layer):
+        self.draw_title(layer, "OTHELLO", 40)
+        self.draw_button(layer, 0, 50, BUTTON_WIDTH, BUTTON_HEIGHT, "Play", "PLAY_MENU")
+        self.draw_button(layer, 0, -50, BUTTON_WIDTH, BUTTON_HEIGHT, "Settings", "SETTINGS")
+        self.draw_button(layer, 0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Quit", "QUIT")
+
     def show_mode_select(self):
-        self.clear_screen()
-        
-        title = turtle.Turtle()
-        title.hideturtle()
-        title.speed(0)
-        title.penup()
-        title.goto(0, 150)
-        title.color('white')
-        title.write("SELECT MODE", align="center", font=("Arial", 30, "bold"))
-        
-        self.draw_button(0, 50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Vs Computer", "MODE_PVE")
-        self.draw_button(0, -50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Vs Player", "MODE_PVP")
-        self.draw_button(0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Back", "MAIN_MENU")
-        
+        self.show_layer('MODE', self.draw_mode_select)
         turtle.onscreenclick(self.handle_menu_click)
 
+    def draw_mode_select(self, layer):
+        self.draw_title(layer, "SELECT MODE", 30)
+        self.draw_button(layer, 0, 50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Vs Computer", "MODE_PVE")
+        self.draw_button(layer, 0, -50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Vs Player", "MODE_PVP")
+        self.draw_button(layer, 0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Back", "MAIN_MENU")
+
     def show_color_select(self):
-        self.clear_screen()
-        
-        title = turtle.Turtle()
-        title.hideturtle()
-        title.speed(0)
-        title.penup()
-        title.goto(0, 150)
-        title.color('white')
-        title.write("CHOOSE COLOR", align="center", font=("Arial", 30, "bold"))
-        
-        self.draw_button(0, 50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Play as Black", "COLOR_BLACK")
-        self.draw_button(0, -50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Play as White", "COLOR_WHITE")
-        self.draw_button(0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Back", "MODE_MENU")
-        
+        self.show_layer('COLOR', self.draw_color_select)
         turtle.onscreenclick(self.handle_menu_click)
 
+    def draw_color_select(self, layer):
+        self.draw_title(layer, "CHOOSE COLOR", 30)
+        self.draw_button(layer, 0, 50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Play as Black", "COLOR_BLACK")
+        self.draw_button(layer, 0, -50, BUTTON_WIDTH + 50, BUTTON_HEIGHT, "Play as White", "COLOR_WHITE")
+        self.draw_button(layer, 0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Back", "MODE_MENU")
+
     def show_settings(self):
-        self.clear_screen()
-        
-        title = turtle.Turtle()
-        title.hideturtle()
-        title.speed(0)
-        title.penup()
-        title.goto(0, 150)
-        title.color('white')
-        title.write("SETTINGS", align="center", font=("Arial", 30, "bold"))
+        self.show_layer('SETTINGS', self.draw_settings)
+        turtle.onscreenclick(self.handle_menu_click)
+
+    def draw_settings(self, layer):
+        self.draw_title(layer, "SETTINGS", 30)
         
-        info = turtle.Turtle()
-        info.hideturtle()
-        info.speed(0)
-        info.penup()
+        info = layer.new_turtle()
         info.goto(0, 0)
         info.color('white')
         info.write("Sound: ON (Mock)", align="center", font=("Arial", 14, "normal"))
 
-        self.draw_button(0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Back", "MAIN_MENU")
-        
-        turtle.onscreenclick(self.handle_menu_click)
+        self.draw_button(layer, 0, -150, BUTTON_WIDTH, BUTTON_HEIGHT, "Back", "MAIN_MENU")
+
+    def draw_board_layer(self, layer):
+        ''' Method: draw_board_layer
+            Parameters: self, layer
+            Returns: nothing
+            Does: Draws the board on the layer; the texts and markers of 
+                  the game belong to it too.
+        '''
+        self.draw_board()
+        layer.add_turtle(self.board_turtle)
+        layer.add_turtle(self.info_turtle)
+        layer.add_turtle(self.highlight_turtle)
 
     def handle_menu_click(self, x, y):
-        for btn in self.buttons:
-            x_min, x_max, y_min, y_max, action = btn
-            if x_min <= x <= x_max and y_min <= y <= y_max:
-                if action == "PLAY_MENU":
-                    self.show_mode_select()
-                elif action == "SETTINGS":
-                    self.show_settings()
-                elif action == "QUIT":
-                    turtle.bye()
-                elif action == "MODE_PVE":
-                    self.game_mode = '1'
-                    self.show_color_select()
-                elif action == "MODE_PVP":
-                    self.game_mode = '2'
-                    self.start_game()
-                elif action == "COLOR_BLACK":
-                    self.human_color = 0
-                    self.start_game()
-                elif action == "COLOR_WHITE":
-                    self.human_color = 1
-                    self.start_game()
-                elif action == "MAIN_MENU":
-                    self.show_main_menu()
-                elif action == "MODE_MENU":
-                    self.show_mode_select()
-                return
+        action = self.current_layer.hit_test(x, y)
+        if action:
+            if action == "PLAY_MENU":
+                self.show_mode_select()
+            elif action == "SETTINGS":
+                self.show_settings()
+            elif action == "QUIT":
+                turtle.bye()
+            elif action == "MODE_PVE":
+                self.game_mode = '1'
+                self.show_color_select()
+            elif action == "MODE_PVP":
+                self.game_mode = '2'
+                self.start_game()
+            elif action == "COLOR_BLACK":
+                self.human_color = 0
+                self.start_game()
+            elif action == "COLOR_WHITE":
+                self.human_color = 1
+                self.start_game()
+            elif action == "MAIN_MENU":
+                self.show_main_menu()
+            elif action == "MODE_MENU":
+                self.show_mode_select()
 
     def start_game(self):
-        self.clear_screen()
-        turtle.tracer(0, 0) # Turn off animation for fast drawing
-        self.draw_board()
+        self.scheduler.clear()
+        self.scheduler.frames = 0
+        if self.instruments is not None:
+            self.instruments.start_game()
+        # Ponder on the human's time only with a search running in this 
+        # process, which can be stopped when the guess is wrong
+        self.engine.stop()
+        self.computer_turn += 1
+        ponder_searcher = None
+        if self.mcts is None and self.searcher is not None and \
+           not isinstance(self.searcher, parallel.ParallelSearcher):
+            ponder_searcher = self.searcher
+        self.engine = engine.BackgroundEngine(self.choose_computer_move, 
+                                              ponder_searcher)
+        # The animation stays off (see show_layer): from now on the screen 
+        # is updated once per frame by self.scheduler
+        self.show_layer('BOARD', self.draw_board_layer, 'white')
+        self.clear_tiles()
+        self.clear_highlights()
         self.initialize_board()
         turtle.update()
-        turtle.tracer(1, 10) # Turn on animation
         
         if self.current_player not in (0, 1):
             print('Error: unknown player. Quit...')
@@ -357,8 +439,10 @@ class Othello(Board):
         if self.game_mode == '1' and self.human_color == 1:
              # Computer is black (0), human is white (1)
              # Trigger computer move immediately
-             turtle.ontimer(self.computer_turn_logic, 1000)
-             turtle.onscreenclick(self.play) 
+             self.computer_turn_logic()
+        elif self.game_mode == '1':
+            print('Your turn.')
+            self.start_human_turn()
         else:
             print('Your turn.')
             turtle.onscreenclick(self.play)
@@ -432,8 +516,8 @@ class Othello(Board):
                 self.current_player = 1 - self.current_player # Switch to computer
                 self.draw_info(self.current_player, self.num_tiles)
                 
-                # Schedule computer turn
-                turtle.ontimer(self.computer_turn_logic, 500)
+                # Start the computer turn
+                self.computer_turn_logic()
             else:
                 turtle.onscreenclick(self.play)
         else:
@@ -441,63 +525,108 @@ class Othello(Board):
             print("No moves for human.")
             self.current_player = 1 - self.current_player
             self.draw_info(self.current_player, self.num_tiles)
-            turtle.ontimer(self.computer_turn_logic, 1000)
+            self.computer_turn_logic()
 
     def computer_turn_logic(self):
-        # Computer turn
-        # Loop until computer has no moves or passes turn back to human
-        
-        passed = False
-        while self.current_player != self.human_color:
-            if self.has_legal_move():
-                print('Computer\'s turn.')
-                self.make_random_move()
-                self.current_player = 1 - self.current_player # Switch to human
-                self.draw_info(self.current_player, self.num_tiles)
-                passed = True
-                break # Exit loop to let human play
-            else:
-                print("Computer has no moves.")
-                self.current_player = 1 - self.current_player # Switch to human
-                self.draw_info(self.current_player, self.num_tiles)
-                
-                # Check if human has moves. If not, game over.
-                if not self.has_legal_move():
-                    self.handle_game_over()
-                    return
-                # If human has moves, break to let them play
-                break
+        ''' Method: computer_turn_logic
+            Parameters: self
+            Returns: nothing
+            Does: Starts the computer's turn: starts choosing its move in 
+                  the background and polls for it, so the window stays 
+                  responsive. If the computer has no move, passes to the 
+                  human, or ends the game if they have none either.
+        '''
+        if self.has_legal_move():
+            print('Computer\'s turn.')
+            self.engine.start(self.state)
+            turn = self.computer_turn
+            turtle.ontimer(lambda: self.poll_computer_move(turn), POLL_MS)
+            return
+
+        print("Computer has no moves.")
+        self.current_player = 1 - self.current_player # Switch to human
+        self.draw_info(self.current_player, self.num_tiles)
         
-        # Now it's human's turn (or game over handled)
+        # Check if human has moves. If not, game over.
+        if self.has_legal_move():
+            self.start_human_turn()
+        else:
+            self.handle_game_over()
+
+    def poll_computer_move(self, turn):
+        ''' Method: poll_computer_move
+            Parameters: self, turn (integer)
+            Returns: nothing
+            Does: Makes the computer's move if the engine has chosen it, 
+                  and lets the human play (or passes back to the computer 
+                  if the human has no move). Checks again later otherwise.
+                  Stops polling if turn is no longer self.computer_turn 
+                  (the position was set or a new game started since).
+        '''
+        if turn != self.computer_turn:
+            return
+        move = self.engine.poll()
+        if move is None:
+            turtle.ontimer(lambda: self.poll_computer_move(turn), POLL_MS)
+            return
+
+        self.move = move
+        self.make_move()
+        self.current_player = 1 - self.current_player # Switch to human
+        self.draw_info(self.current_player, self.num_tiles)
+
         if self.has_legal_move():
-             self.highlight_legal_moves(self.get_legal_moves())
-             turtle.onscreenclick(self.play)
+            self.start_human_turn()
         else:
-             if not passed: # If we didn't just come from a move
-                 # Human has no moves, but computer just passed to human?
-                 # This means computer had no moves. Human has no moves. Game over.
-                 self.handle_game_over()
-             else:
-                 # Human has no moves. Pass back to computer.
-                 print("Human has no moves. Passing back to computer.")
-                 self.current_player = 1 - self.current_player
-                 self.draw_info(self.current_player, self.num_tiles)
-                 turtle.ontimer(self.computer_turn_logic, 1000)
-
-    def make_random_move(self):
-        ''' Method: make_random_move
+            # Human has no moves. Pass back to computer.
+            print("Human has no moves. Passing back to computer.")
+            self.current_player = 1 - self.current_player
+            self.draw_info(self.current_player, self.num_tiles)
+            self.computer_turn_logic()
+
+    def start_human_turn(self):
+        ''' Method: start_human_turn
             Parameters: self
             Returns: nothing
-            Does: Makes a random legal move on the board.
+            Does: Highlights the human's legal moves, waits for their 
+                  click, and makes the engine ponder in the meantime.
+        '''
+        self.highlight_legal_moves(self.get_legal_moves())
+        turtle.onscreenclick(self.play)
+        self.engine.ponder(self.state)
+
+    def choose_computer_move(self, state):
+        ''' Method: choose_computer_move
+            Parameters: self, state (GameState)
+            Returns: a tuple (row, col), the computer's move in state
+            Does: Chooses the move on an 8x8 board with self.mcts if there 
+                  is an MCTS player, or with self.searcher (printing the 
+                  result of the search) if there is a searcher. Chooses a 
+                  random legal move otherwise. Runs in the worker thread of 
+                  self.engine, so it must not draw.
         '''
-        moves = self.get_legal_moves()
-        if moves:
-            self.move = random.choice(moves)
-            self.make_move()
+        if self.mcts is not None and state.use_bitboards:
+            move = self.mcts.choose_move(state)
+            print('Computer played out', self.mcts.last_result)
+            return move
+        if self.searcher is not None and state.use_bitboards:
+            result = self.searcher.search(state)
+            # A stopped search was pondering a reply that was not played
+            if not self.searcher.stopped:
+                print('Computer searched', result)
+            return result.move
+        return random.choice(state.get_legal_moves())
 
     def handle_game_over(self):
+        self.engine.stop()
+        # Finish drawing the last flips before the dialogs block the screen
+        self.scheduler.flush()
+        if self.instruments is not None:
+            self.instruments.count('frames', self.scheduler.frames)
+            self.instruments.end_game()
         print('-----------')
         self.report_result()
+        self.save_record()
         name = turtle.textinput('High Score', 'Enter your name for posterity')
         if name and not score.update_scores(name, self.num_tiles[0]):
             print('Your score has not been saved.')
@@ -505,10 +634,35 @@ class Othello(Board):
         close = turtle.textinput('Game Over', 'Close the game screen? Y/N')
         if close and close.upper() == 'Y':
             turtle.bye()
-        elif close != 'N':
+        elif close == 'N':
+            # Back to the main menu to play again
+            self.clear_tiles()
+            self.show_main_menu()
+        else:
             print('Quit in 3s...')
             turtle.ontimer(turtle.bye, 3000)
 
+    def save_record(self):
+        ''' Method: save_record
+            Parameters: self
+            Returns: nothing
+            Does: Appends the moves of the game to the game records file, 
+                  so that it can be replayed (see record). A game set to 
+                  another position by set_position is not saved, as its 
+                  moves do not replay from the start.
+        '''
+        if self.start_position is not None:
+            print('The game did not start from the first position: '
+                  'not saved.')
+            return
+        try:
+            writer = record.RecordWriter(record.RECORD_FILE)
+            writer.write_game(self.moves, self.n)
+            writer.close()
+            print('Game saved to', record.RECORD_FILE)
+        except OSError:
+            print('Error saving the game record.')
+
     def report_result(self):
         ''' Method: report_result
             Parameters: self
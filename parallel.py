@@ -0,0 +1,193 @@
+
+'''
+This module contains the parallel search engine of Othello game. It splits
+the root moves of every iteration of the search across a pool of worker
+processes, so that the search can use more than one core.
+
+The first root move (the best one of the previous iteration) is searched
+first to get a score to beat; the other root moves are then searched at
+the same time by all the workers against that score (as in the Young
+Brothers Wait Concept). A move is only sent to a worker when one is free,
+with the best score found so far, so that every better score narrows the
+window of the moves searched after it. Every worker keeps its own
+Searcher, and so its own transposition table, for the whole game.
+'''
+
+import multiprocessing, queue, time, bitboard, search
+from collections import deque
+
+# Stores the Searcher of a worker process
+worker_searcher = None
+
+def init_worker(tt_size_mb, evaluator):
+    ''' Function init_worker
+        Parameters: tt_size_mb (number), evaluator (function)
+        Returns: nothing
+
+        Does: Creates the Searcher of a worker process when the pool
+              starts it.
+    '''
+    global worker_searcher
+    worker_searcher = search.Searcher(None, None, search.MAX_DEPTH,
+                                      tt_size_mb, search.ENDGAME_EMPTIES,
+                                      evaluator)
+
+def search_move(task):
+    ''' Function search_move
+        Parameters: task (tuple)
+        Returns: a tuple (square, score, nodes); score is None if the time
+                 or node budget ran out before the move was searched
+
+        Does: Searches one root move in a worker process. task is a tuple
+              (own, opp, key, color, square, depth, alpha, generation,
+              deadline, node_limit) where alpha is the score the move
+              has to beat, generation tells the worker when a new search
+              has started, deadline is the wall-clock time (time.time)
+              at which the search stops and node_limit the nodes left
+              (None for no limit).
+    '''
+    own, opp, key, color, square, depth, alpha, generation, \
+        deadline, node_limit = task
+    searcher = worker_searcher
+    if searcher.table is not None and searcher.table.generation != generation:
+        searcher.table.generation = generation
+
+    searcher.nodes = 0
+    searcher.node_limit = node_limit
+    searcher.deadline = None
+    if deadline is not None:
+        searcher.deadline = time.perf_counter() + deadline - time.time()
+
+    flipped = bitboard.flips(own, opp, square)
+    try:
+        score = -searcher.negamax(opp & ~flipped,
+                                  own | flipped | 1 << square,
+                                  depth - 1, -search.INFINITY, -alpha,
+                                  search.child_key(key, color, square,
+                                                   flipped),
+                                  1 - color)
+    except search.SearchTimeout:
+        return square, None, searcher.nodes
+    return square, score, searcher.nodes
+
+class ParallelSearcher(search.Searcher):
+    ''' ParallelSearcher class.
+        Attributes: workers, an integer for the number of worker processes
+                    pool, the multiprocessing pool of the workers
+                    generation, an integer increased at every new search
+                    all other attributes inherited from class Searcher
+        workers (integer) is required in the __init__ function;
+        time_limit, node_limit, max_depth, tt_size_mb (the memory cap
+        of the table of each worker) and evaluator are optional
+        pool, generation and all other inherited attributes are not taken
+        in the __init__
+
+        Methods: search, search_root, remaining_budget, close and all
+                 other methods inherited from class Searcher
+    '''
+
+    def __init__(self, workers, time_limit = search.TIME_LIMIT,
+                 node_limit = None, max_depth = search.MAX_DEPTH,
+                 tt_size_mb = search.TT_SIZE_MB,
+                 evaluator = search.evaluate):
+        '''
+            Initilizes the attributes and starts the worker processes.
+            Only takes one required parameter; others have default values.
+        '''
+        # Only the workers keep a transposition table
+        search.Searcher.__init__(self, time_limit, node_limit, max_depth, 0,
+                                 search.ENDGAME_EMPTIES, evaluator)
+        self.workers = workers
+        self.generation = 0
+        # Workers are spawned rather than forked so that they do not
+        # inherit the state of the Tk window of the game
+        context = multiprocessing.get_context('spawn')
+        self.pool = context.Pool(workers, init_worker,
+                                 (tt_size_mb, evaluator))
+
+    def search(self, state):
+        ''' Method: search
+            Parameters: self, state (GameState)
+            Returns: a SearchResult for the current player of state
+            Does: Same as Searcher.search, but every iteration is split
+                  across the worker processes.
+        '''
+        self.generation = (self.generation + 1) & 0xFF
+        return search.Searcher.search(self, state)
+
+    def search_root(self, own, opp, depth, first, key, color):
+        ''' Method: search_root
+            Parameters: self, own (integer), opp (integer), depth (integer),
+                        first (integer), key (integer), color (integer)
+            Returns: a tuple (score, square) for the best move at this depth
+            Does: Searches the square first in one worker, then the
+                  other root moves in parallel, one per free worker,
+                  against the best score found when each is sent. Raises
+                  SearchTimeout if the budget runs out before every move
+                  is searched.
+        '''
+        moves = search.ordered_moves(bitboard.legal_moves(own, opp), first)
+
+        def task(square, alpha):
+            deadline, node_limit = self.remaining_budget()
+            return (own, opp, key, color, square, depth, alpha,
+                    self.generation, deadline, node_limit)
+
+        square, alpha, nodes = self.pool.apply(
+            search_move, (task(moves[0], -search.INFINITY),))
+        self.nodes += nodes
+        if alpha is None:
+            raise search.SearchTimeout()
+        best_square = square
+
+        waiting = deque(moves[1:])
+        results = queue.Queue()
+        running = 0
+        timed_out = False
+        while running or (waiting and not timed_out):
+            # Keeps every worker busy, sending the best score so far
+            while waiting and not timed_out and running < self.workers:
+                self.pool.apply_async(search_move,
+                                      (task(waiting.popleft(), alpha),),
+                                      callback=results.put,
+                                      error_callback=results.put)
+                running += 1
+            result = results.get()
+            running -= 1
+            if isinstance(result, BaseException):
+                raise result
+            square, score, nodes = result
+            self.nodes += nodes
+            if score is None:
+                timed_out = True
+            elif score > alpha:
+                alpha = score
+                best_square = square
+        if timed_out:
+            raise search.SearchTimeout()
+        return alpha, best_square
+
+    def remaining_budget(self):
+        ''' Method: remaining_budget
+            Parameters: self
+            Returns: a tuple (deadline, node_limit), the budget left for
+                     the current search (None for no limit); deadline is
+                     a wall-clock time, so that it means the same in
+                     every process
+        '''
+        deadline = None
+        if self.deadline is not None:
+            deadline = time.time() + self.deadline - time.perf_counter()
+        node_limit = None
+        if self.node_limit is not None:
+            node_limit = max(0, self.node_limit - self.nodes)
+        return deadline, node_limit
+
+    def close(self):
+        ''' Method: close
+            Parameters: self
+            Returns: nothing
+            Does: Stops the worker processes.
+        '''
+        self.pool.terminate()
+        self.pool.join()
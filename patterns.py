@@ -0,0 +1,318 @@
+
+'''
+This module contains the pattern evaluation of Othello game. A position is
+scored by looking up the configuration of a few groups of squares (edges,
+corners, 2x5 corner blocks and diagonals) in weight tables.
+
+Every pattern is defined once, next to the top-left corner of the board.
+Its other instances are read by turning or mirroring the whole board
+first (with a few bit operations), then reading the same squares. The
+tiles of each player on the pattern are gathered into an integer with a
+few shifts and masks, and a precomputed table turns the two integers into
+the base-3 index of the configuration (0 for empty, 1 for the player to
+move, 2 for the adversary). So the evaluation costs a handful of table
+lookups per pattern and no per-square logic.
+
+The weight tables are read from a compact binary file. Run this module to
+write the default weights (derived from the square weights of the search)
+to a file, e.g. python patterns.py --output weights.bin
+'''
+
+import argparse, struct, sys
+from array import array
+import bitboard, search
+
+# Defines the default file name of the weights and the header format as
+# constants
+WEIGHTS_FILE = 'weights.bin'
+MAGIC = b'OTHPAT01'
+HEADER = struct.Struct('<8sHh')  # magic, number of patterns, mobility
+
+def mirror_horizontal(bb):
+    ''' Function mirror_horizontal
+        Parameters: bb (integer)
+        Returns: an integer, bb with every column c moved to column 7 - c
+    '''
+    bb = (bb >> 1) & 0x5555555555555555 | (bb & 0x5555555555555555) << 1
+    bb = (bb >> 2) & 0x3333333333333333 | (bb & 0x3333333333333333) << 2
+    return (bb >> 4) & 0x0F0F0F0F0F0F0F0F | (bb & 0x0F0F0F0F0F0F0F0F) << 4
+
+def flip_vertical(bb):
+    ''' Function flip_vertical
+        Parameters: bb (integer)
+        Returns: an integer, bb with every row r moved to row 7 - r
+    '''
+    return int.from_bytes(bb.to_bytes(8, 'little'), 'big')
+
+def transpose(bb):
+    ''' Function transpose
+        Parameters: bb (integer)
+        Returns: an integer, bb with every square (row, col) moved to
+                 (col, row)
+    '''
+    t = 0x0F0F0F0F00000000 & (bb ^ (bb << 28))
+    bb ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (bb ^ (bb << 14))
+    bb ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (bb ^ (bb << 7))
+    bb ^= t ^ (t >> 7)
+    return bb
+
+# Defines the 8 symmetries of the board as the flips applied in order
+SYMMETRIES = [(), (mirror_horizontal,), (flip_vertical,),
+              (mirror_horizontal, flip_vertical), (transpose,),
+              (mirror_horizontal, transpose), (flip_vertical, transpose),
+              (mirror_horizontal, flip_vertical, transpose)]
+
+def apply_symmetry(bb, symmetry):
+    ''' Function apply_symmetry
+        Parameters: bb (integer), symmetry (integer)
+        Returns: an integer, bb turned or mirrored by SYMMETRIES[symmetry]
+    '''
+    for flip in SYMMETRIES[symmetry]:
+        bb = flip(bb)
+    return bb
+
+def extract_edge(bb):
+    ''' Function extract_edge
+        Parameters: bb (integer)
+        Returns: an integer, the tiles of bb on row 0 and on the X-squares
+                 (1, 1) and (1, 6), bit i for the i-th square of the pattern
+    '''
+    return bb & 0xFF | bb >> 1 & 0x100 | bb >> 5 & 0x200
+
+def extract_corner(bb):
+    ''' Function extract_corner
+        Parameters: bb (integer)
+        Returns: an integer, the tiles of bb on the 3x3 corner block
+    '''
+    return bb & 0x7 | bb >> 5 & 0x38 | bb >> 10 & 0x1C0
+
+def extract_block(bb):
+    ''' Function extract_block
+        Parameters: bb (integer)
+        Returns: an integer, the tiles of bb on the first 5 squares of rows
+                 0 and 1
+    '''
+    return bb & 0x1F | bb >> 3 & 0x3E0
+
+def extract_diagonal8(bb):
+    ''' Function extract_diagonal8
+        Parameters: bb (integer)
+        Returns: an integer, the tiles of bb on the main diagonal
+    '''
+    # The squares of the diagonal are in different columns, so the
+    # multiplication adds them up in the top row without carries
+    return ((bb & 0x8040201008040201) * 0x0101010101010101
+            & bitboard.FULL) >> 56
+
+def extract_diagonal7(bb):
+    ''' Function extract_diagonal7
+        Parameters: bb (integer)
+        Returns: an integer, the tiles of bb on the diagonal from (0, 1)
+                 to (6, 7)
+    '''
+    return ((bb & 0x0080402010080402) * 0x0101010101010101
+            & bitboard.FULL) >> 57
+
+# Defines every pattern as its name, its squares next to the top-left
+# corner (in the order of the digits of its index), and its extract
+# function
+PATTERNS = [
+    ('edge', [0, 1, 2, 3, 4, 5, 6, 7, 9, 14], extract_edge),
+    ('corner', [0, 1, 2, 8, 9, 10, 16, 17, 18], extract_corner),
+    ('block', [0, 1, 2, 3, 4, 8, 9, 10, 11, 12], extract_block),
+    ('diagonal8', [0, 9, 18, 27, 36, 45, 54, 63], extract_diagonal8),
+    ('diagonal7', [1, 10, 19, 28, 37, 46, 55], extract_diagonal7),
+]
+
+def build_ternary(size):
+    ''' Function build_ternary
+        Parameters: size (integer)
+        Returns: a list of integers, the base-3 value of every integer
+                 below 2 ** size read as base-3 digits 0 and 1
+    '''
+    table = [0] * (1 << size)
+    for bits in range(1, 1 << size):
+        low = bits & -bits
+        table[bits] = table[bits ^ low] + 3 ** (low.bit_length() - 1)
+    return table
+
+TERNARY = build_ternary(max(len(squares) for name, squares, f in PATTERNS))
+
+def find_instances():
+    ''' Function find_instances
+        Parameters: none
+        Returns: a list of tuples (pattern, symmetry, real_squares), one
+                 for every distinct instance of every pattern on the board
+
+        Does: Maps the squares of every pattern through every symmetry
+              and keeps the symmetries that cover a new set of squares
+              (e.g. only 4 of the 8 for an edge).
+    '''
+    instances = []
+    for pattern in range(len(PATTERNS)):
+        seen = set()
+        for symmetry in range(len(SYMMETRIES)):
+            # The square read as s after the symmetry is the real square
+            # that the symmetry moves to s
+            real = {}
+            for square in range(64):
+                moved = apply_symmetry(1 << square, symmetry)
+                real[moved.bit_length() - 1] = square
+            squares = [real[s] for s in PATTERNS[pattern][1]]
+            if frozenset(squares) not in seen:
+                seen.add(frozenset(squares))
+                instances.append((pattern, symmetry, squares))
+    return instances
+
+INSTANCES = find_instances()
+
+def default_weights():
+    ''' Function default_weights
+        Parameters: none
+        Returns: a tuple (tables, mobility), a list of weight arrays (one
+                 per pattern) and the weight of a move of mobility
+
+        Does: Derives weights from search.SQUARE_WEIGHTS: every square's
+              weight is split evenly between the pattern instances that
+              cover it, so the pattern score of a position is close to
+              its positional score.
+    '''
+    coverage = [0] * 64
+    for pattern, symmetry, squares in INSTANCES:
+        for square in squares:
+            coverage[square] += 1
+
+    tables = []
+    for name, squares, extract in PATTERNS:
+        share = [search.SQUARE_WEIGHTS[s] / coverage[s] for s in squares]
+        table = array('h', bytes(2 * 3 ** len(squares)))
+        for index in range(len(table)):
+            value, digits = 0.0, index
+            for i in range(len(squares)):
+                digit = digits % 3
+                digits //= 3
+                if digit == 1:
+                    value += share[i]
+                elif digit == 2:
+                    value -= share[i]
+            table[index] = round(value)
+        tables.append(table)
+    return tables, search.MOBILITY_WEIGHT
+
+def save_weights(filename, tables, mobility):
+    ''' Function save_weights
+        Parameters: filename (string), tables (list of arrays),
+                    mobility (integer)
+        Returns: nothing
+
+        Does: Writes the header and every weight table, as little-endian
+              16-bit integers, to the file.
+    '''
+    with open(filename, 'wb') as outfile:
+        outfile.write(HEADER.pack(MAGIC, len(tables), mobility))
+        for table in tables:
+            outfile.write(struct.pack('<I', len(table)))
+            if sys.byteorder == 'big':
+                table = array('h', table)
+                table.byteswap()
+            table.tofile(outfile)
+
+def load_weights(filename):
+    ''' Function load_weights
+        Parameters: filename (string)
+        Returns: a tuple (tables, mobility), as written by save_weights
+
+        Does: Reads the weight tables from the file. Raises ValueError if
+              it does not hold one table of the right size per pattern.
+    '''
+    with open(filename, 'rb') as infile:
+        magic, count, mobility = HEADER.unpack(infile.read(HEADER.size))
+        if magic != MAGIC or count != len(PATTERNS):
+            raise ValueError('%s is not a pattern weights file' % filename)
+        tables = []
+        for name, squares, extract in PATTERNS:
+            size = struct.unpack('<I', infile.read(4))[0]
+            if size != 3 ** len(squares):
+                raise ValueError('wrong size for pattern %s in %s'
+                                 % (name, filename))
+            table = array('h')
+            table.fromfile(infile, size)
+            if sys.byteorder == 'big':
+                table.byteswap()
+            tables.append(table)
+    return tables, mobility
+
+class PatternEvaluator:
+    ''' PatternEvaluator class.
+        Attributes: tables, a list of weight arrays, one per pattern
+                    mobility, an integer for the weight of a move of
+                    mobility
+                    instances, a list with one list of (extract, table)
+                    tuples per symmetry, for the pattern instances read
+                    after that symmetry
+        filename (string) is optional in the __init__ function (the
+        default weights are used without it); tables, mobility and
+        instances are not taken in the __init__
+
+        Methods: evaluate
+    '''
+
+    def __init__(self, filename = None):
+        '''
+            Initilizes the attributes.
+            Only takes one optional parameter; others have default values.
+        '''
+        if filename is None:
+            self.tables, self.mobility = default_weights()
+        else:
+            self.tables, self.mobility = load_weights(filename)
+        self.instances = [[] for symmetry in SYMMETRIES]
+        for pattern, symmetry, squares in INSTANCES:
+            self.instances[symmetry].append((PATTERNS[pattern][2],
+                                             self.tables[pattern]))
+
+    def evaluate(self, own, opp):
+        ''' Method: evaluate
+            Parameters: self, own (integer), opp (integer)
+            Returns: an integer, the score of the position for the player
+                     owning the tiles in own (same scale as
+                     search.evaluate)
+        '''
+        # Turn the board into all 8 symmetries, in the order of SYMMETRIES
+        own_h = mirror_horizontal(own)
+        opp_h = mirror_horizontal(opp)
+        boards = [(own, opp), (own_h, opp_h),
+                  (flip_vertical(own), flip_vertical(opp)),
+                  (flip_vertical(own_h), flip_vertical(opp_h))]
+        for i in range(4):
+            boards.append((transpose(boards[i][0]), transpose(boards[i][1])))
+
+        ternary = TERNARY
+        score = 0
+        for symmetry in range(8):
+            own_s, opp_s = boards[symmetry]
+            for extract, table in self.instances[symmetry]:
+                score += table[ternary[extract(own_s)] +
+                               2 * ternary[extract(opp_s)]]
+        mobility = bitboard.legal_moves(own, opp).bit_count() - \
+                   bitboard.legal_moves(opp, own).bit_count()
+        return score + self.mobility * mobility
+
+def main():
+    # Reads the options of the weights writer from the command line
+    parser = argparse.ArgumentParser(
+        description='Write the default pattern weights to a file.')
+    parser.add_argument('--output', default=WEIGHTS_FILE,
+                        help='file to write the weights to')
+    args = parser.parse_args()
+
+    tables, mobility = default_weights()
+    save_weights(args.output, tables, mobility)
+    print('Wrote %d pattern tables (%d weights) to %s'
+          % (len(tables), sum(len(t) for t in tables), args.output))
+
+
+if __name__ == '__main__':
+    main()
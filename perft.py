@@ -0,0 +1,236 @@
+
+'''
+This module contains the perft counter of Othello game. Perft counts the
+positions reached after exactly d plies from a position, which checks the
+rules code (legal moves, flips and passes) against known counts and
+measures how fast moves are generated.
+
+A pass is one ply, like a move. A game that ends before depth d counts as
+one position. The counts from the start position are the ones in
+REFERENCE, e.g. 390216 at depth 8.
+
+Two counters are here: perft_state goes through GameState (get_legal_moves,
+make_move, switch_player) on a board of any size (with --check, other sizes
+are counted again with the nested lists only, to check the wide bitboards
+against them), and perft works on 8x8
+bitboards directly, optionally with a cache of the counts of the subtrees
+already met. Many move orders reach the same position, and the 8
+symmetries of the board (rotations and reflections) give the same count,
+so the cache stores one count per position up to symmetry: from the start
+position, the four first moves alone share one subtree. This makes depth
+10 and more fast enough.
+
+Run it from the command line, e.g.
+    python perft.py --depth 9 --divide --cache 4000000
+    python perft.py --depth 6 --moves f5d6c3 --check
+'''
+
+import argparse, re, time, bitboard
+from patterns import mirror_horizontal, flip_vertical, transpose
+from gamestate import GameState
+from record import move_to_str, str_to_move
+
+# Defines the perft counts from the 8x8 start position, indexed by depth,
+# and the default number of subtree counts the cache holds as constants
+REFERENCE = [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288,
+             24571284, 212258800, 1939886636]
+CACHE_ENTRIES = 1 << 22
+
+def canonical(own, opp):
+    ''' Function canonical
+        Parameters: own (integer), opp (integer)
+        Returns: a tuple of integers (own, opp), the smallest of the 8
+                 symmetric images of the position
+    '''
+    best = (own, opp)
+    for x, y in ((own, opp), (transpose(own), transpose(opp))):
+        vertical = (flip_vertical(x), flip_vertical(y))
+        for image in ((x, y), vertical,
+                      (mirror_horizontal(x), mirror_horizontal(y)),
+                      (mirror_horizontal(vertical[0]),
+                       mirror_horizontal(vertical[1]))):
+            if image < best:
+                best = image
+    return best
+
+def perft(own, opp, depth, cache = None, cache_entries = CACHE_ENTRIES):
+    ''' Function perft
+        Parameters: own (integer), opp (integer), depth (integer),
+                    cache (dictionary, optional), cache_entries (integer,
+                    optional)
+        Returns: an integer, the number of positions after depth plies
+                 from the position where the player owning the tiles in own
+                 is to move
+
+        Does: Counts the moves of the last ply without playing them. If
+              cache is given, the counts of the subtrees at least 2 plies
+              deep are stored in it by canonical position and depth, up
+              to cache_entries of them, and read back when the same
+              position (or a symmetric one) is met again.
+    '''
+    if depth == 0:
+        return 1
+    moves = bitboard.legal_moves(own, opp)
+    if not moves:
+        if not bitboard.legal_moves(opp, own):
+            return 1
+        return perft(opp, own, depth - 1, cache, cache_entries)
+    if depth == 1:
+        return moves.bit_count()
+    if cache is not None:
+        key = canonical(own, opp) + (depth,)
+        total = cache.get(key)
+        if total is not None:
+            return total
+    total = 0
+    while moves:
+        move = moves & -moves
+        moves ^= move
+        flipped = bitboard.flips(own, opp, move.bit_length() - 1)
+        total += perft(opp & ~flipped, own | flipped | move, depth - 1,
+                       cache, cache_entries)
+    if cache is not None and len(cache) < cache_entries:
+        cache[key] = total
+    return total
+
+def perft_state(state, depth):
+    ''' Function perft_state
+        Parameters: state (GameState), depth (integer)
+        Returns: an integer, the number of positions after depth plies
+                 from state
+
+        Does: Plays every move on a copy of the state with the GameState
+              methods, so it works on a board of any size and checks them.
+              Slower than perft.
+    '''
+    if depth == 0:
+        return 1
+    moves = state.get_legal_moves()
+    if not moves:
+        if state.is_game_over():
+            return 1
+        child = state.copy()
+        child.switch_player()
+        return perft_state(child, depth - 1)
+    total = 0
+    for move in moves:
+        child = state.copy()
+        child.make_move(move)
+        child.switch_player()
+        total += perft_state(child, depth - 1)
+    return total
+
+def divide(state, depth, cache = None, cache_entries = CACHE_ENTRIES,
+           use_state = False):
+    ''' Function divide
+        Parameters: state (GameState), depth (integer), cache (dictionary,
+                    optional), cache_entries (integer, optional), use_state
+                    (boolean, optional)
+        Returns: a list of tuples (move, count): every move of state (None
+                 for a pass) and the number of positions after depth plies
+                 through it
+
+        Does: Counts with perft_state if use_state is True or the board is
+              not 8x8, with perft otherwise. The list is empty if the game
+              is over (or depth is 0).
+    '''
+    if depth == 0 or state.is_game_over():
+        return []
+    moves = state.get_legal_moves() or [None]
+    counts = []
+    for move in moves:
+        child = state.copy()
+        if move is not None:
+            child.make_move(move)
+        child.switch_player()
+        if use_state or not child.use_bitboards:
+            count = perft_state(child, depth - 1)
+        else:
+            player = child.current_player
+            count = perft(child.bitboards[player],
+                          child.bitboards[1 - player], depth - 1, cache,
+                          cache_entries)
+        counts.append((move, count))
+    return counts
+
+def position_after(moves, n = 8, wide_bitboards = True):
+    ''' Function position_after
+        Parameters: moves (string), n (integer, optional), wide_bitboards
+                    (boolean, optional)
+        Returns: a GameState, the position after the moves (e.g. 'f5d6c3')
+                 from the start position, passing when needed
+
+        Does: Raises ValueError if a move is not legal.
+    '''
+    state = GameState(n, wide_bitboards)
+    state.initialize_board()
+    for text in re.findall(r'[a-z][0-9]+', moves.lower()):
+        if not state.has_legal_move():
+            state.switch_player()
+        move = str_to_move(text)
+        if not state.is_legal_move(move):
+            raise ValueError('illegal move ' + text)
+        state.play_move(move)
+    return state
+
+def main():
+    # Reads the position and the depth to count from the command line
+    parser = argparse.ArgumentParser(
+        description='Count the positions after a number of plies.')
+    parser.add_argument('--depth', type=int, default=6,
+                        help='number of plies (a pass is a ply)')
+    parser.add_argument('--moves', default='',
+                        help="moves to play from the start, e.g. 'f5d6c3'")
+    parser.add_argument('--size', type=int, default=8,
+                        help='size n of the nxn board')
+    parser.add_argument('--divide', action='store_true',
+                        help='print the count of every move')
+    parser.add_argument('--cache', type=int, default=0, metavar='ENTRIES',
+                        help='number of subtree counts to cache (8x8 only)')
+    parser.add_argument('--check', action='store_true',
+                        help='count again with GameState (with nested '
+                             'lists only on other sizes than 8x8) and '
+                             'compare')
+    args = parser.parse_args()
+
+    try:
+        state = position_after(args.moves, args.size)
+    except ValueError as error:
+        parser.error(str(error))
+    cache = {} if args.cache > 0 else None
+
+    start = time.perf_counter()
+    if args.divide:
+        counts = divide(state, args.depth, cache, args.cache)
+        for move, count in counts:
+            print('%s: %d' % ('pass' if move is None else move_to_str(move),
+                              count))
+        total = sum(count for move, count in counts) if counts else 1
+    elif state.use_bitboards:
+        player = state.current_player
+        total = perft(state.bitboards[player], state.bitboards[1 - player],
+                      args.depth, cache, args.cache)
+    else:
+        total = perft_state(state, args.depth)
+    elapsed = time.perf_counter() - start
+    print('perft(%d) = %d in %.2fs (%.0f positions/s)'
+          % (args.depth, total, elapsed,
+             total / elapsed if elapsed > 0 else 0.0))
+
+    # Compares the count with the reference and with GameState if asked
+    if not args.moves and args.size == 8 and args.depth < len(REFERENCE):
+        print('reference: %s' % ('ok' if total == REFERENCE[args.depth]
+                                 else 'MISMATCH, expected %d'
+                                 % REFERENCE[args.depth]))
+    if args.check:
+        start = time.perf_counter()
+        if not state.use_bitboards:
+            state = position_after(args.moves, args.size, False)
+        checked = perft_state(state, args.depth)
+        print('GameState: %s in %.2fs' % ('ok' if checked == total else
+                                          'MISMATCH, counted %d' % checked,
+                                          time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+
+'''
+This module contains the computer players of Othello game that can be
+plugged into the headless tools (e.g. the self-play runner). A player is
+described by a spec string: a name, optionally followed by a colon and
+comma-separated options, e.g. 'random' or 'search:depth=4' or
+'search:time=0.05,weights=weights.bin' or 'mcts:playouts=2000'.
+'''
+
+import random, bitboard, search, patterns, mcts
+
+class RandomPlayer:
+    ''' RandomPlayer class.
+        Attributes: rng, a random.Random used to choose moves
+        No parameter is taken in the __init__
+
+        Methods: new_game and choose_move
+    '''
+
+    def __init__(self):
+        '''
+            Initilizes the attributes.
+        '''
+        self.rng = random.Random()
+
+    def new_game(self, seed):
+        ''' Method: new_game
+            Parameters: self, seed (integer)
+            Returns: nothing
+            Does: Reseeds the player so that a game can be replayed.
+        '''
+        self.rng.seed(seed)
+
+    def choose_move(self, state):
+        ''' Method: choose_move
+            Parameters: self, state (GameState)
+            Returns: a tuple (row, col), a random legal move of the current
+                     player
+        '''
+        return self.rng.choice(state.get_legal_moves())
+
+class SearchPlayer:
+    ''' SearchPlayer class.
+        Attributes: searcher, the search.Searcher choosing the moves
+        time_limit (float), depth (integer) and evaluator (function) are
+        optional in the __init__ function; with a depth and no time limit,
+        the player is deterministic
+
+        Methods: new_game and choose_move
+    '''
+
+    def __init__(self, time_limit = search.TIME_LIMIT,
+                 depth = search.MAX_DEPTH, evaluator = search.evaluate):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        self.searcher = search.Searcher(time_limit, None, depth,
+                                        evaluator=evaluator)
+
+    def new_game(self, seed):
+        ''' Method: new_game
+            Parameters: self, seed (integer)
+            Returns: nothing
+            Does: Clears the transposition table, so that a game does not
+                  depend on the games played before it.
+        '''
+        if self.searcher.table is not None:
+            self.searcher.table.clear()
+
+    def choose_move(self, state):
+        ''' Method: choose_move
+            Parameters: self, state (GameState)
+            Returns: a tuple (row, col), the best move found by the search
+        '''
+        return self.searcher.search(state).move
+
+def make_search_player(options):
+    ''' Function make_search_player
+        Parameters: options (dictionary of strings)
+        Returns: a SearchPlayer
+
+        Does: Creates a search player from the 'time' (seconds), 'depth'
+              and 'weights' (pattern weights file) options. Giving only a
+              depth turns off the time limit. Without weights, positions
+              are scored with search.evaluate. Raises ValueError for any
+              other option.
+    '''
+    for key in options:
+        if key not in ('time', 'depth', 'weights'):
+            raise ValueError('unknown option %r of player search' % key)
+    time_limit = search.TIME_LIMIT
+    if 'depth' in options:
+        time_limit = None
+    if 'time' in options:
+        time_limit = float(options['time'])
+    depth = int(options.get('depth', search.MAX_DEPTH))
+    evaluator = search.evaluate
+    if 'weights' in options:
+        evaluator = patterns.PatternEvaluator(options['weights']).evaluate
+    return SearchPlayer(time_limit, depth, evaluator)
+
+def make_mcts_player(options):
+    ''' Function make_mcts_player
+        Parameters: options (dictionary of strings)
+        Returns: an mcts.MCTSPlayer
+
+        Does: Creates a Monte Carlo player from the 'playouts', 'time'
+              (seconds), 'batch' and 'c' (exploration constant) options.
+              Giving only playouts turns off the time limit. Raises
+              ValueError for any other option.
+    '''
+    for key in options:
+        if key not in ('playouts', 'time', 'batch', 'c'):
+            raise ValueError('unknown option %r of player mcts' % key)
+    time_limit = mcts.TIME_LIMIT
+    if 'playouts' in options:
+        time_limit = None
+    if 'time' in options:
+        time_limit = float(options['time'])
+    playouts = None
+    if 'playouts' in options:
+        playouts = int(options['playouts'])
+    return mcts.MCTSPlayer(playouts, time_limit,
+                           float(options.get('c', mcts.EXPLORATION)),
+                           int(options.get('batch', mcts.BATCH)))
+
+# Defines the name of every kind of player and the function creating it
+# from its options, and the players that only play on an 8x8 board, as
+# constants
+PLAYERS = {'random': lambda options: RandomPlayer(),
+           'search': make_search_player,
+           'mcts': make_mcts_player}
+BITBOARD_PLAYERS = ('search', 'mcts')
+
+def make_player(spec, n = 8):
+    ''' Function make_player
+        Parameters: spec (string), n (integer, optional)
+        Returns: a new player described by spec, for an nxn board
+
+        Does: Parses spec ('name' or 'name:key=value,key=value') and
+              creates the player. Raises ValueError if the name or an
+              option is unknown, or if the player needs an 8x8 board
+              (search and mcts) and n is not 8.
+    '''
+    name, _, option_str = spec.partition(':')
+    if name not in PLAYERS:
+        raise ValueError('unknown player %r (known: %s)'
+                         % (name, ', '.join(sorted(PLAYERS))))
+    if name in BITBOARD_PLAYERS and n != bitboard.SIZE:
+        raise ValueError('%s needs an 8x8 board' % name)
+    options = {}
+    for option in option_str.split(','):
+        if option:
+            key, sep, value = option.partition('=')
+            if not sep:
+                raise ValueError('option %r of player %r is not key=value'
+                                 % (option, name))
+            options[key] = value
+    return PLAYERS[name](options)
@@ -0,0 +1,169 @@
+
+'''
+This module contains the Position class, an immutable snapshot of an
+Othello position: the tiles of each player packed into one integer (bit
+row * n + col, as in the bitboards) and the player to move.
+
+Unlike a GameState, a Position cannot change, so it can be a dictionary
+key or a set member, and it is compared and hashed without walking a
+board. It is cheap to create, takes a fraction of the memory of a nested
+board list and pickles as four integers, so it can key caches and books
+or be sent to other processes: the book builder keeps the positions it
+has visited as a set of them, and a replay its checkpoints. from_state
+takes the snapshot of a GameState (or of the state of a game, see
+Othello.get_position) and to_state and load turn it back into one.
+'''
+
+import bitboard, zobrist
+from gamestate import GameState
+
+class Position:
+    ''' Position class.
+        Attributes: black, an integer with bit (row * n + col) set for
+                    every black tile
+                    white, an integer with bit (row * n + col) set for
+                    every white tile
+                    player, an integer for the player to move (0 for black,
+                    1 for white)
+                    n, an integer for nxn board
+                    hash_value, an integer, the hash of the position
+                    (computed once, as positions are used as keys)
+        black and white (integers) are required in the __init__ function;
+        player and n (integers) are optional; hash_value is not taken in
+        the __init__. The attributes cannot be changed.
+
+        Methods: to_state, load, get_tile, __setattr__, __delattr__,
+                 __eq__, __hash__, __reduce__ and __repr__
+    '''
+
+    __slots__ = ('black', 'white', 'player', 'n', 'hash_value')
+
+    def __init__(self, black, white, player = 0, n = 8):
+        '''
+            Initilizes the attributes.
+            Raises ValueError if a square holds both colors, a tile is off
+            the board or player is not 0 or 1.
+        '''
+        if black & white or (black | white) >> (n * n) or \
+           black < 0 or white < 0:
+            raise ValueError('tiles overlap or are off the board')
+        if player not in (0, 1):
+            raise ValueError('unknown player %r' % (player,))
+        # The attributes are set through object, as __setattr__ refuses
+        # to change them
+        object.__setattr__(self, 'black', black)
+        object.__setattr__(self, 'white', white)
+        object.__setattr__(self, 'player', player)
+        object.__setattr__(self, 'n', n)
+        object.__setattr__(self, 'hash_value',
+                           hash((black, white, player, n)))
+
+    def to_state(self, wide_bitboards = True):
+        ''' Method: to_state
+            Parameters: self, wide_bitboards (boolean, optional)
+            Returns: a new GameState with this position (with no rules on
+                     a board other than 8x8 if wide_bitboards is False)
+        '''
+        state = GameState(self.n, wide_bitboards)
+        self.load(state)
+        return state
+
+    def load(self, state):
+        ''' Method: load
+            Parameters: self, state (GameState)
+            Returns: nothing
+            Does: Puts this position on state: its board (emptied in place,
+                  as a game shares its rows), bitboards or cells, number of
+                  tiles, player to move and hash. The legal move cache is
+                  dropped. Raises ValueError if the board sizes differ.
+        '''
+        n = self.n
+        if state.n != n:
+            raise ValueError('cannot load a %dx%d position on a %dx%d board'
+                             % (n, n, state.n, state.n))
+        cells = [(self.black >> square & 1) | (self.white >> square & 1) << 1
+                 for square in range(n * n)]
+        for row in range(n):
+            state.board[row][:] = cells[row * n:(row + 1) * n]
+        if state.cells is not None:
+            state.cells = cells
+        state.bitboards = [0, 0]
+        if state.rules is not None:
+            state.bitboards = [self.black, self.white]
+        state.num_tiles = [bitboard.count(self.black),
+                           bitboard.count(self.white)]
+        state.current_player = self.player
+        state.legal_cache = None
+        state.hash_key = zobrist.hash_bitboards(self.black, self.white,
+                                                self.player, n)
+
+    def get_tile(self, row, col):
+        ''' Method: get_tile
+            Parameters: self, row (integer), col (integer)
+            Returns: an integer, the tile on (row, col) as in a board (0 for
+                     no tile, 1 for black tiles and 2 for white tiles)
+        '''
+        square = row * self.n + col
+        return (self.black >> square & 1) | (self.white >> square & 1) << 1
+
+    def __setattr__(self, name, value):
+        '''
+            Refuses to change an attribute: positions are immutable.
+        '''
+        raise AttributeError('Position is immutable')
+
+    def __delattr__(self, name):
+        '''
+            Refuses to delete an attribute: positions are immutable.
+        '''
+        raise AttributeError('Position is immutable')
+
+    def __eq__(self, other):
+        '''
+            Compares two instances.
+            Returns True if they have the same tiles, player to move and
+            board size, False otherwise.
+        '''
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.black == other.black and self.white == other.white and \
+               self.player == other.player and self.n == other.n
+
+    def __hash__(self):
+        '''
+            Returns the hash of the position.
+        '''
+        return self.hash_value
+
+    def __reduce__(self):
+        '''
+            Returns how to pickle the position: the class and the four
+            integers given to the __init__ function.
+        '''
+        return (Position, (self.black, self.white, self.player, self.n))
+
+    def __repr__(self):
+        '''
+            Returns a printable version of the position.
+        '''
+        return 'Position(0x%x, 0x%x, %d, %d)' % (self.black, self.white,
+                                                 self.player, self.n)
+
+def from_state(state):
+    ''' Function from_state
+        Parameters: state (GameState)
+        Returns: the Position of state
+
+        Does: Reads the bitboards of state, or packs its cells when it has
+              no rules.
+    '''
+    if state.rules is not None:
+        black, white = state.bitboards
+    else:
+        black = white = 0
+        for square, tile in enumerate(state.cells):
+            if tile == 1:
+                black |= 1 << square
+            elif tile == 2:
+                white |= 1 << square
+    return Position(black, white, state.current_player, state.n)
@@ -0,0 +1,180 @@
+
+'''
+This module contains the ray tables of Othello game, the rules core of the
+boards played without bitboards (see GameState with wide_bitboards=False).
+
+The board is a flat list of n * n tiles, with square (row, col) at index
+row * n + col. For every square, the squares from it to the edge of the
+board along each direction are listed once per board size by
+get_ray_table, so checking or flipping a line is a loop over a prebuilt
+tuple instead of computing and bounds-checking every coordinate. Rays too
+short to flip anything (less than 2 squares) are left out of the lines of
+a square, and a square whose neighbours are all empty is skipped before
+any of its rays is looked at.
+'''
+
+from bitboard import MOVE_DIRS
+
+# Stores the ray tables of every board size that has been used
+RAY_TABLES = {}
+
+class RayTable:
+    ''' RayTable class.
+        Attributes: n, an integer for nxn board
+                    coords, a list of tuples, the (row, col) of every square
+                    rays, a list of lists of tuples: for every square, the
+                    squares from it (not included) to the edge of the board
+                    along each direction, in the order of MOVE_DIRS
+                    lines, a list of tuples of tuples: for every square,
+                    its rays of at least 2 squares (the only ones along
+                    which a move can flip tiles)
+                    neighbours, a list of tuples: for every square, the
+                    squares next to it
+        n (integer) is required in the __init__ function; coords, rays,
+        lines and neighbours are not taken in the __init__
+
+        Methods: run, is_legal, legal_moves, flips, affected, to_square
+                 and to_coord
+    '''
+
+    def __init__(self, n):
+        '''
+            Initilizes the attributes and computes the rays of the
+            board size.
+        '''
+        self.n = n
+        self.coords = [divmod(square, n) for square in range(n * n)]
+        self.rays = []
+        self.lines = []
+        self.neighbours = []
+        for row, col in self.coords:
+            rays = []
+            for dr, dc in MOVE_DIRS:
+                ray = []
+                r = row + dr
+                c = col + dc
+                while 0 <= r < n and 0 <= c < n:
+                    ray.append(r * n + c)
+                    r += dr
+                    c += dc
+                rays.append(tuple(ray))
+            self.rays.append(rays)
+            self.lines.append(tuple(ray for ray in rays if len(ray) >= 2))
+            self.neighbours.append(tuple(ray[0] for ray in rays if ray))
+
+    def run(self, cells, ray, own, opp):
+        ''' Method: run
+            Parameters: self, cells (list of integers), ray (tuple of
+                        integers), own (integer), opp (integer), the tiles
+                        of the player and of the adversary
+            Returns: an integer, the number of the adversary's tiles flipped
+                     along ray (0 if none)
+
+            Does: Counts the adversary's tiles from the start of the ray;
+                  they are flipped only if the first other square holds
+                  one of the player's tiles.
+        '''
+        count = 0
+        for square in ray:
+            tile = cells[square]
+            if tile != opp:
+                if tile == own:
+                    return count
+                return 0
+            count += 1
+        return 0
+
+    def is_legal(self, cells, square, own, opp):
+        ''' Method: is_legal
+            Parameters: self, cells (list of integers), square (integer),
+                        own (integer), opp (integer)
+            Returns: boolean (True if the player with the tiles own can
+                     play on square, False otherwise)
+        '''
+        if cells[square]:
+            return False
+        for ray in self.lines[square]:
+            if cells[ray[0]] == opp and self.run(cells, ray, own, opp):
+                return True
+        return False
+
+    def legal_moves(self, cells):
+        ''' Method: legal_moves
+            Parameters: self, cells (list of integers)
+            Returns: a list of two sets of tuples, the (row, col) of the
+                     legal moves of black and of white
+
+            Does: Checks every empty square once for both players, looking
+                  only at the rays of a player whose adversary has a tile
+                  next to the square.
+        '''
+        legal = [set(), set()]
+        for square in range(self.n * self.n):
+            if cells[square]:
+                continue
+            seen = 0
+            for other in self.neighbours[square]:
+                seen |= cells[other]
+            # Black (1) needs a white tile (2) next to the square, and
+            # white a black one
+            if seen & 2 and self.is_legal(cells, square, 1, 2):
+                legal[0].add(self.coords[square])
+            if seen & 1 and self.is_legal(cells, square, 2, 1):
+                legal[1].add(self.coords[square])
+        return legal
+
+    def flips(self, cells, square, own, opp):
+        ''' Method: flips
+            Parameters: self, cells (list of integers), square (integer),
+                        own (integer), opp (integer)
+            Returns: a list of integers, the squares of the tiles flipped by
+                     a move on square (empty if the move is not legal)
+        '''
+        flipped = []
+        for ray in self.lines[square]:
+            if cells[ray[0]] == opp:
+                count = self.run(cells, ray, own, opp)
+                if count:
+                    flipped.extend(ray[:count])
+        return flipped
+
+    def affected(self, cells, square):
+        ''' Method: affected
+            Parameters: self, cells (list of integers), square (integer)
+            Returns: a list of integers, the first empty square along every
+                     direction from square (the only empty squares whose
+                     legality a change on square can alter)
+        '''
+        found = []
+        for ray in self.rays[square]:
+            for other in ray:
+                if not cells[other]:
+                    found.append(other)
+                    break
+        return found
+
+    def to_square(self, row, col):
+        ''' Method: to_square
+            Parameters: self, row (integer), col (integer)
+            Returns: an integer, the index of square (row, col) in cells
+        '''
+        return row * self.n + col
+
+    def to_coord(self, square):
+        ''' Method: to_coord
+            Parameters: self, square (integer)
+            Returns: a tuple of integers (row, col) for the index square
+        '''
+        return self.coords[square]
+
+def get_ray_table(n):
+    ''' Function get_ray_table
+        Parameters: n (integer)
+        Returns: the RayTable of an nxn board
+
+        Does: Computes the rays of an nxn board the first time they are
+              needed and reuses them afterwards.
+    '''
+    if n not in RAY_TABLES:
+        RAY_TABLES[n] = RayTable(n)
+    return RAY_TABLES[n]
@@ -0,0 +1,224 @@
+
+'''
+This module contains the game records of Othello game: a compact binary
+format for finished or unfinished games, a writer and a reader for files
+of records, and a replay that jumps to any ply of a game.
+
+A record is a small header (magic, board size, bytes per move, number of
+moves) followed by the moves, one byte each (row * n + col) on boards of
+up to 16x16 and two bytes each on larger ones. Passes are not stored:
+they are found again by the rules when the game is replayed. A file is
+any number of records one after the other, so games can be appended.
+
+Moves are also written as text in the usual notation (e.g. 'd3'), as in
+the self-play results and the perft command line.
+
+Run this module to print a position of a recorded game, e.g.
+    python record.py games.rec --game 0 --ply 20
+'''
+
+import argparse, struct, position
+from gamestate import GameState
+
+# Defines the default file name of the records, the header format, and
+# the number of plies between two checkpoints of a replay as constants
+RECORD_FILE = 'games.rec'
+MAGIC = b'OGR1'
+HEADER = struct.Struct('<4sBBH')  # magic, n, bytes per move, moves
+CHECKPOINT_EVERY = 8
+
+def move_to_str(move):
+    ''' Function move_to_str
+        Parameters: move (tuple)
+        Returns: a string, the move in the usual notation (column letter
+                 and row number, e.g. 'd3' for (2, 3))
+    '''
+    return 'abcdefghijklmnopqrstuvwxyz'[move[1]] + str(move[0] + 1)
+
+def str_to_move(text):
+    ''' Function str_to_move
+        Parameters: text (string)
+        Returns: a tuple (row, col), the move written by move_to_str
+    '''
+    return (int(text[1:]) - 1, 'abcdefghijklmnopqrstuvwxyz'.index(text[0]))
+
+def encode_game(moves, n = 8):
+    ''' Function encode_game
+        Parameters: moves (list of tuples), n (integer, optional)
+        Returns: bytes, the record of the game
+    '''
+    move_size = 1 if n * n <= 256 else 2
+    data = bytearray(HEADER.pack(MAGIC, n, move_size, len(moves)))
+    for row, col in moves:
+        data += (row * n + col).to_bytes(move_size, 'little')
+    return bytes(data)
+
+def decode_game(data, offset = 0):
+    ''' Function decode_game
+        Parameters: data (bytes), offset (integer, optional)
+        Returns: a tuple (moves, n, end): the moves (row, col) and board
+                 size of the record starting at offset, and the offset
+                 right after it
+
+        Does: Raises ValueError if there is no complete record at offset.
+    '''
+    if len(data) - offset < HEADER.size:
+        raise ValueError('truncated game record header')
+    magic, n, move_size, count = HEADER.unpack_from(data, offset)
+    if magic != MAGIC or move_size not in (1, 2):
+        raise ValueError('not a game record')
+    start = offset + HEADER.size
+    end = start + count * move_size
+    if len(data) < end:
+        raise ValueError('truncated game record')
+    moves = []
+    for i in range(start, end, move_size):
+        square = int.from_bytes(data[i:i + move_size], 'little')
+        moves.append((square // n, square % n))
+    return moves, n, end
+
+class RecordWriter:
+    ''' RecordWriter class.
+        Attributes: filename, a string for the name of the records file
+                    outfile, the file opened for appending
+                    count, an integer for the games written
+        filename (string) is optional in the __init__ function
+        outfile and count are not taken in the __init__
+
+        Methods: write_game and close
+    '''
+
+    def __init__(self, filename = RECORD_FILE):
+        '''
+            Initilizes the attributes and opens the file to append games
+            to it.
+        '''
+        self.filename = filename
+        self.outfile = open(filename, 'ab')
+        self.count = 0
+
+    def write_game(self, moves, n = 8):
+        ''' Method: write_game
+            Parameters: self, moves (list of tuples), n (integer, optional)
+            Returns: nothing
+            Does: Appends the record of a game to the file.
+        '''
+        self.outfile.write(encode_game(moves, n))
+        self.count += 1
+
+    def close(self):
+        ''' Method: close
+            Parameters: self
+            Returns: nothing
+            Does: Closes the file.
+        '''
+        self.outfile.close()
+
+def read_games(filename = RECORD_FILE):
+    ''' Function read_games
+        Parameters: filename (string, optional)
+        Returns: a list of tuples (moves, n), one per record of the file
+
+        Does: Reads every record of the file. Raises ValueError if the
+              file holds something else than complete records.
+    '''
+    with open(filename, 'rb') as infile:
+        data = infile.read()
+    games = []
+    offset = 0
+    while offset < len(data):
+        moves, n, offset = decode_game(data, offset)
+        games.append((moves, n))
+    return games
+
+class Replay:
+    ''' Replay class.
+        Attributes: moves, a list of tuples (row, col) for the moves of the
+                    game
+                    n, an integer for the size of the board
+                    interval, an integer for the plies between checkpoints
+                    checkpoints, a list of position.Positions, the position
+                    after every interval plies (the start position first)
+        moves (list) is required in the __init__ function; n and interval
+        (integers) are optional; checkpoints is not taken in the __init__
+
+        Methods: play, seek and __len__
+    '''
+
+    def __init__(self, moves, n = 8, interval = CHECKPOINT_EVERY):
+        '''
+            Initilizes the attributes and replays the game once to store
+            its checkpoints. Raises ValueError if a move is not legal.
+        '''
+        self.moves = moves
+        self.n = n
+        self.interval = interval
+        state = GameState(n)
+        state.initialize_board()
+        self.checkpoints = [position.from_state(state)]
+        for ply in range(len(moves)):
+            self.play(state, ply)
+            if (ply + 1) % interval == 0:
+                self.checkpoints.append(position.from_state(state))
+
+    def play(self, state, ply):
+        ''' Method: play
+            Parameters: self, state (GameState), ply (integer)
+            Returns: nothing
+            Does: Plays the move of the given ply on state, after a pass if
+                  the player to move has no legal move. Raises ValueError
+                  if the move is not legal.
+        '''
+        if not state.has_legal_move():
+            state.switch_player()
+        if not state.is_legal_move(self.moves[ply]):
+            raise ValueError('illegal move %s at ply %d'
+                             % (self.moves[ply], ply))
+        state.play_move(self.moves[ply])
+
+    def seek(self, ply):
+        ''' Method: seek
+            Parameters: self, ply (integer)
+            Returns: a new GameState, the position after the first ply
+                     moves of the game
+            Does: Loads the last checkpoint before ply and plays the few
+                  moves after it (fewer than self.interval).
+        '''
+        if not 0 <= ply <= len(self.moves):
+            raise IndexError('ply %d out of range' % ply)
+        state = self.checkpoints[ply // self.interval].to_state()
+        for i in range(ply - ply % self.interval, ply):
+            self.play(state, i)
+        return state
+
+    def __len__(self):
+        '''
+            Returns the number of moves of the game.
+        '''
+        return len(self.moves)
+
+def main():
+    # Reads the game and the ply to show from the command line
+    parser = argparse.ArgumentParser(
+        description='Show a position of a recorded game.')
+    parser.add_argument('filename', nargs='?', default=RECORD_FILE,
+                        help='game records file')
+    parser.add_argument('--game', type=int, default=0,
+                        help='index of the game in the file')
+    parser.add_argument('--ply', type=int,
+                        help='number of moves to play (default: all)')
+    args = parser.parse_args()
+
+    games = read_games(args.filename)
+    if not 0 <= args.game < len(games):
+        parser.error('the file has %d games' % len(games))
+    moves, n = games[args.game]
+    replay = Replay(moves, n)
+    ply = len(replay) if args.ply is None else args.ply
+    state = replay.seek(ply)
+    print('Game %d, ply %d of %d' % (args.game, ply, len(replay)))
+    print(state)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,40 @@
 
 '''
 This module contains score-related functions used by Othello game
+
+The high scores are kept in a SQLite database (ScoreStore) with an index
+on the scores and one on the names, so a new score is inserted in
+O(log n) and the top scores and the best score of a player are read from
+the indexes without loading the whole table. Counting the scores above a
+score on the index would take time linear in their number, so the number
+of scores of every value is also kept (in the table score_counts, updated
+by a trigger in the transaction adding the scores): as a score is a
+number of tiles, the rank of a score sums at most one count per number of
+tiles. The functions reading and writing the older text file (scores.txt)
+are kept to import it into the database.
+
+Many processes can save scores at the same time (save_scores): each one
+appends its records to a spool file, then waits for the commit lock. The
+process holding the lock inserts every record of the spool in one
+transaction, so a burst of finishing games costs a few commits rather
+than one per game. Every record has a unique id, and a process only
+returns once its own records are in the database, so none is lost or
+stored twice even if a process dies half-way.
+
+Run this module to query the scores, e.g. python score.py --top 10
 '''
 
-# Define the file name of the scores file as constant
+import argparse, os, sqlite3, tempfile, uuid
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Define the file names of the scores file and of the scores database as
+# constants
 SCORE_FILE = 'scores.txt'
+SCORE_DB = 'scores.db'
 
 def read_scores(filename=SCORE_FILE):
     ''' Function read_scores
@@ -42,53 +72,425 @@ def write_scores(new_data, filename=SCORE_FILE, mode='a'):
               if the file cannot be written.
     '''
     try:
-        outfile = open(filename, mode)
-        outfile.write(new_data)
-        outfile.close()
+        lock = FileLock(filename + '.lock')
+        lock.acquire()
+        try:
+            if mode == 'w':
+                replace_file(filename, new_data)
+            else:
+                outfile = open(filename, mode)
+                outfile.write(new_data)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+                outfile.close()
+        finally:
+            lock.release()
     except OSError:
         print('Error updating the score file.')
         return ''
 
-def update_scores(name, score, filename=SCORE_FILE):
+def replace_file(filename, data):
+    ''' Function replace_file
+        Parameters: filename (string), data (string)
+        Returns: nothing
+
+        Does: Writes data to a temporary file next to filename, flushes
+              it to the disk and renames it over filename, so readers see
+              either the old or the new content, never half of it.
+    '''
+    folder = os.path.dirname(os.path.abspath(filename))
+    handle, temp_name = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w') as outfile:
+            outfile.write(data)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(temp_name, filename)
+    except OSError:
+        os.remove(temp_name)
+        raise
+
+class FileLock:
+    ''' FileLock class.
+        Attributes: filename, a string for the name of the lock file
+                    lock_file, the open lock file while the lock is held
+                    (None otherwise)
+        filename (string) is taken in the __init__ function
+        lock_file is not taken in the __init__
+
+        Methods: acquire and release
+    '''
+
+    def __init__(self, filename):
+        '''
+            Initilizes the attributes.
+        '''
+        self.filename = filename
+        self.lock_file = None
+
+    def acquire(self):
+        ''' Method: acquire
+            Parameters: self
+            Returns: nothing
+            Does: Waits until no other process holds the lock, then takes
+                  it (flock on POSIX, msvcrt.locking on Windows). The lock
+                  is dropped by the system if the process dies.
+        '''
+        self.lock_file = open(self.filename, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+            return
+        self.lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after 10 seconds; keep waiting
+                pass
+
+    def release(self):
+        ''' Method: release
+            Parameters: self
+            Returns: nothing
+            Does: Releases the lock and closes the lock file.
+        '''
+        if fcntl is not None:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.lock_file.seek(0)
+            msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.lock_file.close()
+        self.lock_file = None
+
+class ScoreStore:
+    ''' ScoreStore class.
+        Attributes: filename, a string for the name of the database file
+                    connection, the sqlite3 connection to the database
+        filename (string) is optional in the __init__ function
+        connection is not taken in the __init__
+
+        Methods: add, add_many, add_unique, missing, top, best, rank,
+                 import_text, close and __len__
+    '''
+
+    def __init__(self, filename = SCORE_DB):
+        '''
+            Initilizes the attributes and creates the tables, the indexes
+            and the trigger counting the scores if the database is new.
+        '''
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        with self.connection:
+            # Keeps other processes from adding scores while the counts
+            # of an older database are filled in
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS scores ('
+                'id INTEGER PRIMARY KEY, name TEXT NOT NULL, '
+                'score INTEGER NOT NULL, uid TEXT)')
+            columns = [row[1] for row in self.connection.execute(
+                'PRAGMA table_info(scores)')]
+            if 'uid' not in columns:
+                self.connection.execute(
+                    'ALTER TABLE scores ADD COLUMN uid TEXT')
+            # Ties are ordered by id (i.e, the earlier score first), which
+            # every index holds after its columns
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS scores_by_score '
+                'ON scores (score DESC)')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS scores_by_name '
+                'ON scores (name, score)')
+            # Scores saved through save_scores have a unique id, so that a
+            # record committed twice is only stored once
+            self.connection.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS scores_by_uid '
+                'ON scores (uid)')
+            # The number of scores of every value, for rank
+            new_counts = not self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = 'score_counts'").fetchone()
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS score_counts ('
+                'score INTEGER PRIMARY KEY, count INTEGER NOT NULL)')
+            if new_counts:
+                self.connection.execute(
+                    'INSERT INTO score_counts (score, count) '
+                    'SELECT score, COUNT(*) FROM scores GROUP BY score')
+            self.connection.execute(
+                'CREATE TRIGGER IF NOT EXISTS count_score '
+                'AFTER INSERT ON scores BEGIN '
+                'INSERT OR IGNORE INTO score_counts (score, count) '
+                'VALUES (NEW.score, 0); '
+                'UPDATE score_counts SET count = count + 1 '
+                'WHERE score = NEW.score; END')
+
+    def add(self, name, score):
+        ''' Method: add
+            Parameters: self, name (string), score (integer)
+            Returns: nothing
+            Does: Inserts one score and commits it.
+        '''
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO scores (name, score) VALUES (?, ?)',
+                (name, score))
+
+    def add_many(self, records):
+        ''' Method: add_many
+            Parameters: self, records (list of tuples (name, score))
+            Returns: nothing
+            Does: Inserts all the scores in one transaction.
+        '''
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO scores (name, score) VALUES (?, ?)', records)
+
+    def add_unique(self, records):
+        ''' Method: add_unique
+            Parameters: self, records (list of tuples (uid, name, score))
+            Returns: nothing
+            Does: Inserts all the scores in one transaction, skipping the
+                  ones whose uid is already stored.
+        '''
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO scores (uid, name, score) '
+                'VALUES (?, ?, ?)', records)
+
+    def missing(self, uids):
+        ''' Method: missing
+            Parameters: self, uids (list of strings)
+            Returns: a set of strings, the uids that are not stored
+        '''
+        found = self.connection.execute(
+            'SELECT uid FROM scores WHERE uid IN (%s)'
+            % ', '.join('?' * len(uids)), uids).fetchall()
+        return set(uids) - set(row[0] for row in found)
+
+    def top(self, k):
+        ''' Method: top
+            Parameters: self, k (integer)
+            Returns: a list of tuples (name, score), the k highest scores
+                     from the highest down
+        '''
+        return self.connection.execute(
+            'SELECT name, score FROM scores '
+            'ORDER BY score DESC, id LIMIT ?', (k,)).fetchall()
+
+    def best(self, name):
+        ''' Method: best
+            Parameters: self, name (string)
+            Returns: an integer, the highest score of the player, or None
+                     if they have no score
+        '''
+        return self.connection.execute(
+            'SELECT MAX(score) FROM scores WHERE name = ?',
+            (name,)).fetchone()[0]
+
+    def rank(self, score):
+        ''' Method: rank
+            Parameters: self, score (integer)
+            Returns: an integer, the rank the score has (or would have)
+                     among the stored scores, 1 for the highest
+            Does: Adds up the counts of the higher scores.
+        '''
+        return self.connection.execute(
+            'SELECT COALESCE(SUM(count), 0) FROM score_counts '
+            'WHERE score > ?', (score,)).fetchone()[0] + 1
+
+    def import_text(self, filename = SCORE_FILE):
+        ''' Method: import_text
+            Parameters: self, filename (string, optional)
+            Returns: an integer, the number of scores imported
+            Does: Adds every score of a text scores file (one score per
+                  line with a space between the user's name and their
+                  score). Lines in another format are skipped.
+        '''
+        scores_data = read_scores(filename)
+        records = []
+        for line in (scores_data or '').splitlines():
+            name, _, value = line.rpartition(' ')
+            try:
+                records.append((name, int(value)))
+            except ValueError:
+                pass
+        self.add_many(records)
+        return len(records)
+
+    def close(self):
+        ''' Method: close
+            Parameters: self
+            Returns: nothing
+            Does: Closes the connection to the database.
+        '''
+        self.connection.close()
+
+    def __len__(self):
+        '''
+            Returns the number of scores in the store.
+        '''
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM scores').fetchone()[0]
+
+def read_spool(filename):
+    ''' Function read_spool
+        Parameters: filename (string)
+        Returns: a tuple (records, size), the (uid, name, score) records
+                 of the spool file and its size in bytes (0 if it does not
+                 exist)
+
+        Does: Reads the records of the spool, one per line with tabs
+              between the fields. Skips lines in another format (e.g. the
+              end of a record whose writer died while appending, which
+              has no full 32-digit uid).
+    '''
+    try:
+        with open(filename, 'rb') as infile:
+            data = infile.read()
+    except FileNotFoundError:
+        return [], 0
+    records = []
+    for line in data.decode('utf-8', 'replace').split('\n'):
+        fields = line.split('\t')
+        if len(fields) == 3 and len(fields[0]) == 32:
+            try:
+                records.append((fields[0], fields[1], int(fields[2])))
+            except ValueError:
+                pass
+    return records, len(data)
+
+def save_scores(records, filename=SCORE_DB):
+    ''' Function save_scores
+        Parameters: records (list of tuples (name, score)),
+                    filename (string, optional)
+        Returns: nothing
+
+        Does: Saves the scores to the database safely with other
+              processes saving at the same time (group commit):
+              1. appends the records, each with a new unique id, to the
+                 spool file (filename + '.spool') under the spool lock;
+              2. waits for the commit lock; meanwhile the process holding
+                 it may commit these records together with its own;
+              3. inserts every record of the spool, plus these records if
+                 they are still missing, in one transaction, then removes
+                 the committed records from the spool.
+              Returns only once the records are committed. Raises OSError
+              or sqlite3.Error if they could not be.
+    '''
+    own = [(uuid.uuid4().hex, name.replace('\t', ' ').replace('\n', ' '),
+            score) for name, score in records]
+    spool_name = filename + '.spool'
+    spool_lock = FileLock(spool_name + '.lock')
+    commit_lock = FileLock(filename + '.lock')
+
+    spool_lock.acquire()
+    try:
+        with open(spool_name, 'ab') as spool:
+            # Start on a new line if a writer died half-way through a line
+            if spool.tell() > 0:
+                with open(spool_name, 'rb') as infile:
+                    infile.seek(-1, os.SEEK_END)
+                    if infile.read(1) != b'\n':
+                        spool.write(b'\n')
+            spool.write(''.join('%s\t%s\t%d\n' % record
+                                for record in own).encode('utf-8'))
+    finally:
+        spool_lock.release()
+
+    commit_lock.acquire()
+    try:
+        store = ScoreStore(filename)
+        try:
+            if not store.missing([record[0] for record in own]):
+                return
+            spool_lock.acquire()
+            try:
+                pending, size = read_spool(spool_name)
+            finally:
+                spool_lock.release()
+            # The own records are added even if they were lost from the
+            # spool; the unique ids keep them from being stored twice
+            store.add_unique(pending + own)
+        finally:
+            store.close()
+
+        # Drop the committed part of the spool, keeping what was appended
+        # since it was read
+        spool_lock.acquire()
+        try:
+            with open(spool_name, 'r+b') as spool:
+                spool.seek(size)
+                rest = spool.read()
+                spool.seek(0)
+                spool.write(rest)
+                spool.truncate()
+        finally:
+            spool_lock.release()
+    finally:
+        commit_lock.release()
+
+def update_scores(name, score, filename=SCORE_DB, text_file=SCORE_FILE):
     ''' Function update_scores
         Parameters: name (string), score (integer), 
-                    filename (string, optional)
+                    filename (string, optional), text_file (string, optional)
         Returns: new_record (string)
 
-        Does: Updates the score file. The format is one score per line with 
-              a space between the user’s name and their score. Appends a 
-              linebreak if the last line ends with no linebreak. The highest 
-              score is ​always t​he first entry in the file. If the user is 
-              the new high-scorer, writes their name with the score in the 
-              first line of the file; otherwise, they go at the end. 
-              Returns user's record in string if updating successfully; 
-              otherwise, reports error and returns empty string.
+        Does: Adds the score to the scores database with save_scores, so
+              several games can finish at once. When the database is
+              created, the scores of the text scores file are imported
+              into it first, if that file exists. Returns user's record in
+              string if updating successfully; otherwise, reports error and
+              returns empty string.
     '''
     new_record = name + ' ' + str(score)
-    new_data = new_record + '\n'
-    scores_data = read_scores(filename)
-
-    if scores_data == None:
+    try:
+        if not os.path.exists(filename) and os.path.exists(text_file):
+            # Import under the commit lock so that only one process does
+            commit_lock = FileLock(filename + '.lock')
+            commit_lock.acquire()
+            try:
+                if not os.path.exists(filename):
+                    store = ScoreStore(filename)
+                    try:
+                        store.import_text(text_file)
+                    finally:
+                        store.close()
+            finally:
+                commit_lock.release()
+        save_scores([(name, score)], filename)
+    except (OSError, sqlite3.Error):
+        print('Error updating the score file.')
         return ''
+    return new_record
 
-    if scores_data:
-        records = scores_data.splitlines()
-        high_scorer = records[0].rsplit(' ', 1)
-        try:
-            highest_score = int(high_scorer[1])
-            if score > highest_score:
-                scores_data = new_data + scores_data
-                if write_scores(scores_data, filename, 'w') == '':
-                    return ''
-                else:
-                    return new_record
-        except ValueError:
-            print('Unknown format for the score file.')
-            return ''
-        if scores_data[-1] != '\n':
-            new_data = '\n' + new_data
-    
-    if write_scores(new_data, filename) == '':
-        return ''
-    else:
-        return new_record
+def main():
+    # Reads the query from the command line
+    parser = argparse.ArgumentParser(description='Show the high scores.')
+    parser.add_argument('--db', default=SCORE_DB,
+                        help='scores database file')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of highest scores to show')
+    parser.add_argument('--best', metavar='NAME',
+                        help='show the best score of a player')
+    parser.add_argument('--rank', type=int, metavar='SCORE',
+                        help='show the rank of a score')
+    parser.add_argument('--import', dest='import_file', metavar='FILE',
+                        help='import a text scores file first')
+    args = parser.parse_args()
+
+    store = ScoreStore(args.db)
+    if args.import_file:
+        print('Imported %d scores' % store.import_text(args.import_file))
+    if args.best is not None:
+        print('Best score of %s: %s' % (args.best, store.best(args.best)))
+    if args.rank is not None:
+        print('Rank of %d: %d' % (args.rank, store.rank(args.rank)))
+    for place, (name, value) in enumerate(store.top(args.top), 1):
+        print('%3d. %s %d' % (place, name, value))
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
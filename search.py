@@ -0,0 +1,433 @@
+
+'''
+This module contains the search engine used by the computer player of
+Othello game: negamax with alpha-beta pruning and iterative deepening,
+stopped by a wall-clock and/or node budget. It works on the bitboards of
+an 8x8 GameState, and remembers searched positions by their Zobrist hash
+in a transposition table. Positions with few enough empties are solved
+exactly by the endgame solver instead, and positions in the opening book
+are not searched at all.
+'''
+
+import time, bitboard, zobrist
+from endgame import EndgameSolver, SolveStopped, ENDGAME_EMPTIES
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+# Defines the default time budget per move (in seconds), the deepest
+# iteration to try, and how many nodes are searched between two checks
+# of the clock, and the memory cap of the transposition table in MB as
+# constants
+TIME_LIMIT = 0.1
+MAX_DEPTH = 60
+CHECK_EVERY = 256
+TT_SIZE_MB = 16
+
+# Defines the score of a finished game per tile of difference; it is
+# larger than any static evaluation so that wins are always preferred
+WIN_SCORE = 1000
+INFINITY = 1000000
+
+# Defines the positional value of every square of the 8x8 board
+SQUARE_WEIGHTS = [100, -20, 10,  5,  5, 10, -20, 100,
+                  -20, -50, -2, -2, -2, -2, -50, -20,
+                   10,  -2, -1, -1, -1, -1,  -2,  10,
+                    5,  -2, -1, -1, -1, -1,  -2,   5,
+                    5,  -2, -1, -1, -1, -1,  -2,   5,
+                   10,  -2, -1, -1, -1, -1,  -2,  10,
+                  -20, -50, -2, -2, -2, -2, -50, -20,
+                  100, -20, 10,  5,  5, 10, -20, 100]
+MOBILITY_WEIGHT = 5
+
+def build_weight_masks(weights):
+    ''' Function build_weight_masks
+        Parameters: weights (list of integers)
+        Returns: a list of (weight, mask) tuples, one per distinct weight,
+                 sorted from the highest weight to the lowest
+
+        Does: Groups the squares with the same weight into one bitboard,
+              so that the evaluation and the move ordering only need one
+              operation per distinct weight instead of one per square.
+    '''
+    masks = {}
+    for square in range(len(weights)):
+        masks[weights[square]] = masks.get(weights[square], 0) | 1 << square
+    return sorted(masks.items(), reverse=True)
+
+WEIGHT_MASKS = build_weight_masks(SQUARE_WEIGHTS)
+
+def evaluate(own, opp):
+    ''' Function evaluate
+        Parameters: own (integer), opp (integer)
+        Returns: an integer, the static score of the position for the
+                 player owning the tiles in own
+    '''
+    score = 0
+    for weight, mask in WEIGHT_MASKS:
+        score += weight * ((own & mask).bit_count() - (opp & mask).bit_count())
+    mobility = bitboard.legal_moves(own, opp).bit_count() - \
+               bitboard.legal_moves(opp, own).bit_count()
+    return score + MOBILITY_WEIGHT * mobility
+
+def ordered_moves(moves, first = -1):
+    ''' Function ordered_moves
+        Parameters: moves (integer), first (integer, optional)
+        Returns: a list of integers, the squares of moves to try in order
+
+        Does: Orders the moves from the best square weight to the worst,
+              after the square first (usually the best move found by the
+              previous iteration) if it is one of the moves.
+    '''
+    result = []
+    if first >= 0 and moves >> first & 1:
+        result.append(first)
+        moves ^= 1 << first
+    for weight, mask in WEIGHT_MASKS:
+        result += bitboard.squares(moves & mask)
+    return result
+
+PLACE_KEYS = zobrist.get_keys(bitboard.SIZE)
+FLIP_KEYS = zobrist.get_flip_keys(bitboard.SIZE)
+
+def child_key(key, color, square, flipped):
+    ''' Function child_key
+        Parameters: key (integer), color (integer), square (integer),
+                    flipped (integer)
+        Returns: an integer, the Zobrist hash after the move
+
+        Does: Updates the hash key of a position for a move of the player
+              color on square that flips the tiles in flipped, including
+              the change of the player to move.
+    '''
+    key ^= PLACE_KEYS[color][square] ^ zobrist.SIDE_KEY
+    while flipped:
+        low = flipped & -flipped
+        key ^= FLIP_KEYS[low.bit_length() - 1]
+        flipped ^= low
+    return key
+
+class SearchTimeout(Exception):
+    ''' Raised inside the search when the time or node budget runs out. '''
+
+class SearchResult:
+    ''' SearchResult class.
+        Attributes: move, a tuple (row, col) for the best move found, or
+                    () if the player has to pass
+                    score, an integer for the score of the best move (the
+                    exact final tile difference if solved)
+                    depth, an integer for the deepest completed iteration
+                    (the number of empties if solved)
+                    nodes, an integer for the number of nodes searched
+                    elapsed, a float for the search time in seconds
+                    solved, a boolean, True if the endgame was solved
+                    from_book, a boolean, True if the move comes from the
+                    opening book
+        solved and from_book (booleans) are optional in the __init__
+        function; all other attributes are required
+
+        Methods: nodes_per_second and __str__
+    '''
+
+    def __init__(self, move, score, depth, nodes, elapsed, solved = False,
+                 from_book = False):
+        '''
+            Initilizes the attributes.
+        '''
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.solved = solved
+        self.from_book = from_book
+
+    def nodes_per_second(self):
+        ''' Method: nodes_per_second
+            Parameters: self
+            Returns: an integer, the number of nodes searched per second
+        '''
+        if self.elapsed <= 0:
+            return 0
+        return int(self.nodes / self.elapsed)
+
+    def __str__(self):
+        '''
+            Returns a printable version of the search statistics.
+        '''
+        if self.from_book:
+            return 'move %s, score %d from the opening book' \
+                   % (self.move, self.score)
+        if self.solved:
+            return 'move %s, solved %+d with %d empties, %d nodes in ' \
+                   '%.3fs' % (self.move, self.score, self.depth, self.nodes,
+                              self.elapsed)
+        return 'move %s, score %d, depth %d, %d nodes in %.3fs (%d nodes/s)' \
+               % (self.move, self.score, self.depth, self.nodes,
+                  self.elapsed, self.nodes_per_second())
+
+class Searcher:
+    ''' Searcher class.
+        Attributes: time_limit, a float for the time budget per move in
+                    seconds (None for no time limit)
+                    node_limit, an integer for the node budget per move
+                    (None for no node limit)
+                    max_depth, an integer for the deepest iteration to try
+                    nodes, an integer for the nodes searched so far
+                    deadline, a float for the time at which the search stops
+                    last_result, the SearchResult of the last search
+                    table, a TranspositionTable kept from one search to
+                    the next (None if tt_size_mb is 0)
+                    endgame, an EndgameSolver used instead of the search
+                    when few enough squares are empty (None if
+                    endgame_empties is 0)
+                    book, an OpeningBook whose moves are played without
+                    searching (None for no book)
+                    evaluate, the function scoring the positions at the
+                    end of the search, called with (own, opp)
+                    pondering, a boolean, True to search without a time
+                    limit until a deadline is set (see ponder_hit)
+                    stopped, a boolean, True to stop the current search
+                    as if its budget had run out (cleared by the caller)
+        time_limit, node_limit, max_depth, tt_size_mb (the memory cap
+        of the table in MB), endgame_empties (the number of empties
+        from which the game is solved) and evaluator (the evaluate
+        function, e.g. PatternEvaluator(...).evaluate) are optional in the
+        __init__
+        nodes, deadline, last_result, book, pondering and stopped are not
+        taken in the __init__
+
+        Methods: search, search_root, negamax, ponder_hit, stop,
+                 is_stopped and check_budget
+    '''
+
+    def __init__(self, time_limit = TIME_LIMIT, node_limit = None,
+                 max_depth = MAX_DEPTH, tt_size_mb = TT_SIZE_MB,
+                 endgame_empties = ENDGAME_EMPTIES, evaluator = evaluate):
+        '''
+            Initilizes the attributes.
+            All parameters are optional.
+        '''
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.deadline = None
+        self.last_result = None
+        self.table = None
+        if tt_size_mb:
+            self.table = TranspositionTable(tt_size_mb)
+        self.endgame = None
+        if endgame_empties:
+            self.endgame = EndgameSolver(endgame_empties, self.is_stopped)
+        self.book = None
+        self.evaluate = evaluator
+        self.pondering = False
+        self.stopped = False
+
+    def search(self, state):
+        ''' Method: search
+            Parameters: self, state (GameState)
+            Returns: a SearchResult for the current player of state
+            Does: Searches one more ply at a time until the time or node
+                  budget runs out, the maximum depth is reached or the
+                  whole game has been searched, and keeps the result of
+                  the deepest completed iteration. Plays the book move if
+                  the position is in the opening book. If the endgame
+                  solver can solve the position, solves it instead of
+                  searching, whatever the budget (but not once stopped).
+                  Raises ValueError if the state does not use bitboards.
+        '''
+        if not state.use_bitboards:
+            raise ValueError('search needs an 8x8 board')
+
+        start = time.perf_counter()
+        if self.book is not None:
+            book_move = self.book.best_move(state)
+            if book_move is not None:
+                self.last_result = SearchResult(
+                    book_move[0], book_move[1], 0, 0,
+                    time.perf_counter() - start, from_book = True)
+                return self.last_result
+
+        self.nodes = 0
+        self.deadline = None
+        if self.time_limit is not None and not self.pondering:
+            self.deadline = start + self.time_limit
+        if self.table is not None:
+            self.table.new_search()
+
+        color = state.current_player
+        own = state.bitboards[state.current_player]
+        opp = state.bitboards[1 - state.current_player]
+        empties = bitboard.SIZE * bitboard.SIZE - (own | opp).bit_count()
+        moves = bitboard.legal_moves(own, opp)
+        if moves and self.endgame is not None and \
+           self.endgame.can_solve(own, opp):
+            nodes = self.endgame.nodes
+            try:
+                best_score, best_square = self.endgame.solve_root(own, opp)
+                depth_reached, solved = empties, True
+            except SolveStopped:
+                # Stopped before the end: the best-looking square
+                best_score, best_square = 0, ordered_moves(moves)[0]
+                depth_reached, solved = 0, False
+            self.last_result = SearchResult(
+                bitboard.to_coord(best_square), best_score, depth_reached,
+                self.endgame.nodes - nodes, time.perf_counter() - start,
+                solved)
+            return self.last_result
+
+        best_square, best_score, depth_reached = -1, 0, 0
+        if moves:
+            # Play the best-looking square if not even depth 1 completes
+            best_square = ordered_moves(moves)[0]
+            for depth in range(1, min(self.max_depth, empties) + 1):
+                try:
+                    best_score, best_square = self.search_root(
+                        own, opp, depth, best_square, state.hash_key, color)
+                except SearchTimeout:
+                    break
+                depth_reached = depth
+
+        move = ()
+        if best_square >= 0:
+            move = bitboard.to_coord(best_square)
+        self.last_result = SearchResult(move, best_score, depth_reached,
+                                        self.nodes,
+                                        time.perf_counter() - start)
+        return self.last_result
+
+    def search_root(self, own, opp, depth, first, key, color):
+        ''' Method: search_root
+            Parameters: self, own (integer), opp (integer), depth (integer),
+                        first (integer), key (integer), color (integer)
+            Returns: a tuple (score, square) for the best move at this depth
+            Does: Searches every root move to the given depth, starting
+                  with the square first. key is the hash of the position
+                  and color the player to move.
+        '''
+        alpha = -INFINITY
+        best_square = -1
+        for square in ordered_moves(bitboard.legal_moves(own, opp), first):
+            flipped = bitboard.flips(own, opp, square)
+            score = -self.negamax(opp & ~flipped,
+                                  own | flipped | 1 << square,
+                                  depth - 1, -INFINITY, -alpha,
+                                  child_key(key, color, square, flipped),
+                                  1 - color)
+            if score > alpha or best_square < 0:
+                alpha = score
+                best_square = square
+        return alpha, best_square
+
+    def negamax(self, own, opp, depth, alpha, beta, key, color):
+        ''' Method: negamax
+            Parameters: self, own (integer), opp (integer), depth (integer),
+                        alpha (integer), beta (integer), key (integer),
+                        color (integer)
+            Returns: an integer, the score of the position for the player
+                     to move (the owner of the tiles in own)
+            Does: Searches the position with alpha-beta pruning. A player
+                  with no legal move passes; when neither player can move,
+                  the final tile difference is returned. A position found
+                  in the transposition table at least as deep is not
+                  searched again, and the best move stored for it is
+                  tried first otherwise.
+        '''
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self.check_budget()
+
+        table = self.table
+        first = -1
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                entry_depth, bound, score, first = entry
+                if entry_depth >= depth:
+                    if bound == EXACT:
+                        return score
+                    elif bound == LOWER and score >= beta:
+                        return score
+                    elif bound == UPPER and score <= alpha:
+                        return score
+
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            if not bitboard.legal_moves(opp, own):
+                return WIN_SCORE * (own.bit_count() - opp.bit_count())
+            return -self.negamax(opp, own, depth, -beta, -alpha,
+                                 key ^ zobrist.SIDE_KEY, 1 - color)
+        if depth <= 0:
+            return self.evaluate(own, opp)
+
+        alpha_start = alpha
+        best = -INFINITY
+        best_square = -1
+        for square in ordered_moves(moves, first):
+            flipped = bitboard.flips(own, opp, square)
+            score = -self.negamax(opp & ~flipped,
+                                  own | flipped | 1 << square,
+                                  depth - 1, -beta, -alpha,
+                                  child_key(key, color, square, flipped),
+                                  1 - color)
+            if score > best:
+                best = score
+                best_square = square
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if table is not None:
+            if best <= alpha_start:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, depth, bound, best, best_square)
+        return best
+
+    def ponder_hit(self):
+        ''' Method: ponder_hit
+            Parameters: self
+            Returns: nothing
+            Does: Gives the search started while pondering (possibly from
+                  another thread) its normal time budget from now on, so
+                  that it keeps what it found so far.
+        '''
+        self.pondering = False
+        if self.time_limit is not None:
+            self.deadline = time.perf_counter() + self.time_limit
+
+    def stop(self):
+        ''' Method: stop
+            Parameters: self
+            Returns: nothing
+            Does: Makes the current search (possibly running in another
+                  thread) stop at its next budget check and return the
+                  best move found so far.
+        '''
+        self.stopped = True
+
+    def is_stopped(self):
+        ''' Method: is_stopped
+            Parameters: self
+            Returns: a boolean, True if the current search was stopped
+                     (the endgame solver asks it while solving)
+        '''
+        return self.stopped
+
+    def check_budget(self):
+        ''' Method: check_budget
+            Parameters: self
+            Returns: nothing
+            Does: Raises SearchTimeout if the time or node budget of the
+                  current search has run out, or if it was stopped.
+        '''
+        if self.stopped:
+            raise SearchTimeout()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
@@ -0,0 +1,178 @@
+
+'''
+This module contains the headless self-play runner of Othello game. It
+plays many games between two computer players across a pool of worker
+processes and streams one JSON line per finished game to a file, without
+ever importing turtle.
+
+Run it from the command line, e.g.
+    python selfplay.py --games 1000 --workers 8 --black random \\
+                       --white search:depth=3 --output games.jsonl
+Game i is played with seed (--seed + i), so a run can be reproduced as
+long as the players do not use a time limit. With --records, the games
+are also appended to a binary game records file (see record).
+'''
+
+import argparse, json, multiprocessing, sys, time, players, record
+from gamestate import GameState
+
+# Defines the default output file name of the runner as constant
+OUTPUT_FILE = 'selfplay.jsonl'
+
+# Stores the players of a worker process by spec and board size, so
+# that they are created once per process rather than once per game
+worker_players = {}
+
+def get_player(spec, n = 8):
+    ''' Function get_player
+        Parameters: spec (string), n (integer, optional)
+        Returns: the player of this process for spec on an nxn board,
+                 created if needed
+    '''
+    if (spec, n) not in worker_players:
+        worker_players[(spec, n)] = players.make_player(spec, n)
+    return worker_players[(spec, n)]
+
+def play_game(task):
+    ''' Function play_game
+        Parameters: task (tuple)
+        Returns: a dictionary, the record of the finished game
+
+        Does: Plays one game from the start position. task is a tuple
+              (game, seed, black, white, n) of the game number, its seed,
+              the specs of the black and white players and the board size.
+              The record holds the moves, the final number of tiles, the
+              winner and the thinking time of each player.
+    '''
+    game, seed, black, white, n = task
+    start = time.perf_counter()
+    specs = [black, white]
+    game_players = [get_player(black, n), get_player(white, n)]
+    for i in range(2):
+        game_players[i].new_game(seed * 2 + i)
+
+    state = GameState(n)
+    state.initialize_board()
+    moves = []
+    think_time = [0.0, 0.0]
+    while not state.is_game_over():
+        if not state.has_legal_move():
+            state.switch_player()
+            continue
+        player = state.current_player
+        think_start = time.perf_counter()
+        move = game_players[player].choose_move(state)
+        think_time[player] += time.perf_counter() - think_start
+        state.play_move(move)
+        moves.append(record.move_to_str(move))
+
+    return {'game': game, 'seed': seed, 'n': n,
+            'black': specs[0], 'white': specs[1],
+            'moves': moves, 'num_tiles': state.num_tiles,
+            'winner': state.get_winner(),
+            'think_time': [round(t, 6) for t in think_time],
+            'time': round(time.perf_counter() - start, 6)}
+
+def run(games, workers, black, white, seed = 0, n = 8, swap = False,
+        output = OUTPUT_FILE, records = None):
+    ''' Function run
+        Parameters: games (integer), workers (integer), black (string),
+                    white (string), seed (integer, optional), n (integer,
+                    optional), swap (boolean, optional), output (string,
+                    optional), records (string, optional)
+        Returns: a dictionary of statistics: games played, elapsed time,
+                 games per second and wins of each color ('black',
+                 'white' and 'tie'), and of each spec with each color
+                 (e.g. 'random as black') if swap is True
+
+        Does: Plays the games across a pool of worker processes and writes
+              each record to the output file as a JSON line as soon as the
+              game finishes (so lines are not in game order). If swap is
+              True, the players change colors every other game. If records
+              is given, every game is also appended to that game records
+              file, in the same order as the lines.
+    '''
+    tasks = []
+    for game in range(games):
+        if swap and game % 2:
+            tasks.append((game, seed + game, white, black, n))
+        else:
+            tasks.append((game, seed + game, black, white, n))
+
+    # Create the players once in this process so that bad specs fail
+    # before any worker starts
+    players.make_player(black, n)
+    players.make_player(white, n)
+
+    wins = {'black': 0, 'white': 0, 'tie': 0}
+    if swap:
+        for spec in (black, white):
+            for color in ('black', 'white'):
+                wins['%s as %s' % (spec, color)] = 0
+    writer = None
+    if records is not None:
+        writer = record.RecordWriter(records)
+    start = time.perf_counter()
+    with open(output, 'w') as outfile, \
+         multiprocessing.Pool(workers) as pool:
+        for game_record in pool.imap_unordered(play_game, tasks):
+            outfile.write(json.dumps(game_record) + '\n')
+            outfile.flush()
+            if writer is not None:
+                writer.write_game([record.str_to_move(move)
+                                   for move in game_record['moves']], n)
+            if game_record['winner'] < 0:
+                wins['tie'] += 1
+            else:
+                color = 'black' if game_record['winner'] == 0 else 'white'
+                wins[color] += 1
+                if swap:
+                    wins['%s as %s' % (game_record[color], color)] += 1
+    if writer is not None:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {'games': games, 'time': elapsed,
+            'games_per_second': games / elapsed if elapsed > 0 else 0.0,
+            'wins': wins}
+
+def main():
+    # Reads the options of the runner from the command line
+    parser = argparse.ArgumentParser(
+        description='Play Othello games between computer players.')
+    parser.add_argument('--games', type=int, default=100,
+                        help='number of games to play')
+    parser.add_argument('--workers', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--black', default='random',
+                        help="spec of the black player, e.g. 'random' or "
+                             "'search:depth=3'")
+    parser.add_argument('--white', default='random',
+                        help='spec of the white player')
+    parser.add_argument('--swap', action='store_true',
+                        help='swap colors every other game')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first game')
+    parser.add_argument('--size', type=int, default=8,
+                        help='size n of the nxn board')
+    parser.add_argument('--output', default=OUTPUT_FILE,
+                        help='JSON lines file to write the games to')
+    parser.add_argument('--records',
+                        help='game records file to append the games to')
+    args = parser.parse_args()
+
+    try:
+        stats = run(args.games, args.workers, args.black, args.white,
+                    args.seed, args.size, args.swap, args.output,
+                    args.records)
+    except ValueError as error:
+        parser.error(str(error))
+    print('%d games in %.2fs (%.1f games/s) written to %s'
+          % (stats['games'], stats['time'], stats['games_per_second'],
+             args.output), file=sys.stderr)
+    for name, count in stats['wins'].items():
+        print('  %s: %d' % (name, count), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+'''
+This package contains the tests of Othello game. Run them from the root
+of the repository with python -m pytest.
+'''
@@ -0,0 +1,52 @@
+'''
+This module contains the tests of the batch rules of Othello game, checked
+against the scalar rules of bitboard. They are skipped without NumPy.
+'''
+
+import pytest
+np = pytest.importorskip('numpy')
+import bitboard, batchmoves
+
+def test_against_scalar():
+    ''' Function test_against_scalar
+        Checks the legal moves and flips of random positions against the
+        scalar rules.
+    '''
+    own, opp = batchmoves.random_positions(500, 1)
+    assert batchmoves.check_against_scalar(own, opp) == 0
+
+def test_successors():
+    ''' Function test_successors
+        Checks every successor generated by expand and the tile counts
+        against the positions played with the scalar rules.
+    '''
+    own, opp = batchmoves.random_positions(200, 2)
+    moves, parents, squares, flipped, next_own, next_opp = \
+        batchmoves.expand(own, opp)
+    expected = []
+    for x, y in zip(own.tolist(), opp.tolist()):
+        for square in bitboard.squares(bitboard.legal_moves(x, y)):
+            flips = bitboard.flips(x, y, square)
+            expected.append((y & ~flips, x | flips | 1 << square))
+    assert list(zip(next_own.tolist(), next_opp.tolist())) == expected
+    assert batchmoves.count(own).tolist() == \
+           [x.bit_count() for x in own.tolist()]
+
+def test_illegal_squares():
+    ''' Function test_illegal_squares
+        Checks that moves on empty squares that are not legal flip
+        nothing.
+    '''
+    own, opp = batchmoves.random_positions(100, 3)
+    moves = batchmoves.legal_moves(own, opp).tolist()
+    boards = []
+    squares = []
+    for i, (x, y) in enumerate(zip(own.tolist(), opp.tolist())):
+        illegal = [square for square in range(64)
+                   if not (x | y | moves[i]) >> square & 1]
+        if illegal:
+            boards.append(i)
+            squares.append(illegal[0])
+    assert boards
+    flipped = batchmoves.flips(own[boards], opp[boards], np.array(squares))
+    assert not flipped.any()
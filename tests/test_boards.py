@@ -0,0 +1,56 @@
+'''
+This module contains the tests of the rules of Othello game on other sizes
+than 8x8: the wide bitboards checked against the ray tables.
+'''
+
+import random
+import perft
+from gamestate import GameState
+
+def play_both(n, seed):
+    ''' Function play_both
+        Parameters: n (integer), seed (integer)
+        Returns: nothing
+        Does: Plays a random game on an nxn board with the wide bitboards
+              and with the ray tables at once, checking after every ply
+              that both have the same legal moves, flips and board.
+    '''
+    rng = random.Random(seed)
+    wide = GameState(n)
+    table = GameState(n, False)
+    assert wide.rules is not None and table.rules is None
+    wide.initialize_board()
+    table.initialize_board()
+    while not wide.is_game_over():
+        assert not table.is_game_over()
+        moves = wide.get_legal_moves()
+        assert moves == table.get_legal_moves()
+        if not moves:
+            wide.switch_player()
+            table.switch_player()
+            continue
+        move = rng.choice(moves)
+        assert sorted(wide.play_move(move)) == sorted(table.play_move(move))
+        assert wide.board == table.board
+        assert wide.num_tiles == table.num_tiles
+        assert wide.hash_key == table.hash_key
+    assert table.is_game_over()
+
+def test_wide_against_ray_tables():
+    ''' Function test_wide_against_ray_tables
+        Plays random games on 6x6, 7x7 and 10x10 boards with both rules
+        backends.
+    '''
+    for n in (6, 7, 10):
+        for seed in range(5):
+            play_both(n, seed)
+
+def test_perft_wide_against_ray_tables():
+    ''' Function test_perft_wide_against_ray_tables
+        Counts the positions from the start position of 6x6, 7x7 and
+        10x10 boards with both rules backends.
+    '''
+    for n in (6, 7, 10):
+        wide = perft.position_after('', n)
+        table = perft.position_after('', n, False)
+        assert perft.perft_state(wide, 5) == perft.perft_state(table, 5)
@@ -0,0 +1,64 @@
+'''
+This module contains the tests of the opening book of Othello game.
+'''
+
+import pytest
+import bitboard, book
+from gamestate import GameState
+
+def test_write_and_lookup(tmp_path):
+    ''' Function test_write_and_lookup
+        Writes records with scores beyond 16 bits and looks up every
+        position, one that is missing and the first and last hashes.
+    '''
+    filename = str(tmp_path / 'book.bin')
+    records = sorted([(5, 100000, 19), (5, -100000, 26), (7, 3, 37),
+                      (1, 0, 0), ((1 << 64) - 1, 64, 63)])
+    book.write_book(filename, records)
+    opening_book = book.OpeningBook(filename)
+    try:
+        assert len(opening_book) == len(records)
+        assert sorted(opening_book.lookup(5)) == [(19, 100000),
+                                                  (26, -100000)]
+        assert opening_book.lookup(7) == [(37, 3)]
+        assert opening_book.lookup(1) == [(0, 0)]
+        assert opening_book.lookup((1 << 64) - 1) == [(63, 64)]
+        assert opening_book.lookup(6) == []
+        assert opening_book.lookup(8) == []
+    finally:
+        opening_book.close()
+
+def test_build_and_best_move(tmp_path):
+    ''' Function test_build_and_best_move
+        Builds a small book and reads the best move of the start position
+        and of a position after one move.
+    '''
+    filename = str(tmp_path / 'book.bin')
+    assert book.build_book(filename, 2, 2) == 5
+    opening_book = book.OpeningBook(filename)
+    try:
+        # 4 moves from the start position and 3 after each of its moves
+        assert len(opening_book) == 4 + 4 * 3
+        state = GameState()
+        state.initialize_board()
+        moves = opening_book.lookup(state.hash_key)
+        assert sorted(square for square, score in moves) == \
+               sorted(bitboard.squares(state.legal_move_mask()))
+        move, score = opening_book.best_move(state)
+        assert score == max(score for square, score in moves)
+        state.play_move(move)
+        assert len(opening_book.lookup(state.hash_key)) == 3
+        state.play_move(state.get_legal_moves()[0])
+        assert opening_book.best_move(state) is None
+    finally:
+        opening_book.close()
+
+def test_not_a_book(tmp_path):
+    ''' Function test_not_a_book
+        Checks that a file in another format is refused.
+    '''
+    filename = str(tmp_path / 'book.bin')
+    with open(filename, 'wb') as outfile:
+        outfile.write(b'OTHBOOK1' + bytes(16))
+    with pytest.raises(ValueError):
+        book.OpeningBook(filename)
@@ -0,0 +1,82 @@
+'''
+This module contains the tests of the endgame solver of Othello game,
+checked against a plain negamax on random positions with few empties.
+'''
+
+import random
+import bitboard, endgame
+from gamestate import GameState
+
+def negamax(own, opp, passed = False):
+    ''' Function negamax
+        Parameters: own (integer), opp (integer), passed (boolean,
+                    optional)
+        Returns: an integer, the exact final tile difference for the
+                 owner of the tiles in own, searching every move
+    '''
+    moves = bitboard.legal_moves(own, opp)
+    if not moves:
+        if passed:
+            return endgame.final_score(own, opp)
+        return -negamax(opp, own, True)
+    best = -65
+    for square in bitboard.squares(moves):
+        flipped = bitboard.flips(own, opp, square)
+        best = max(best, -negamax(opp & ~flipped, own | flipped | 1 << square))
+    return best
+
+def random_position(rng, empties):
+    ''' Function random_position
+        Parameters: rng (random.Random), empties (integer)
+        Returns: a GameState reached by random moves with at most empties
+                 empty squares, or None if the game ended before
+    '''
+    state = GameState()
+    state.initialize_board()
+    while 64 - sum(state.num_tiles) > empties:
+        if state.is_game_over():
+            return None
+        moves = state.get_legal_moves()
+        if not moves:
+            state.switch_player()
+            continue
+        state.play_move(rng.choice(moves))
+    return state
+
+def test_solve_against_negamax():
+    ''' Function test_solve_against_negamax
+        Solves random positions with 4 to 10 empties, and checks the score
+        and that the best move reaches it.
+    '''
+    rng = random.Random(1)
+    solver = endgame.EndgameSolver()
+    solved = 0
+    while solved < 7:
+        state = random_position(rng, 4 + solved)
+        if state is None:
+            continue
+        own = state.bitboards[state.current_player]
+        opp = state.bitboards[1 - state.current_player]
+        expected = negamax(own, opp)
+        move, score = solver.solve(state)
+        assert score == expected
+        if move:
+            child = state.copy()
+            child.play_move(move)
+            assert -negamax(child.bitboards[child.current_player],
+                            child.bitboards[state.current_player]) == score
+        else:
+            assert not state.get_legal_moves()
+        solved += 1
+
+def test_solve_stops():
+    ''' Function test_solve_stops
+        Checks that a solve whose stop flag is set raises SolveStopped.
+    '''
+    state = random_position(random.Random(2), 14)
+    solver = endgame.EndgameSolver(20, lambda: True)
+    try:
+        solver.solve(state)
+    except endgame.SolveStopped:
+        return
+    raise AssertionError('the solve did not stop')
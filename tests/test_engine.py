@@ -0,0 +1,70 @@
+'''
+This module contains the tests of the background engine of Othello game:
+pondering on the human's time, when they play the expected reply and when
+they do not.
+'''
+
+import engine, search
+from gamestate import GameState
+
+def make_engine():
+    ''' Function make_engine
+        Returns: a new engine.BackgroundEngine pondering with a Searcher
+                 of 50 ms per move
+    '''
+    searcher = search.Searcher(0.05)
+    return engine.BackgroundEngine(lambda state: searcher.search(state).move,
+                                   searcher)
+
+def ponder_start():
+    ''' Function ponder_start
+        Returns: a tuple (engine, state, replies): an engine pondering the
+                 start position, the position and the position after every
+                 reply, the expected one first
+    '''
+    background = make_engine()
+    state = GameState()
+    state.initialize_board()
+    background.ponder(state)
+    assert background.pondered is not None
+    assert background.poll() is None
+    replies = []
+    for move in state.get_legal_moves():
+        child = state.copy()
+        child.play_move(move)
+        if child.bitboards == background.pondered.bitboards:
+            replies.insert(0, child)
+        else:
+            replies.append(child)
+    return background, state, replies
+
+def test_ponder_hit():
+    ''' Function test_ponder_hit
+        Plays the expected reply: the pondering search goes on and gives
+        the move.
+    '''
+    background, state, replies = ponder_start()
+    thread = background.thread
+    background.start(replies[0])
+    assert background.thread is thread
+    assert not background.searcher.pondering
+    thread.join(5)
+    assert not thread.is_alive()
+    move = background.poll()
+    assert replies[0].is_legal_move(move)
+    assert background.poll() is None
+
+def test_ponder_miss():
+    ''' Function test_ponder_miss
+        Plays another reply: the pondering search is stopped and a new
+        search gives the move.
+    '''
+    background, state, replies = ponder_start()
+    thread = background.thread
+    background.start(replies[1])
+    assert not thread.is_alive()
+    assert background.thread is not thread
+    assert not background.searcher.stopped
+    background.thread.join(5)
+    move = background.poll()
+    assert replies[1].is_legal_move(move)
@@ -0,0 +1,124 @@
+'''
+This module contains the tests of the Monte Carlo Tree Search player of
+Othello game.
+'''
+
+import random
+import pytest
+import bitboard, endgame, mcts, players
+from gamestate import GameState
+
+def random_position(rng, empties):
+    ''' Function random_position
+        Parameters: rng (random.Random), empties (integer)
+        Returns: a GameState reached by random moves with empties empty
+                 squares and a legal move, or None if there is none on the
+                 way
+    '''
+    state = GameState()
+    state.initialize_board()
+    while 64 - sum(state.num_tiles) > empties:
+        if state.is_game_over():
+            return None
+        moves = state.get_legal_moves()
+        if not moves:
+            state.switch_player()
+            continue
+        state.play_move(rng.choice(moves))
+    if not state.has_legal_move():
+        return None
+    return state
+
+def test_playouts_end_the_game():
+    ''' Function test_playouts_end_the_game
+        Checks the scalar and batch playouts from positions with one empty
+        square, where every playout is the same game.
+    '''
+    rng = random.Random(0)
+    positions = []
+    while len(positions) < 20:
+        state = random_position(rng, 1)
+        if state is not None:
+            positions.append(state)
+    expected = []
+    for state in positions:
+        own = state.bitboards[state.current_player]
+        opp = state.bitboards[1 - state.current_player]
+        move, score = endgame.EndgameSolver().solve(state)
+        # The only move fills the board
+        square = bitboard.to_square(*move)
+        flipped = bitboard.flips(own, opp, square)
+        diff = (own | flipped | 1 << square).bit_count() - \
+               (opp & ~flipped).bit_count()
+        assert score == diff
+        assert mcts.playout(own, opp, rng.random) == diff
+        expected.append(diff)
+    if mcts.np is not None:
+        np = mcts.np
+        diffs = mcts.batch_playouts(
+            np.array([s.bitboards[s.current_player] for s in positions],
+                     dtype=np.uint64),
+            np.array([s.bitboards[1 - s.current_player] for s in positions],
+                     dtype=np.uint64),
+            np.random.default_rng(0))
+        assert diffs.tolist() == expected
+
+def test_deterministic_and_reuses_tree():
+    ''' Function test_deterministic_and_reuses_tree
+        Checks that a player with a playout budget chooses the same move
+        for the same seed, and keeps its tree after the adversary's reply.
+    '''
+    moves = []
+    for i in range(2):
+        player = mcts.MCTSPlayer(playouts=300, time_limit=None)
+        player.new_game(5)
+        state = GameState()
+        state.initialize_board()
+        moves.append(player.choose_move(state))
+        assert state.is_legal_move(moves[-1])
+        assert player.last_result.playouts == 300
+    assert moves[0] == moves[1]
+
+    state.play_move(moves[-1])
+    state.play_move(state.get_legal_moves()[0])
+    player.choose_move(state)
+    assert player.last_result.reused > 0
+
+def test_finds_winning_move():
+    ''' Function test_finds_winning_move
+        Checks that the player chooses the only winning move of positions
+        with few empties, as found by the endgame solver.
+    '''
+    rng = random.Random(2)
+    solver = endgame.EndgameSolver()
+    found = 0
+    while found < 3:
+        state = random_position(rng, 5)
+        if state is None:
+            continue
+        scores = []
+        for move in state.get_legal_moves():
+            child = state.copy()
+            child.play_move(move)
+            scores.append((-solver.solve(child)[1], move))
+        winning = [move for score, move in scores if score > 0]
+        if len(scores) < 2 or len(winning) != 1 or \
+           max(score for score, move in scores if score <= 0) > -4:
+            continue
+        player = mcts.MCTSPlayer(playouts=2000, time_limit=None)
+        player.new_game(found)
+        assert player.choose_move(state) == winning[0]
+        found += 1
+
+def test_needs_8x8():
+    ''' Function test_needs_8x8
+        Checks that the player and make_player refuse other board sizes.
+    '''
+    state = GameState(6)
+    state.initialize_board()
+    with pytest.raises(ValueError):
+        mcts.MCTSPlayer(playouts=10).choose_move(state)
+    with pytest.raises(ValueError):
+        players.make_player('mcts', 6)
+    with pytest.raises(ValueError):
+        players.make_player('search', 10)
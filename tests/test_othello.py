@@ -0,0 +1,103 @@
+'''
+This module contains the tests of the game window of Othello game, run
+without a screen: turtle is replaced by a module whose functions do
+nothing, except ontimer and onscreenclick, which keep the function they
+are given.
+'''
+
+import sys, time, types
+import pytest
+
+class FakeTurtle:
+    ''' FakeTurtle class.
+        A turtle whose methods do nothing.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        '''
+            Takes any parameters and ignores them.
+        '''
+        pass
+
+    def __getattr__(self, name):
+        '''
+            Returns a method doing nothing.
+        '''
+        return lambda *args, **kwargs: FakeTurtle()
+
+def make_fake_turtle():
+    ''' Function make_fake_turtle
+        Returns: a module in place of turtle, with the functions given to
+                 ontimer in its list timers and the one given to
+                 onscreenclick in its list click
+    '''
+    fake = types.ModuleType('turtle')
+    fake.timers = []
+    fake.click = [None]
+    fake.Turtle = FakeTurtle
+    fake.ontimer = lambda function, ms = 0: fake.timers.append(function)
+    fake.onscreenclick = lambda function, *args: \
+        fake.click.__setitem__(0, function)
+    fake.textinput = lambda *args: 'N'
+    fake.__getattr__ = lambda name: FakeTurtle
+    return fake
+
+@pytest.fixture
+def game(monkeypatch):
+    ''' Function game
+        Returns: a new othello.Othello drawing with the fake turtle, and
+                 the fake turtle
+    '''
+    fake = make_fake_turtle()
+    monkeypatch.setitem(sys.modules, 'turtle', fake)
+    for name in ('othello', 'board', 'layers', 'animation'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    import othello
+    return othello.Othello(), fake
+
+def run_timers(fake, limit = 500):
+    ''' Function run_timers
+        Parameters: fake (module), limit (integer, optional)
+        Returns: nothing
+        Does: Calls the functions given to ontimer, and the ones they give
+              in turn, until none is left. Fails after limit calls.
+    '''
+    for i in range(limit):
+        if not fake.timers:
+            return
+        fake.timers.pop(0)()
+        time.sleep(0.002)
+    raise AssertionError('the timers never stop')
+
+def test_set_position_while_computer_thinks(game):
+    ''' Function test_set_position_while_computer_thinks
+        Sets the position while the computer (black) chooses its move, and
+        checks that it then plays exactly once and the human gets the turn.
+    '''
+    game, fake = game
+    game.searcher = None
+    game.game_mode = '1'
+    game.human_color = 1
+    game.start_game()
+    assert fake.timers
+    game.set_position(game.get_position())
+    game.computer_turn_logic()
+    run_timers(fake)
+
+    assert game.current_player == game.human_color
+    assert game.num_tiles == [4, 1]
+    assert len(game.get_legal_moves()) > 0
+    assert fake.click[0] == game.play
+    game.engine.stop()
+
+def test_poll_returns_a_move_once(game):
+    ''' Function test_poll_returns_a_move_once
+        Checks that the engine returns the move it found only once.
+    '''
+    game, fake = game
+    game.searcher = None
+    game.initialize_board()
+    game.engine.start(game.state)
+    game.engine.thread.join()
+    assert game.engine.poll() in game.get_legal_moves()
+    assert game.engine.poll() is None
@@ -0,0 +1,76 @@
+'''
+This module contains the tests of the pattern evaluation of Othello game,
+checked against reading the squares of every pattern one by one.
+'''
+
+import random
+from array import array
+import bitboard, patterns
+
+def square_index(own, opp, squares):
+    ''' Function square_index
+        Parameters: own (integer), opp (integer), squares (list of
+                    integers)
+        Returns: an integer, the base-3 index of the configuration of the
+                 squares, read one square at a time
+    '''
+    index = 0
+    for i, square in enumerate(squares):
+        if own >> square & 1:
+            index += 3 ** i
+        elif opp >> square & 1:
+            index += 2 * 3 ** i
+    return index
+
+def random_board(rng):
+    ''' Function random_board
+        Parameters: rng (random.Random)
+        Returns: a tuple of integers (own, opp), random tiles that do not
+                 overlap
+    '''
+    own = rng.getrandbits(64)
+    return own, rng.getrandbits(64) & ~own
+
+def test_extract():
+    ''' Function test_extract
+        Checks every extract function against the squares of its pattern.
+    '''
+    rng = random.Random(0)
+    for board in range(200):
+        bb = rng.getrandbits(64)
+        for name, squares, extract in patterns.PATTERNS:
+            expected = sum((bb >> square & 1) << i
+                           for i, square in enumerate(squares))
+            assert extract(bb) == expected, name
+
+def test_instances():
+    ''' Function test_instances
+        Checks the number of distinct instances of every pattern.
+    '''
+    counts = [0] * len(patterns.PATTERNS)
+    for pattern, symmetry, squares in patterns.INSTANCES:
+        counts[pattern] += 1
+    assert counts == [4, 4, 8, 2, 4]
+
+def test_evaluate(tmp_path):
+    ''' Function test_evaluate
+        Saves random weights, loads them and checks the evaluation of
+        random boards against the per-square index of every instance.
+    '''
+    rng = random.Random(1)
+    tables = [array('h', [rng.randint(-1000, 1000)
+                          for i in range(3 ** len(squares))])
+              for name, squares, extract in patterns.PATTERNS]
+    filename = str(tmp_path / 'weights.bin')
+    patterns.save_weights(filename, tables, 7)
+    assert patterns.load_weights(filename) == (tables, 7)
+
+    evaluator = patterns.PatternEvaluator(filename)
+    for board in range(100):
+        own, opp = random_board(rng)
+        expected = sum(tables[pattern][square_index(own, opp, squares)]
+                       for pattern, symmetry, squares
+                       in patterns.INSTANCES)
+        expected += 7 * (bitboard.legal_moves(own, opp).bit_count() -
+                         bitboard.legal_moves(opp, own).bit_count())
+        assert evaluator.evaluate(own, opp) == expected
@@ -0,0 +1,46 @@
+'''
+This module contains the tests of the perft counter of Othello game: the
+counts from the start position against the known ones.
+'''
+
+import random
+import patterns, perft
+
+def test_perft_bitboards():
+    ''' Function test_perft_bitboards
+        Counts the positions from the start position with the bitboards,
+        with and without the cache, up to depth 7.
+    '''
+    state = perft.position_after('')
+    own, opp = state.bitboards
+    cache = {}
+    for depth in range(8):
+        assert perft.perft(own, opp, depth) == perft.REFERENCE[depth]
+        assert perft.perft(own, opp, depth, cache) == perft.REFERENCE[depth]
+
+def test_perft_state():
+    ''' Function test_perft_state
+        Counts the positions from the start position through GameState up
+        to depth 6, and checks that divide adds up to the same count.
+    '''
+    state = perft.position_after('')
+    for depth in range(7):
+        assert perft.perft_state(state, depth) == perft.REFERENCE[depth]
+    counts = perft.divide(state, 6, use_state=True)
+    assert sum(count for move, count in counts) == perft.REFERENCE[6]
+
+def test_canonical_symmetries():
+    ''' Function test_canonical_symmetries
+        Checks that the 8 symmetric images of random positions have the
+        same canonical position, which is one of them.
+    '''
+    rng = random.Random(0)
+    for i in range(50):
+        own = rng.getrandbits(64)
+        opp = rng.getrandbits(64) & ~own
+        images = [(patterns.apply_symmetry(own, symmetry),
+                   patterns.apply_symmetry(opp, symmetry))
+                  for symmetry in range(len(patterns.SYMMETRIES))]
+        best = perft.canonical(own, opp)
+        assert best in images
+        assert all(perft.canonical(x, y) == best for x, y in images)
@@ -0,0 +1,87 @@
+'''
+This module contains the tests of the immutable position snapshots of
+Othello game.
+'''
+
+import pickle, random
+import pytest
+import position
+from gamestate import GameState
+
+def random_state(n, seed, wide_bitboards = True):
+    ''' Function random_state
+        Parameters: n (integer), seed (integer), wide_bitboards (boolean,
+                    optional)
+        Returns: a GameState after up to 20 random moves on an nxn board
+    '''
+    rng = random.Random(seed)
+    state = GameState(n, wide_bitboards)
+    state.initialize_board()
+    for ply in range(20):
+        moves = state.get_legal_moves()
+        if not moves:
+            break
+        state.play_move(rng.choice(moves))
+    return state
+
+def test_round_trip():
+    ''' Function test_round_trip
+        Takes snapshots on every rules backend and turns them back into
+        states, new ones or loaded in place.
+    '''
+    for n, wide_bitboards in ((8, True), (10, True), (10, False), (7, False)):
+        state = random_state(n, n, wide_bitboards)
+        snapshot = position.from_state(state)
+        assert snapshot.n == n
+        assert all(snapshot.get_tile(row, col) == state.board[row][col]
+                   for row in range(n) for col in range(n))
+
+        copy = snapshot.to_state(wide_bitboards)
+        assert copy == state
+        assert copy.num_tiles == state.num_tiles
+        assert copy.hash_key == state.hash_key
+        assert copy.get_legal_moves() == state.get_legal_moves()
+        assert position.from_state(copy) == snapshot
+
+        other = GameState(n, wide_bitboards)
+        other.initialize_board()
+        rows = other.board
+        snapshot.load(other)
+        assert other.board is rows
+        assert other == state
+        assert other.hash_key == state.hash_key
+        assert other.get_legal_moves() == state.get_legal_moves()
+
+def test_pickle_hash_and_equality():
+    ''' Function test_pickle_hash_and_equality
+        Pickles snapshots and uses them as set members.
+    '''
+    snapshots = [position.from_state(random_state(8, seed))
+                 for seed in range(10)]
+    for snapshot in snapshots:
+        copy = pickle.loads(pickle.dumps(snapshot))
+        assert copy == snapshot and copy is not snapshot
+        assert hash(copy) == hash(snapshot)
+    assert len(set(snapshots + [pickle.loads(pickle.dumps(snapshot))
+                                for snapshot in snapshots])) == \
+           len(set(snapshots))
+    assert position.Position(1, 2, 0) != position.Position(1, 2, 1)
+    assert position.Position(1, 2, 0, 8) != position.Position(1, 2, 0, 10)
+
+def test_immutable_and_checked():
+    ''' Function test_immutable_and_checked
+        Checks that snapshots cannot change and bad ones are refused.
+    '''
+    snapshot = position.Position(1, 2)
+    with pytest.raises(AttributeError):
+        snapshot.black = 3
+    with pytest.raises(AttributeError):
+        del snapshot.player
+    with pytest.raises(ValueError):
+        position.Position(3, 2)
+    with pytest.raises(ValueError):
+        position.Position(1 << 64, 0)
+    with pytest.raises(ValueError):
+        position.Position(1, 2, 2)
+    with pytest.raises(ValueError):
+        snapshot.load(GameState(6))
@@ -0,0 +1,78 @@
+'''
+This module contains the tests of the game records of Othello game.
+'''
+
+import random
+import record
+from gamestate import GameState
+
+def random_game(n, seed):
+    ''' Function random_game
+        Parameters: n (integer), seed (integer)
+        Returns: a tuple (moves, state, passes): the moves of a random game
+                 on an nxn board, its final state and its number of passes
+    '''
+    rng = random.Random(seed)
+    state = GameState(n)
+    state.initialize_board()
+    moves = []
+    passes = 0
+    while not state.is_game_over():
+        legal = state.get_legal_moves()
+        if not legal:
+            state.switch_player()
+            passes += 1
+            continue
+        moves.append(rng.choice(legal))
+        state.play_move(moves[-1])
+    return moves, state, passes
+
+def test_round_trip_with_pass(tmp_path):
+    ''' Function test_round_trip_with_pass
+        Writes games with a pass to a file, reads them back and replays
+        them to their final position.
+    '''
+    games = []
+    seed = 0
+    while len(games) < 3:
+        moves, state, passes = random_game(8, seed)
+        if passes:
+            games.append((moves, state))
+        seed += 1
+    filename = str(tmp_path / 'games.rec')
+    writer = record.RecordWriter(filename)
+    for moves, state in games:
+        writer.write_game(moves)
+    writer.close()
+
+    read = record.read_games(filename)
+    assert read == [(moves, 8) for moves, state in games]
+    for moves, state in games:
+        replay = record.Replay(moves)
+        assert len(replay) == len(moves)
+        assert replay.seek(len(moves)) == state
+        middle = replay.seek(len(moves) // 2 + 1)
+        assert sum(middle.num_tiles) == len(moves) // 2 + 5
+
+def test_round_trip_16x16():
+    ''' Function test_round_trip_16x16
+        Records a game on a 16x16 board, which still takes one byte per
+        move, and replays it.
+    '''
+    moves, state, passes = random_game(16, 3)
+    data = record.encode_game(moves, 16)
+    assert len(data) == record.HEADER.size + len(moves)
+    assert record.decode_game(data) == (moves, 16, len(data))
+    assert record.Replay(moves, 16).seek(len(moves)) == state
+
+    data = record.encode_game([(16, 16)], 17)
+    assert len(data) == record.HEADER.size + 2
+    assert record.decode_game(data)[0] == [(16, 16)]
+
+def test_move_notation():
+    ''' Function test_move_notation
+        Writes moves as text and reads them back.
+    '''
+    assert record.move_to_str((2, 3)) == 'd3'
+    assert record.str_to_move('d3') == (2, 3)
+    assert record.str_to_move(record.move_to_str((15, 15))) == (15, 15)
@@ -0,0 +1,90 @@
+'''
+This module contains the tests of the scores database of Othello game.
+'''
+
+import multiprocessing, sqlite3
+import score
+
+# Defines the number of processes saving scores at once and the number of
+# scores each one saves as constants
+PROCESSES = 4
+SCORES_PER_PROCESS = 10
+
+def save_many(filename, name):
+    ''' Function save_many
+        Parameters: filename (string), name (string)
+        Returns: nothing
+        Does: Saves SCORES_PER_PROCESS scores one at a time.
+    '''
+    for i in range(SCORES_PER_PROCESS):
+        score.save_scores([(name, i)], filename)
+
+def test_concurrent_saves(tmp_path):
+    ''' Function test_concurrent_saves
+        Saves scores from several processes at once through the spool,
+        and checks that every score is stored once and the spool is empty.
+    '''
+    filename = str(tmp_path / 'scores.db')
+    processes = [multiprocessing.Process(target=save_many,
+                                         args=(filename, 'player%d' % i))
+                 for i in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    store = score.ScoreStore(filename)
+    try:
+        assert len(store) == PROCESSES * SCORES_PER_PROCESS
+        for i in range(PROCESSES):
+            assert store.best('player%d' % i) == SCORES_PER_PROCESS - 1
+        assert store.rank(SCORES_PER_PROCESS) == 1
+    finally:
+        store.close()
+    assert score.read_spool(filename + '.spool')[0] == []
+
+def test_store_queries(tmp_path):
+    ''' Function test_store_queries
+        Adds scores and reads the top scores, the best score of a player
+        and ranks.
+    '''
+    store = score.ScoreStore(str(tmp_path / 'scores.db'))
+    try:
+        store.add('a', 10)
+        store.add_many([('b', 30), ('a', 20), ('c', 20)])
+        assert store.top(3) == [('b', 30), ('a', 20), ('c', 20)]
+        assert store.best('a') == 20
+        assert store.best('d') is None
+        assert store.rank(25) == 2
+        store.add_unique([('0' * 32, 'd', 5), ('0' * 32, 'd', 5)])
+        assert len(store) == 5
+    finally:
+        store.close()
+
+def test_rank_counts(tmp_path):
+    ''' Function test_rank_counts
+        Checks the ranks read from the counts of every score against the
+        scores themselves, in a database made before the counts were kept.
+    '''
+    filename = str(tmp_path / 'scores.db')
+    connection = sqlite3.connect(filename)
+    connection.execute('CREATE TABLE scores (id INTEGER PRIMARY KEY, '
+                       'name TEXT NOT NULL, score INTEGER NOT NULL)')
+    connection.executemany('INSERT INTO scores (name, score) VALUES (?, ?)',
+                           [('a', value % 65) for value in range(0, 300, 7)])
+    connection.commit()
+    connection.close()
+
+    store = score.ScoreStore(filename)
+    try:
+        store.add('b', 64)
+        store.add_many([('c', 0), ('d', 33)])
+        store.add_unique([('1' * 32, 'e', 12), ('1' * 32, 'e', 12)])
+        scores = [row[0] for row in store.connection.execute(
+            'SELECT score FROM scores')]
+        for value in range(-1, 66):
+            assert store.rank(value) == \
+                   sum(other > value for other in scores) + 1
+    finally:
+        store.close()
@@ -0,0 +1,36 @@
+'''
+This module contains the tests of the self-play runner of Othello game.
+'''
+
+import json
+import selfplay
+
+def test_wins_by_color(tmp_path):
+    ''' Function test_wins_by_color
+        Plays games between two random players with the same spec and
+        checks that the wins of black and white are counted apart.
+    '''
+    output = str(tmp_path / 'games.jsonl')
+    stats = selfplay.run(6, 1, 'random', 'random', output=output)
+    with open(output) as infile:
+        games = [json.loads(line) for line in infile]
+    assert len(games) == 6
+    assert stats['wins'] == {
+        'black': sum(game['winner'] == 0 for game in games),
+        'white': sum(game['winner'] == 1 for game in games),
+        'tie': sum(game['winner'] < 0 for game in games)}
+
+def test_wins_by_spec_and_color(tmp_path):
+    ''' Function test_wins_by_spec_and_color
+        Plays games with swapped colors and checks the wins of every spec
+        with every color.
+    '''
+    output = str(tmp_path / 'games.jsonl')
+    stats = selfplay.run(4, 1, 'random', 'search:depth=1', swap=True,
+                         output=output)
+    wins = stats['wins']
+    assert wins['black'] == wins['random as black'] + \
+                            wins['search:depth=1 as black']
+    assert wins['white'] == wins['random as white'] + \
+                            wins['search:depth=1 as white']
+    assert wins['black'] + wins['white'] + wins['tie'] == 4
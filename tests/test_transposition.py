@@ -0,0 +1,53 @@
+'''
+This module contains the tests of the transposition table of Othello game.
+'''
+
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+def test_store_and_probe():
+    ''' Function test_store_and_probe
+        Stores entries and reads them back, with negative scores and no
+        best move.
+    '''
+    table = TranspositionTable(1)
+    table.store(12345, 6, EXACT, 17, 19)
+    table.store(67890, 3, LOWER, -64, -1)
+    assert table.probe(12345) == (6, EXACT, 17, 19)
+    assert table.probe(67890) == (3, LOWER, -64, -1)
+    assert table.probe(11111) is None
+    assert table.hits == 2
+    table.clear()
+    assert table.probe(12345) is None
+    assert len(table) == 2 * table.num_buckets
+
+def test_replacement():
+    ''' Function test_replacement
+        Fills one bucket and checks which entry every store replaces.
+    '''
+    table = TranspositionTable(1)
+    size = table.num_buckets
+    first, second, third = 5, 5 + size, 5 + 2 * size
+
+    # A shallower search goes to the always-replace entry
+    table.store(first, 8, EXACT, 1, 1)
+    table.store(second, 4, UPPER, 2, 2)
+    assert table.probe(first) == (8, EXACT, 1, 1)
+    assert table.probe(second) == (4, UPPER, 2, 2)
+    table.store(third, 2, LOWER, 3, 3)
+    assert table.probe(first) == (8, EXACT, 1, 1)
+    assert table.probe(second) is None
+    assert table.probe(third) == (2, LOWER, 3, 3)
+
+    # The same position or a deeper search replaces the depth-preferred
+    # entry
+    table.store(first, 1, UPPER, 4, 4)
+    assert table.probe(first) == (1, UPPER, 4, 4)
+    table.store(second, 9, EXACT, 5, 5)
+    assert table.probe(second) == (9, EXACT, 5, 5)
+    assert table.probe(first) is None
+
+    # Entries of an older search are replaced by any search
+    table.new_search()
+    table.store(first, 1, EXACT, 6, 6)
+    assert table.probe(first) == (1, EXACT, 6, 6)
+    assert table.probe(second) is None
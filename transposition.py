@@ -0,0 +1,129 @@
+
+'''
+This module contains the transposition table used by the search engine of
+Othello game to remember positions it has already searched.
+
+The table has a fixed number of buckets, chosen from a memory cap in MB
+when it is created, and never grows. Every bucket holds two entries: the
+first one is depth-preferred (only replaced by a search at least as deep,
+or by any search once it is left over from an older move), the second
+one is always replaced. Entries are packed into two arrays of 64-bit
+integers (the hash and the data), so each entry takes exactly 16 bytes.
+'''
+
+from array import array
+
+# Defines the default memory cap in MB and the size of one entry in bytes
+# as constants
+DEFAULT_SIZE_MB = 16
+ENTRY_BYTES = 16
+
+# Defines the bound types of a stored score
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# Defines how the data of an entry is packed into 64 bits:
+# score (32 bits, offset to be positive), depth (8 bits), bound (2 bits),
+# move (8 bits, NO_MOVE if none) and generation (8 bits)
+SCORE_OFFSET = 1 << 31
+NO_MOVE = 255
+
+class TranspositionTable:
+    ''' TranspositionTable class.
+        Attributes: size_mb, a number for the memory cap in MB
+                    num_buckets, an integer for the number of buckets
+                    keys, an array of the hash stored in every entry
+                    data, an array of the packed data of every entry
+                    generation, an integer increased at every new search
+                    so that entries of older searches can be replaced
+                    hits, an integer for the number of successful probes
+        size_mb (number) is optional in the __init__ function
+        num_buckets, keys, data, generation and hits are not taken in
+        the __init__
+
+        Methods: new_search, probe, store, clear and __len__
+    '''
+
+    def __init__(self, size_mb = DEFAULT_SIZE_MB):
+        '''
+            Initilizes the attributes.
+            Only takes one optional parameter; others have default values.
+        '''
+        self.size_mb = size_mb
+        self.num_buckets = max(1, int(size_mb * (1 << 20)) //
+                                  (2 * ENTRY_BYTES))
+        self.keys = array('Q', bytes(16 * self.num_buckets))
+        self.data = array('Q', bytes(16 * self.num_buckets))
+        self.generation = 0
+        self.hits = 0
+
+    def new_search(self):
+        ''' Method: new_search
+            Parameters: self
+            Returns: nothing
+            Does: Starts a new generation, so that the depth-preferred
+                  entries of older searches can be replaced.
+        '''
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        ''' Method: probe
+            Parameters: self, key (integer)
+            Returns: a tuple (depth, bound, score, move) if the position
+                     with the hash key is stored, None otherwise (move is
+                     -1 if no best move was stored)
+        '''
+        index = (key % self.num_buckets) * 2
+        for slot in (index, index + 1):
+            if self.keys[slot] == key:
+                data = self.data[slot]
+                if data:
+                    self.hits += 1
+                    move = data >> 42 & 0xFF
+                    return (data >> 32 & 0xFF, data >> 40 & 0x3,
+                            (data & 0xFFFFFFFF) - SCORE_OFFSET,
+                            -1 if move == NO_MOVE else move)
+        return None
+
+    def store(self, key, depth, bound, score, move = -1):
+        ''' Method: store
+            Parameters: self, key (integer), depth (integer), bound
+                        (integer), score (integer), move (integer, optional)
+            Returns: nothing
+            Does: Stores the result of a search of the position with the
+                  hash key: in the depth-preferred entry of its bucket if
+                  it holds the same position, a shallower search or a
+                  search from an older generation; in the always-replace
+                  entry otherwise.
+        '''
+        if move < 0:
+            move = NO_MOVE
+        data = (score + SCORE_OFFSET) | min(depth, 0xFF) << 32 | \
+               bound << 40 | move << 42 | self.generation << 50
+        index = (key % self.num_buckets) * 2
+        old = self.data[index]
+        if self.keys[index] == key or not old or \
+           depth >= (old >> 32 & 0xFF) or \
+           (old >> 50 & 0xFF) != self.generation:
+            self.keys[index] = key
+            self.data[index] = data
+        else:
+            self.keys[index + 1] = key
+            self.data[index + 1] = data
+
+    def clear(self):
+        ''' Method: clear
+            Parameters: self
+            Returns: nothing
+            Does: Empties all the entries. The table keeps its size.
+        '''
+        self.keys = array('Q', bytes(16 * self.num_buckets))
+        self.data = array('Q', bytes(16 * self.num_buckets))
+        self.hits = 0
+
+    def __len__(self):
+        '''
+            Returns the number of entries the table can hold.
+        '''
+        return 2 * self.num_buckets
@@ -0,0 +1,193 @@
+
+'''
+This module contains the wide bitboards of Othello game, the rules core
+of the boards that are not 8x8 (from 4x4 to 32x32 and more).
+
+As on the 8x8 board (see bitboard), a position is stored as two integers,
+one for each player, with bit (row * n + col) set if that player has a
+tile on square (row, col); Python integers simply grow to n * n bits. The
+masks of a board size (the squares a shift may land on, and the rows,
+columns and diagonals the rays run along) are computed once per size by
+get_wide_board.
+
+Legal moves are found with a Kogge-Stone fill along every direction, so
+the number of operations grows with log(n) and the cost of each of them
+with the number of squares: move generation is close to linear in n * n.
+'''
+
+from bitboard import MOVE_DIRS
+
+# Stores the wide boards of every board size that has been used
+WIDE_BOARDS = {}
+
+class WideBoard:
+    ''' WideBoard class.
+        Attributes: n, an integer for nxn board
+                    full, an integer with the n * n bits of the board set
+                    shifts, a list of tuples (amount, mask), one per
+                    direction of MOVE_DIRS: the number of bits to shift
+                    (positive towards higher squares) and the mask of the
+                    squares a one-step shift may land on
+                    steps, an integer for the doubling steps of a fill
+                    (enough to cross a run of n - 2 tiles)
+                    lines, a list of lists of integers: for every
+                    direction, the mask of the line (row, column or
+                    diagonal) through every square
+        n (integer) is required in the __init__ function; full, shifts,
+        steps and lines are not taken in the __init__
+
+        Methods: legal_moves, ray, flips_in_direction, flips,
+                 to_square and to_coord
+    '''
+
+    def __init__(self, n):
+        '''
+            Initilizes the attributes and computes the masks of the
+            board size.
+        '''
+        self.n = n
+        self.full = (1 << (n * n)) - 1
+        first_col = sum(1 << (row * n) for row in range(n))
+        last_col = first_col << (n - 1)
+        col_masks = {-1: self.full & ~last_col, 0: self.full,
+                     +1: self.full & ~first_col}
+        self.shifts = [(dr * n + dc, col_masks[dc])
+                       for dr, dc in MOVE_DIRS]
+        self.steps = max(1, (n - 2).bit_length())
+
+        # The squares of each row, column, diagonal and anti-diagonal
+        rows = [0] * n
+        cols = [0] * n
+        diagonals = [0] * (2 * n - 1)
+        anti_diagonals = [0] * (2 * n - 1)
+        for row in range(n):
+            for col in range(n):
+                bit = 1 << (row * n + col)
+                rows[row] |= bit
+                cols[col] |= bit
+                diagonals[row - col + n - 1] |= bit
+                anti_diagonals[row + col] |= bit
+        self.lines = []
+        for dr, dc in MOVE_DIRS:
+            if dr == 0:
+                line = [rows[square // n] for square in range(n * n)]
+            elif dc == 0:
+                line = [cols[square % n] for square in range(n * n)]
+            elif dr == dc:
+                line = [diagonals[square // n - square % n + n - 1]
+                        for square in range(n * n)]
+            else:
+                line = [anti_diagonals[square // n + square % n]
+                        for square in range(n * n)]
+            self.lines.append(line)
+
+    def legal_moves(self, own, opp):
+        ''' Method: legal_moves
+            Parameters: self, own (integer), opp (integer)
+            Returns: an integer with one bit set for every legal move
+
+            Does: Fills from the tiles of own through the adversary's tiles
+                  of opp along every direction, doubling the length of the
+                  fill at every step (Kogge-Stone), then keeps the empty
+                  squares right after a filled adversary's tile.
+        '''
+        empty = ~(own | opp) & self.full
+        moves = 0
+        for amount, mask in self.shifts:
+            # Masking the adversary's tiles keeps the fill from wrapping
+            # around the edge of the board
+            pro = opp & mask
+            gen = own
+            step = amount
+            if amount > 0:
+                for i in range(self.steps):
+                    gen |= pro & (gen << step)
+                    pro &= pro << step
+                    step += step
+                moves |= ((gen & opp) << amount) & mask & empty
+            else:
+                step = -step
+                for i in range(self.steps):
+                    gen |= pro & (gen >> step)
+                    pro &= pro >> step
+                    step += step
+                moves |= ((gen & opp) >> -amount) & mask & empty
+        return moves
+
+    def ray(self, square, direction):
+        ''' Method: ray
+            Parameters: self, square (integer), direction (integer), the
+                        index of the direction in MOVE_DIRS
+            Returns: an integer, the mask of the squares from square (not
+                     included) to the edge of the board in the direction
+        '''
+        line = self.lines[direction][square]
+        if self.shifts[direction][0] > 0:
+            return line >> (square + 1) << (square + 1)
+        return line & ((1 << square) - 1)
+
+    def flips_in_direction(self, own, opp, square, direction):
+        ''' Method: flips_in_direction
+            Parameters: self, own (integer), opp (integer), square
+                        (integer), direction (integer), the index of the
+                        direction in MOVE_DIRS
+            Returns: an integer with one bit set for every tile flipped in
+                     that direction by a move on square
+
+            Does: Finds the first square of the ray which is not the
+                  adversary's; the tiles before it are flipped if it is
+                  one of the player's.
+        '''
+        ray = self.ray(square, direction)
+        stop = ray & ~opp
+        if not stop:
+            return 0
+        if self.shifts[direction][0] > 0:
+            first = stop & -stop
+            if first & own:
+                return ray & (first - 1)
+        else:
+            first = 1 << (stop.bit_length() - 1)
+            if first & own:
+                return ray & ~((first << 1) - 1)
+        return 0
+
+    def flips(self, own, opp, square):
+        ''' Method: flips
+            Parameters: self, own (integer), opp (integer), square (integer)
+            Returns: an integer with one bit set for every tile to flip
+
+            Does: Finds all the adversary's tiles flipped by a move on
+                  square. Returns 0 if the move flips nothing (i.e, it is
+                  not legal).
+        '''
+        flipped = 0
+        for direction in range(len(self.shifts)):
+            flipped |= self.flips_in_direction(own, opp, square, direction)
+        return flipped
+
+    def to_square(self, row, col):
+        ''' Method: to_square
+            Parameters: self, row (integer), col (integer)
+            Returns: an integer, the bit index of square (row, col)
+        '''
+        return row * self.n + col
+
+    def to_coord(self, square):
+        ''' Method: to_coord
+            Parameters: self, square (integer)
+            Returns: a tuple of integers (row, col) for the bit index square
+        '''
+        return divmod(square, self.n)
+
+def get_wide_board(n):
+    ''' Function get_wide_board
+        Parameters: n (integer)
+        Returns: the WideBoard of an nxn board
+
+        Does: Computes the masks of an nxn board the first time they are
+              needed and reuses them afterwards.
+    '''
+    if n not in WIDE_BOARDS:
+        WIDE_BOARDS[n] = WideBoard(n)
+    return WIDE_BOARDS[n]
@@ -0,0 +1,82 @@
+
+'''
+This module contains the Zobrist keys used to hash Othello positions.
+
+The hash of a position is the XOR of one random 64-bit key per tile (one
+set of keys per color) and of SIDE_KEY when white is to move. Placing,
+flipping a tile or passing the turn only XORs one or two keys, so the
+hash can be updated with every move instead of being recomputed. The
+keys come from a fixed seed, so every process gets the same hashes.
+'''
+
+import random
+
+# Defines the seed of the keys and the key of the player to move as
+# constants
+SEED = 244
+SIDE_KEY = 0x9E3779B97F4A7C15
+
+# Stores the keys and the flip keys of every board size that has been used
+KEYS = {}
+FLIP_KEYS = {}
+
+def get_keys(n):
+    ''' Function get_keys
+        Parameters: n (integer)
+        Returns: a list of two lists of integers, the key of every square
+                 (row * n + col) for a black tile and for a white tile
+
+        Does: Generates the keys of an nxn board the first time they are
+              needed and reuses them afterwards.
+    '''
+    if n not in KEYS:
+        rng = random.Random(SEED * 1000 + n)
+        KEYS[n] = [[rng.getrandbits(64) for i in range(n * n)]
+                   for color in range(2)]
+    return KEYS[n]
+
+def get_flip_keys(n):
+    ''' Function get_flip_keys
+        Parameters: n (integer)
+        Returns: a list of integers, the key to XOR when the tile on a
+                 square changes color (either way)
+    '''
+    if n not in FLIP_KEYS:
+        keys = get_keys(n)
+        FLIP_KEYS[n] = [keys[0][i] ^ keys[1][i] for i in range(n * n)]
+    return FLIP_KEYS[n]
+
+def hash_bitboards(black, white, player, n = 8):
+    ''' Function hash_bitboards
+        Parameters: black (integer), white (integer), player (integer),
+                    n (integer, optional)
+        Returns: an integer, the Zobrist hash of the position
+
+        Does: Computes the hash of a position from scratch. player is the
+              player to move (0 for black, 1 for white).
+    '''
+    keys = get_keys(n)
+    h = SIDE_KEY if player == 1 else 0
+    for color, bb in ((0, black), (1, white)):
+        while bb:
+            low = bb & -bb
+            h ^= keys[color][low.bit_length() - 1]
+            bb ^= low
+    return h
+
+def hash_board(board, player):
+    ''' Function hash_board
+        Parameters: board (nested list), player (integer)
+        Returns: an integer, the Zobrist hash of the position
+
+        Does: Same as hash_bitboards, but for a board stored as a nested
+              list (0 for no tile, 1 for black tiles and 2 for white tiles).
+    '''
+    n = len(board)
+    keys = get_keys(n)
+    h = SIDE_KEY if player == 1 else 0
+    for row in range(n):
+        for col in range(n):
+            if board[row][col]:
+                h ^= keys[board[row][col] - 1][row * n + col]
+    return h